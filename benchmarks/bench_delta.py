@@ -0,0 +1,162 @@
+"""Delta export benchmark.
+
+Compares a delta export (`saveDelta()` since a checkpoint) with
+a full dump (`saveCSV()`) after a number of random edits,
+removals and additions on a synthetic database, run from the
+project root as
+
+    $ python -m benchmarks.bench_delta --rows 1000000 --changes 500
+
+Functions
+-----------------------
+applyChanges(QSqlDatabase, int, int, int)
+    Edit, remove and add records at random.
+main()
+    Run the benchmark.
+"""
+
+# Copyright (c) 2022 Adriano Angelone
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the
+# Software.
+#
+# This file is part of sem-qt.
+#
+# This file may be used under the terms of the GNU General
+# Public License version 3.0 as published by the Free Software
+# Foundation and appearing in the file LICENSE included in the
+# packaging of this file.  Please review the following
+# information to ensure the GNU General Public License version
+# 3.0 requirements will be met:
+# http://www.gnu.org/copyleft/gpl.html.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY
+# KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE
+# WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR
+# PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+# OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+# SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from PyQt6.QtCore import QCoreApplication
+from PyQt6.QtSql import QSqlDatabase, QSqlQuery
+
+from modules.ModelWrapper import ModelWrapper
+from benchmarks.generate import createDB
+
+CONNECTION = "bench_delta"
+CHECKPOINT = "bench"
+
+
+def applyChanges(conn: QSqlDatabase, rows: int, changes: int, seed: int):
+    """Edit, remove and add records at random.
+
+    Changes are split evenly between edits, removals and
+    additions, in a single transaction.
+
+    Parameters
+    -----------------------
+    conn : QSqlDatabase
+        Connection to the database
+    rows : int
+        Number of records, with ids from 1 to `rows`
+    changes : int
+        Number of changes
+    seed : int
+        Seed of the random choices
+    """
+    rng = random.Random(seed)
+    ids = rng.sample(range(1, rows + 1), 2 * (changes // 3))
+    edited, removed = ids[: changes // 3], ids[changes // 3 :]
+
+    conn.transaction()
+    query = QSqlQuery(conn)
+
+    query.prepare("UPDATE expenses SET amount = amount + 1 WHERE id = ? ;")
+    for rowid in edited:
+        query.addBindValue(rowid)
+        query.exec()
+
+    query.prepare("DELETE FROM expenses WHERE id = ? ;")
+    for rowid in removed:
+        query.addBindValue(rowid)
+        query.exec()
+
+    query.prepare(
+        "INSERT INTO expenses (date, type, amount, justification) "
+        "VALUES ('2024-01-01', 'A', 1.0, 'added') ;"
+    )
+    for _ in range(changes - len(ids)):
+        query.exec()
+
+    query.finish()
+    conn.commit()
+
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--changes", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    _app = QCoreApplication([])
+
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = os.path.join(tmp, "bench.db")
+        csvname = os.path.join(tmp, "bench.csv")
+        createDB(filename, args.rows, args.seed)
+
+        models = ModelWrapper(None, CONNECTION)
+        models.openDB(filename)
+
+        # first export, creating the checkpoint
+        start = time.perf_counter()
+        models.saveDelta(csvname, CHECKPOINT)
+        results = {
+            "initial": (time.perf_counter() - start, os.path.getsize(csvname))
+        }
+
+        applyChanges(
+            QSqlDatabase.database(CONNECTION),
+            args.rows,
+            args.changes,
+            args.seed,
+        )
+
+        start = time.perf_counter()
+        models.saveDelta(csvname, CHECKPOINT)
+        results["delta"] = (
+            time.perf_counter() - start,
+            os.path.getsize(csvname),
+        )
+
+        start = time.perf_counter()
+        models.saveCSV(csvname)
+        results["full"] = (
+            time.perf_counter() - start,
+            os.path.getsize(csvname),
+        )
+
+        models.closeDB()
+        # connection can only be removed once unreferenced
+        del models
+        QSqlDatabase.removeDatabase(CONNECTION)
+
+    print(f"rows: {args.rows}, changes: {args.changes}")
+    print(f"{'export':<10} {'time':>9} {'size [kB]':>10}")
+    for export, (elapsed, size) in results.items():
+        print(f"{export:<10} {elapsed:>8.3f}s {size / 1024:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""Duplicate check benchmark.
+
+Times the import of a statement overlapping the records of a
+synthetic database, without checks and with duplicates
+skipped or flagged, run from the project root as
+
+    $ python -m benchmarks.bench_duplicates --rows 1000000 --overlap 100000
+
+Functions
+-----------------------
+importTime(str, str, str) -> tuple[float, int]
+    Import a CSV file into a copy of a database.
+main()
+    Run the benchmark.
+"""
+
+# Copyright (c) 2022 Adriano Angelone
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the
+# Software.
+#
+# This file is part of sem-qt.
+#
+# This file may be used under the terms of the GNU General
+# Public License version 3.0 as published by the Free Software
+# Foundation and appearing in the file LICENSE included in the
+# packaging of this file.  Please review the following
+# information to ensure the GNU General Public License version
+# 3.0 requirements will be met:
+# http://www.gnu.org/copyleft/gpl.html.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY
+# KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE
+# WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR
+# PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+# OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+# SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from PyQt6.QtCore import QCoreApplication
+from PyQt6.QtSql import QSqlDatabase
+
+from modules.ModelWrapper import DUPLICATE_MODES, ModelWrapper
+from benchmarks.generate import createDB, writeCSV
+
+CONNECTION = "bench_duplicates"
+
+
+def importTime(filename: str, csvname: str, mode: str) -> tuple[float, int]:
+    """Import a CSV file into a copy of a database.
+
+    Parameters
+    -----------------------
+    filename : str
+        Path of the database, left unchanged
+    csvname : str
+        Path of the CSV file
+    mode : str
+        One of `DUPLICATE_MODES`, `None` for no checks
+
+    Returns
+    -----------------------
+    tuple[float, int]
+        Elapsed seconds, and number of duplicated rows
+    """
+    copy = f"{filename}.copy"
+    shutil.copyfile(filename, copy)
+
+    models = ModelWrapper(None, CONNECTION)
+    models.openDB(copy)
+
+    duplicated = []
+    start = time.perf_counter()
+    models.importCSV(csvname, duplicates=mode, duplicated=duplicated)
+    elapsed = time.perf_counter() - start
+
+    models.closeDB()
+    # connection can only be removed once unreferenced
+    del models
+    QSqlDatabase.removeDatabase(CONNECTION)
+
+    for suffix in ["", "-wal", "-shm"]:
+        if os.path.exists(f"{copy}{suffix}"):
+            os.remove(f"{copy}{suffix}")
+
+    return elapsed, len(duplicated)
+
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--overlap", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    _app = QCoreApplication([])
+
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = os.path.join(tmp, "bench.db")
+        csvname = os.path.join(tmp, "statement.csv")
+        createDB(filename, args.rows, args.seed)
+        # same seed, same first records
+        writeCSV(csvname, args.overlap, args.seed)
+
+        results = {
+            str(mode): importTime(filename, csvname, mode)
+            for mode in [None] + DUPLICATE_MODES
+        }
+
+    print(f"rows: {args.rows}, overlap: {args.overlap}")
+    print(f"{'mode':<6} {'import':>9} {'duplicates':>11}")
+    for mode, (elapsed, duplicated) in results.items():
+        print(f"{mode:<6} {elapsed:>8.3f}s {duplicated:>11}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""CSV export benchmark.
+
+Measures throughput and peak memory of `ModelWrapper.saveCSV()`
+on a synthetic database, run from the project root as
+
+    $ python -m benchmarks.bench_export --rows 1000000
+
+Functions
+-----------------------
+main()
+    Run the benchmark.
+"""
+
+# Copyright (c) 2022 Adriano Angelone
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the
+# Software.
+#
+# This file is part of sem-qt.
+#
+# This file may be used under the terms of the GNU General
+# Public License version 3.0 as published by the Free Software
+# Foundation and appearing in the file LICENSE included in the
+# packaging of this file.  Please review the following
+# information to ensure the GNU General Public License version
+# 3.0 requirements will be met:
+# http://www.gnu.org/copyleft/gpl.html.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY
+# KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE
+# WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR
+# PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+# OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+# SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+import argparse
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from PyQt6.QtCore import QCoreApplication
+
+from modules.ModelWrapper import ModelWrapper
+from benchmarks.generate import createDB
+
+
+def export(filename: str, dates: list[str]):
+    """Export the database, printing throughput and peak RSS.
+
+    Parameters
+    -----------------------
+    filename : str
+        Path of the database to export
+    dates : list[str]
+        [startDate, endDate], `None` to export all records
+    """
+    models = ModelWrapper(None)
+    models.openDB(filename)
+
+    rows = models.countRecords(dates)
+
+    start = time.perf_counter()
+    models.saveCSV(f"{filename}.out.csv", dates=dates)
+    elapsed = time.perf_counter() - start
+
+    models.closeDB()
+    os.remove(f"{filename}.out.csv")
+
+    # kilobytes on Linux
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    print(f"rows         : {rows}")
+    print(f"time [s]     : {elapsed:.3f}")
+    print(f"rows/sec     : {rows / elapsed:.0f}")
+    print(f"peak RSS [MB]: {rss / 1024:.1f}")
+
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--from", dest="start", default=None)
+    parser.add_argument("--to", dest="end", default=None)
+    # internal, export phase in a fresh process for a clean RSS
+    parser.add_argument("--db", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    dates = None
+    if args.start is not None and args.end is not None:
+        dates = [args.start, args.end]
+
+    _app = QCoreApplication([])
+
+    if args.db is not None:
+        export(args.db, dates)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = os.path.join(tmp, "bench.db")
+        createDB(filename, args.rows)
+
+        command = [sys.executable, "-m", "benchmarks.bench_export"]
+        command += ["--db", filename]
+        if dates is not None:
+            command += ["--from", dates[0], "--to", dates[1]]
+
+        subprocess.run(command, check=True)
+
+
+if __name__ == "__main__":
+    main()
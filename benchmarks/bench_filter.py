@@ -0,0 +1,137 @@
+"""Date filtering benchmark.
+
+Measures consecutive date filter changes on the paged list
+model, with and without the prepared statement cache, run from
+the project root as
+
+    $ python -m benchmarks.bench_filter --rows 100000 --filters 10000
+
+Functions
+-----------------------
+filterLoop(QSqlDatabase, int, list[list[str]])
+    Apply filters in sequence, returning elapsed time and stats.
+main()
+    Run the benchmark.
+"""
+
+# Copyright (c) 2022 Adriano Angelone
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the
+# Software.
+#
+# This file is part of sem-qt.
+#
+# This file may be used under the terms of the GNU General
+# Public License version 3.0 as published by the Free Software
+# Foundation and appearing in the file LICENSE included in the
+# packaging of this file.  Please review the following
+# information to ensure the GNU General Public License version
+# 3.0 requirements will be met:
+# http://www.gnu.org/copyleft/gpl.html.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY
+# KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE
+# WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR
+# PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+# OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+# SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+import argparse
+import datetime
+import os
+import random
+import tempfile
+import time
+
+from PyQt6.QtCore import QCoreApplication
+from PyQt6.QtSql import QSqlDatabase
+
+from modules.PagedTableModel import PagedTableModel
+from modules.QueryCache import QueryCache, STATEMENT_CACHE_SIZE
+from benchmarks.generate import LAST_DATE, YEARS, createDB
+
+CONNECTION = "bench_filter"
+
+
+def filterLoop(
+    conn: QSqlDatabase, size: int, filters: list[list[str]]
+) -> tuple[float, tuple[int, int]]:
+    """Apply filters in sequence, returning elapsed time and stats.
+
+    Each filter change selects the model and reads its first
+    row, as the list view does when repainting.
+
+    Parameters
+    -----------------------
+    conn : QSqlDatabase
+        Database connection
+    size : int
+        Size of the statement cache, 0 to disable it
+    filters : list[list[str]]
+        [startDate, endDate] of each filter
+
+    Returns
+    -----------------------
+    tuple[float, tuple[int, int]]
+        Elapsed seconds, cache hits and misses
+    """
+    statements = QueryCache(conn, size)
+    model = PagedTableModel(None, conn, None, statements)
+
+    start = time.perf_counter()
+    for dates in filters:
+        model.setFilter(dates)
+        model.select()
+        if model.rowCount() > 0:
+            model.data(model.index(0, 0))
+    elapsed = time.perf_counter() - start
+
+    stats = statements.stats()
+    statements.clear()
+    return elapsed, stats
+
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--filters", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    _app = QCoreApplication([])
+
+    # random intervals of up to a month within the generated data
+    rng = random.Random(args.seed)
+    days = YEARS * 365
+    filters = []
+    for _ in range(args.filters):
+        first = LAST_DATE - datetime.timedelta(days=rng.randrange(days))
+        last = first + datetime.timedelta(days=rng.randrange(31))
+        filters.append([first.isoformat(), last.isoformat()])
+
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = os.path.join(tmp, "bench.db")
+        createDB(filename, args.rows)
+
+        conn = QSqlDatabase.addDatabase("QSQLITE", CONNECTION)
+        conn.setDatabaseName(filename)
+        conn.open()
+
+        print(f"rows: {args.rows}, filters: {args.filters}")
+        print(f"{'cache':<8}{'time':>10}{'per filter':>14}{'hits':>8}")
+        for size in [0, STATEMENT_CACHE_SIZE]:
+            elapsed, (hits, misses) = filterLoop(conn, size, filters)
+            per = elapsed / args.filters * 1e6
+            print(f"{size:<8}{elapsed:>9.3f}s{per:>11.1f}us{hits:>8}")
+
+        conn.close()
+        del conn
+        QSqlDatabase.removeDatabase(CONNECTION)
+
+
+if __name__ == "__main__":
+    main()
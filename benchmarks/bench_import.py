@@ -0,0 +1,171 @@
+"""Multi-file import benchmark.
+
+Times the import of several CSV files into a fresh database,
+one file at a time with `importCSV()`, and in a single
+transaction with `importCSVs()` for increasing numbers of
+parsing processes, run from the project root as
+
+    $ python -m benchmarks.bench_import --files 12 --rows 100000
+
+Parsing alone is timed as well, as the single writer bounds
+the throughput of the whole import.
+
+Functions
+-----------------------
+importTime(str, list[str], int) -> float
+    Import the files into a new database, returning elapsed time.
+parseTime(list[str], int) -> float
+    Parse the files in a process pool, returning elapsed time.
+main()
+    Run the benchmark.
+"""
+
+# Copyright (c) 2022 Adriano Angelone
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the
+# Software.
+#
+# This file is part of sem-qt.
+#
+# This file may be used under the terms of the GNU General
+# Public License version 3.0 as published by the Free Software
+# Foundation and appearing in the file LICENSE included in the
+# packaging of this file.  Please review the following
+# information to ensure the GNU General Public License version
+# 3.0 requirements will be met:
+# http://www.gnu.org/copyleft/gpl.html.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY
+# KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE
+# WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR
+# PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+# OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+# SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+import argparse
+import itertools
+import multiprocessing
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from PyQt6.QtCore import QCoreApplication
+from PyQt6.QtSql import QSqlDatabase
+
+from modules.ModelWrapper import IMPORT_BATCH_SIZE, ModelWrapper
+from modules.Validation import parseFile
+from benchmarks.generate import writeCSV
+
+CONNECTION = "bench_import"
+
+
+def importTime(filename: str, csvnames: list[str], workers: int) -> float:
+    """Import the files into a new database, returning elapsed time.
+
+    Parameters
+    -----------------------
+    filename : str
+        Path of the database to create, removed afterwards
+    csvnames : list[str]
+        CSV files to import
+    workers : int
+        Number of parsing processes, 0 to import the files one
+        at a time with `importCSV()`
+
+    Returns
+    -----------------------
+    float
+        Elapsed seconds
+    """
+    models = ModelWrapper(None, CONNECTION)
+    models.createDB(filename)
+
+    start = time.perf_counter()
+    if workers == 0:
+        for csvname in csvnames:
+            models.importCSV(csvname)
+    else:
+        models.importCSVs(csvnames, workers=workers)
+    elapsed = time.perf_counter() - start
+
+    models.closeDB()
+    # connection can only be removed once unreferenced
+    del models
+    QSqlDatabase.removeDatabase(CONNECTION)
+    os.remove(filename)
+
+    return elapsed
+
+
+def parseTime(csvnames: list[str], workers: int) -> float:
+    """Parse the files in a process pool, returning elapsed time.
+
+    Parameters
+    -----------------------
+    csvnames : list[str]
+        CSV files to parse
+    workers : int
+        Number of parsing processes
+
+    Returns
+    -----------------------
+    float
+        Elapsed seconds, including the startup of the pool
+    """
+    start = time.perf_counter()
+    with ProcessPoolExecutor(
+        workers, mp_context=multiprocessing.get_context("spawn")
+    ) as pool:
+        for _ in pool.map(
+            parseFile, csvnames, itertools.repeat(IMPORT_BATCH_SIZE)
+        ):
+            pass
+
+    return time.perf_counter() - start
+
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=12)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    _app = QCoreApplication([])
+
+    # 1, 2, 4, ... up to the maximum number of processes
+    counts = [1 << i for i in range(args.workers.bit_length())]
+    if counts[-1] != args.workers:
+        counts.append(args.workers)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csvnames = []
+        for seed in range(args.files):
+            csvnames.append(os.path.join(tmp, f"{seed}.csv"))
+            writeCSV(csvnames[-1], args.rows, seed)
+
+        filename = os.path.join(tmp, "bench.db")
+        rows = args.files * args.rows
+
+        print(f"files: {args.files}, rows: {rows}, CPUs: {os.cpu_count()}")
+        print(f"{'workers':<10} {'parse':>9} {'import':>9} {'rows/s':>9}")
+
+        elapsed = importTime(filename, csvnames, 0)
+        print(f"{'serial':<10} {'':>9} {elapsed:>8.3f}s {rows / elapsed:>9.0f}")
+
+        for workers in counts:
+            parsed = parseTime(csvnames, workers)
+            elapsed = importTime(filename, csvnames, workers)
+            print(
+                f"{workers:<10} {parsed:>8.3f}s {elapsed:>8.3f}s "
+                f"{rows / elapsed:>9.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""SQLite profile benchmark.
+
+Times import, date filtering and export of a synthetic database
+under each performance profile of `ModelWrapper`, run from the
+project root as
+
+    $ python -m benchmarks.bench_profiles --rows 1000000
+
+Functions
+-----------------------
+main()
+    Run the benchmark.
+"""
+
+# Copyright (c) 2022 Adriano Angelone
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the
+# Software.
+#
+# This file is part of sem-qt.
+#
+# This file may be used under the terms of the GNU General
+# Public License version 3.0 as published by the Free Software
+# Foundation and appearing in the file LICENSE included in the
+# packaging of this file.  Please review the following
+# information to ensure the GNU General Public License version
+# 3.0 requirements will be met:
+# http://www.gnu.org/copyleft/gpl.html.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY
+# KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE
+# WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR
+# PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+# OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+# SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from PyQt6.QtCore import QCoreApplication
+
+from modules.ModelWrapper import PROFILES, ModelWrapper
+from benchmarks.generate import writeCSV
+
+# number of random date filters applied per profile
+FILTERS = 200
+
+
+def randomRange() -> list[str]:
+    """Return a random date range within the synthetic data.
+
+    Returns
+    -----------------------
+    list[str]
+        [startDate, endDate]
+    """
+    start = random.randrange(2015, 2025)
+    end = random.randrange(start, 2025)
+    month = random.randrange(1, 13)
+    return [f"{start}-{month:02}-01", f"{end}-{month:02}-28"]
+
+
+def bench(tmp: str, csvname: str, profile: str) -> list[float]:
+    """Time import, filtering and export under a profile.
+
+    Parameters
+    -----------------------
+    tmp : str
+        Directory for the database and the exported file
+    csvname : str
+        Path of the CSV file to import
+    profile : str
+        Name of the profile
+
+    Returns
+    -----------------------
+    list[float]
+        [import, filter, export] times in seconds
+    """
+    filename = os.path.join(tmp, f"{profile}.db")
+
+    models = ModelWrapper(None, profile)
+    models.createDB(filename)
+    models.setProfile(profile)
+
+    start = time.perf_counter()
+    models.importCSV(csvname)
+    timeImport = time.perf_counter() - start
+
+    models.initModels()
+    random.seed(0)
+    start = time.perf_counter()
+    for _ in range(FILTERS):
+        models.applyDateFilter(randomRange())
+        models.listModel.index(0, 0).data()
+    timeFilter = time.perf_counter() - start
+
+    start = time.perf_counter()
+    models.saveCSV(f"{filename}.out.csv")
+    timeExport = time.perf_counter() - start
+
+    models.closeDB()
+    os.remove(f"{filename}.out.csv")
+
+    return [timeImport, timeFilter, timeExport]
+
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    _app = QCoreApplication([])
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csvname = os.path.join(tmp, "bench.csv")
+        writeCSV(csvname, args.rows)
+
+        print(f"rows: {args.rows}, filters: {FILTERS}")
+        print(f"{'profile':<10} {'import':>9} {'filter':>9} {'export':>9}")
+        for profile in PROFILES:
+            times = bench(tmp, csvname, profile)
+            print(f"{profile:<10} " + " ".join(f"{t:>8.3f}s" for t in times))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""Snapshot benchmark.
+
+Compares a snapshot round-trip (`snapshot()`, then
+`restoreSnapshot()`) with a CSV round-trip (`saveCSV()`, then
+`importCSV()` into a new database) on a synthetic database,
+run from the project root as
+
+    $ python -m benchmarks.bench_snapshot --rows 1000000
+
+Functions
+-----------------------
+snapshotTimes(str, str) -> tuple[float, float, int]
+    Save and restore a snapshot, returning times and size.
+csvTimes(str, str) -> tuple[float, float, int]
+    Export and reimport the records, returning times and size.
+main()
+    Run the benchmark.
+"""
+
+# Copyright (c) 2022 Adriano Angelone
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the
+# Software.
+#
+# This file is part of sem-qt.
+#
+# This file may be used under the terms of the GNU General
+# Public License version 3.0 as published by the Free Software
+# Foundation and appearing in the file LICENSE included in the
+# packaging of this file.  Please review the following
+# information to ensure the GNU General Public License version
+# 3.0 requirements will be met:
+# http://www.gnu.org/copyleft/gpl.html.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY
+# KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE
+# WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR
+# PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+# OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+# SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+import argparse
+import os
+import tempfile
+import time
+
+from PyQt6.QtCore import QCoreApplication
+from PyQt6.QtSql import QSqlDatabase
+
+from modules.ModelWrapper import ModelWrapper
+from benchmarks.generate import createDB
+
+CONNECTION = "bench_snapshot"
+RELOAD_CONNECTION = "bench_snapshot_reload"
+
+
+def snapshotTimes(filename: str, directory: str) -> tuple[float, float, int]:
+    """Save and restore a snapshot, returning times and size.
+
+    Parameters
+    -----------------------
+    filename : str
+        Path of the database
+    directory : str
+        Directory of the snapshot
+
+    Returns
+    -----------------------
+    tuple[float, float, int]
+        Elapsed seconds of the snapshot and of the restore, and
+        size of the snapshot in bytes
+    """
+    models = ModelWrapper(None, CONNECTION)
+    models.openDB(filename)
+
+    start = time.perf_counter()
+    snapshot = models.snapshot(directory, None)
+    saved = time.perf_counter() - start
+
+    start = time.perf_counter()
+    models.restoreSnapshot(snapshot)
+    restored = time.perf_counter() - start
+
+    models.closeDB()
+    # connection can only be removed once unreferenced
+    del models
+    QSqlDatabase.removeDatabase(CONNECTION)
+
+    size = os.path.getsize(snapshot)
+    os.remove(snapshot)
+
+    return saved, restored, size
+
+
+def csvTimes(filename: str, csvname: str) -> tuple[float, float, int]:
+    """Export and reimport the records, returning times and size.
+
+    Parameters
+    -----------------------
+    filename : str
+        Path of the database
+    csvname : str
+        Path of the CSV file, removed afterwards, with the new
+        database
+
+    Returns
+    -----------------------
+    tuple[float, float, int]
+        Elapsed seconds of the export and of the import, and
+        size of the CSV file in bytes
+    """
+    models = ModelWrapper(None, CONNECTION)
+    models.openDB(filename)
+
+    start = time.perf_counter()
+    models.saveCSV(csvname)
+    saved = time.perf_counter() - start
+
+    models.closeDB()
+    # connection can only be removed once unreferenced
+    del models
+    QSqlDatabase.removeDatabase(CONNECTION)
+
+    # fresh connection, the previous name is not reused
+    models = ModelWrapper(None, RELOAD_CONNECTION)
+    reloaded = f"{csvname}.db"
+    start = time.perf_counter()
+    models.createDB(reloaded)
+    models.importCSV(csvname)
+    restored = time.perf_counter() - start
+
+    models.closeDB()
+    del models
+    QSqlDatabase.removeDatabase(RELOAD_CONNECTION)
+
+    size = os.path.getsize(csvname)
+    os.remove(csvname)
+    os.remove(reloaded)
+
+    return saved, restored, size
+
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    _app = QCoreApplication([])
+
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = os.path.join(tmp, "bench.db")
+        createDB(filename, args.rows, args.seed)
+
+        results = {
+            "snapshot": snapshotTimes(filename, os.path.join(tmp, "snaps")),
+            "CSV": csvTimes(filename, os.path.join(tmp, "bench.csv")),
+        }
+
+    print(f"rows: {args.rows}")
+    print(f"{'method':<10} {'save':>9} {'restore':>9} {'size [MB]':>10}")
+    for method, (saved, restored, size) in results.items():
+        print(
+            f"{method:<10} {saved:>8.3f}s {restored:>8.3f}s "
+            f"{size / (1 << 20):>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
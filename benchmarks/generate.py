@@ -0,0 +1,194 @@
+"""Synthetic expense generator.
+
+Writes reproducible CSV files and databases of random expenses
+in the documented schema, run from the project root as
+
+    $ python -m benchmarks.generate --rows 1000000 --csv expenses.csv
+    $ python -m benchmarks.generate --rows 1000000 --db expenses.db
+
+Expenses are spread over `YEARS` years ending on `LAST_DATE`,
+with a yearly growth of the number of expenses and more
+expenses on weekends. Types are skewed (see `TYPES`), amounts
+follow a log-normal distribution whose median depends on the
+type.
+
+Functions
+-----------------------
+writeCSV(str, int, int)
+    Write a CSV file of random expenses.
+createDB(str, int, int)
+    Create a database filled with random expenses.
+main()
+    Run the generator.
+"""
+
+# Copyright (c) 2022 Adriano Angelone
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the
+# Software.
+#
+# This file is part of sem-qt.
+#
+# This file may be used under the terms of the GNU General
+# Public License version 3.0 as published by the Free Software
+# Foundation and appearing in the file LICENSE included in the
+# packaging of this file.  Please review the following
+# information to ensure the GNU General Public License version
+# 3.0 requirements will be met:
+# http://www.gnu.org/copyleft/gpl.html.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY
+# KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE
+# WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR
+# PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+# OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+# SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+import argparse
+import datetime
+import os
+import random
+
+from PyQt6.QtCore import QCoreApplication
+from PyQt6.QtSql import QSqlDatabase
+
+from modules.ModelWrapper import ModelWrapper
+
+# last date of the generated expenses, fixed for reproducibility
+LAST_DATE = datetime.date(2024, 12, 31)
+# number of years spanned by the generated expenses
+YEARS = 10
+# yearly growth of the number of expenses
+GROWTH = 1.15
+# relative frequency of weekend expenses
+WEEKEND_WEIGHT = 1.6
+# type: (relative frequency, median amount)
+TYPES = {
+    "N": (0.50, 12.0),
+    "R": (0.20, 35.0),
+    "S": (0.12, 60.0),
+    "F": (0.08, 25.0),
+    "H": (0.05, 150.0),
+    "T": (0.03, 40.0),
+    "X": (0.02, 400.0),
+}
+# words of the generated justifications
+WORDS = [
+    "groceries", "restaurant", "fuel", "rent", "gift", "books",
+    "train", "bus", "pharmacy", "doctor", "cinema", "bills",
+    "phone", "internet", "clothes", "repairs", "insurance", "taxi",
+]  # fmt: skip
+
+
+def dayWeights() -> tuple[list[datetime.date], list[float]]:
+    """Return the dates of the expenses, and their weights.
+
+    Returns
+    -----------------------
+    tuple[list[datetime.date], list[float]]
+        Dates spanned by the expenses, and their cumulative
+        relative frequencies
+    """
+    first = LAST_DATE.replace(year=LAST_DATE.year - YEARS)
+    days = [
+        first + datetime.timedelta(days=i)
+        for i in range(1, (LAST_DATE - first).days + 1)
+    ]
+
+    weights = []
+    total = 0.0
+    for day in days:
+        weight = GROWTH ** (day.year - first.year)
+        if day.weekday() >= 5:
+            weight *= WEEKEND_WEIGHT
+        total += weight
+        weights.append(total)
+
+    return days, weights
+
+
+def writeCSV(csvname: str, rows: int, seed: int = 0):
+    """Write a CSV file of random expenses.
+
+    Parameters
+    -----------------------
+    csvname : str
+        Path of the CSV file to write
+    rows : int
+        Number of expenses to write
+    seed : int
+        Seed of the random generator, equal seeds give equal
+        files
+    """
+    rng = random.Random(seed)
+
+    days, dayCumWeights = dayWeights()
+    dates = [day.isoformat() for day in days]
+    types = list(TYPES)
+    typeWeights = [TYPES[type_][0] for type_ in types]
+
+    with open(csvname, "w", encoding="utf-8", buffering=1 << 20) as csvfile:
+        for _ in range(rows):
+            date = rng.choices(dates, cum_weights=dayCumWeights)[0]
+            type_ = rng.choices(types, typeWeights)[0]
+            amount = round(rng.lognormvariate(0.0, 0.8) * TYPES[type_][1], 2)
+            words = " ".join(rng.sample(WORDS, rng.randrange(1, 4)))
+
+            csvfile.write(f',{date},{type_},{amount},"{words}"\n')
+
+
+def createDB(filename: str, rows: int, seed: int = 0):
+    """Create a database filled with random expenses.
+
+    Requires a running QCoreApplication.
+
+    Parameters
+    -----------------------
+    filename : str
+        Path of the database to create
+    rows : int
+        Number of expenses to insert
+    seed : int
+        Seed of the random generator, equal seeds give equal
+        databases
+    """
+    csvname = f"{filename}.csv"
+    writeCSV(csvname, rows, seed)
+
+    connName = f"generate-{filename}"
+    models = ModelWrapper(None, connName)
+    try:
+        models.createDB(filename)
+        models.importCSV(csvname)
+        models.closeDB()
+    finally:
+        os.remove(csvname)
+
+    # connection can only be removed once unreferenced
+    del models
+    QSqlDatabase.removeDatabase(connName)
+
+
+def main():
+    """Run the generator."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=0)
+    output = parser.add_mutually_exclusive_group(required=True)
+    output.add_argument("--csv", help="CSV file to write")
+    output.add_argument("--db", help="database to create")
+    args = parser.parse_args()
+
+    if args.csv is not None:
+        writeCSV(args.csv, args.rows, args.seed)
+        return
+
+    _app = QCoreApplication([])
+    createDB(args.db, args.rows, args.seed)
+
+
+if __name__ == "__main__":
+    main()
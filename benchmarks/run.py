@@ -0,0 +1,424 @@
+"""Benchmark harness.
+
+Runs each `ModelWrapper` operation, and the first paint of the
+list form under the `offscreen` Qt platform, against synthetic
+data from `benchmarks.generate`, and stores the timings as JSON,
+run from the project root as
+
+    $ python -m benchmarks.run --rows 100000 --output new.json
+    $ python -m benchmarks.run --rows 100000 --compare old.json
+
+Each operation is repeated, and its median time is reported.
+With `--compare`, the ratios to a previous run are printed, and
+the exit status is 1 if any operation slowed down by more than
+the tolerance.
+
+Functions
+-----------------------
+main()
+    Run the benchmarks.
+"""
+
+# Copyright (c) 2022 Adriano Angelone
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the
+# Software.
+#
+# This file is part of sem-qt.
+#
+# This file may be used under the terms of the GNU General
+# Public License version 3.0 as published by the Free Software
+# Foundation and appearing in the file LICENSE included in the
+# packaging of this file.  Please review the following
+# information to ensure the GNU General Public License version
+# 3.0 requirements will be met:
+# http://www.gnu.org/copyleft/gpl.html.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY
+# KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE
+# WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR
+# PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+# OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+# SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+import argparse
+import json
+import os
+import platform
+import random
+import resource
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+# widgets are rendered without a display
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+# pylint: disable=wrong-import-position
+from PyQt6.QtCore import PYQT_VERSION_STR, QT_VERSION_STR
+from PyQt6.QtSql import QSqlDatabase, QSqlQuery
+from PyQt6.QtWidgets import QApplication
+
+from modules.ListForm import ListForm
+from modules.ModelWrapper import ModelWrapper
+from benchmarks.generate import createDB, writeCSV
+
+# number of date filters applied by the 'filter' operation
+FILTERS = 100
+# number of rows removed by the 'remove' operation
+REMOVED = 1000
+# default slowdown tolerated by --compare
+TOLERANCE = 0.2
+# name of the connection used by the operations
+CONNECTION = "benchmark"
+
+
+class Fixture:
+    """Synthetic data shared by the operations.
+
+    Attributes
+    -----------------------
+    tmp : str
+        Scratch directory
+    csvname : str
+        Generated CSV file
+    dbname : str
+        Database generated from the same parameters
+    rows : int
+        Number of generated expenses
+    seed : int
+        Seed of the generator
+    """
+
+    def __init__(self, tmp: str, rows: int, seed: int):
+        """Construct class instance, generating the data.
+
+        Parameters
+        -----------------------
+        tmp : str
+            Scratch directory
+        rows : int
+            Number of expenses to generate
+        seed : int
+            Seed of the generator
+        """
+        self.tmp = tmp
+        self.rows = rows
+        self.seed = seed
+
+        self.csvname = os.path.join(tmp, "expenses.csv")
+        writeCSV(self.csvname, rows, seed)
+
+        self.dbname = os.path.join(tmp, "expenses.db")
+        createDB(self.dbname, rows, seed)
+
+    def copyDB(self) -> str:
+        """Return a scratch copy of the generated database.
+
+        Returns
+        -----------------------
+        str
+            Path of the copy
+        """
+        filename = os.path.join(self.tmp, "scratch.db")
+        shutil.copyfile(self.dbname, filename)
+        return filename
+
+
+def connect(filename: str, create: bool = False) -> ModelWrapper:
+    """Open or create a database on the benchmark connection.
+
+    The connection is removed by the harness after each run,
+    once the wrapper is out of scope.
+
+    Parameters
+    -----------------------
+    filename : str
+        Path of the database
+    create : bool
+        `True` to create the database
+
+    Returns
+    -----------------------
+    ModelWrapper
+        Wrapper connected to the database
+    """
+    models = ModelWrapper(None, CONNECTION)
+    if create:
+        models.createDB(filename)
+    else:
+        models.openDB(filename)
+
+    return models
+
+
+def benchImport(fixture: Fixture) -> float:
+    """Time `importCSV()` into a new database."""
+    filename = os.path.join(fixture.tmp, "import.db")
+    models = connect(filename, create=True)
+
+    start = time.perf_counter()
+    models.importCSV(fixture.csvname)
+    elapsed = time.perf_counter() - start
+
+    models.closeDB()
+    os.remove(filename)
+
+    return elapsed
+
+
+def benchOpen(fixture: Fixture) -> float:
+    """Time `openDB()` and `initModels()`."""
+    start = time.perf_counter()
+    models = connect(fixture.dbname)
+    models.initModels()
+    elapsed = time.perf_counter() - start
+
+    models.closeDB()
+
+    return elapsed
+
+
+def benchExport(fixture: Fixture) -> float:
+    """Time `saveCSV()` of all records."""
+    filename = os.path.join(fixture.tmp, "export.csv")
+    models = connect(fixture.dbname)
+
+    start = time.perf_counter()
+    models.saveCSV(filename)
+    elapsed = time.perf_counter() - start
+
+    models.closeDB()
+    os.remove(filename)
+
+    return elapsed
+
+
+def benchFilter(fixture: Fixture) -> float:
+    """Time `FILTERS` calls of `applyDateFilter()`.
+
+    Each filter is followed by reading the first row, as the
+    view does.
+    """
+    rng = random.Random(fixture.seed)
+    ranges = []
+    for _ in range(FILTERS):
+        start = rng.randrange(2015, 2025)
+        end = rng.randrange(start, 2025)
+        month = rng.randrange(1, 13)
+        ranges.append([f"{start}-{month:02}-01", f"{end}-{month:02}-28"])
+
+    models = connect(fixture.dbname)
+    models.initModels()
+
+    start = time.perf_counter()
+    for dates in ranges:
+        models.applyDateFilter(dates)
+        models.listModel.index(0, 0).data()
+    elapsed = time.perf_counter() - start
+
+    models.closeDB()
+
+    return elapsed
+
+
+def benchRemove(fixture: Fixture) -> float:
+    """Time `removeRecords()` of `REMOVED` random rows."""
+    filename = fixture.copyDB()
+    models = connect(filename)
+    models.initModels()
+
+    rng = random.Random(fixture.seed)
+    count = models.listModel.rowCount()
+    rows = sorted(rng.sample(range(count), min(REMOVED, count)))
+
+    start = time.perf_counter()
+    models.removeRecords(rows)
+    elapsed = time.perf_counter() - start
+
+    models.closeDB()
+    os.remove(filename)
+
+    return elapsed
+
+
+def benchPaint(fixture: Fixture) -> float:
+    """Time the first paint of the list form on an open database."""
+    models = connect(fixture.dbname)
+
+    start = time.perf_counter()
+    models.initModels()
+    form = ListForm(None)
+    form.setModels(models.listModel, models.sumModel, models.pivotModel)
+    form.resize(1200, 400)
+    form.show()
+    # rendering synchronously
+    form.grab()
+    elapsed = time.perf_counter() - start
+
+    form.close()
+    form.deleteLater()
+    QApplication.processEvents()
+    models.closeDB()
+
+    return elapsed
+
+
+# operation name: timing function
+OPERATIONS = {
+    "import": benchImport,
+    "open": benchOpen,
+    "export": benchExport,
+    "filter": benchFilter,
+    "remove": benchRemove,
+    "paint": benchPaint,
+}
+
+
+def environment(rows: int, seed: int, repeat: int) -> dict:
+    """Return the parameters and environment of the run.
+
+    Parameters
+    -----------------------
+    rows : int
+        Number of generated expenses
+    seed : int
+        Seed of the generator
+    repeat : int
+        Number of repetitions of each operation
+
+    Returns
+    -----------------------
+    dict
+        Description of the run
+    """
+    conn = QSqlDatabase.addDatabase("QSQLITE", "version")
+    conn.open()
+    query = QSqlQuery(conn)
+    query.exec("SELECT sqlite_version() ;")
+    query.next()
+    sqlite = query.value(0)
+    query.finish()
+    conn.close()
+
+    del query, conn
+    QSqlDatabase.removeDatabase("version")
+
+    return {
+        "rows": rows,
+        "seed": seed,
+        "repeat": repeat,
+        "python": platform.python_version(),
+        "pyqt": PYQT_VERSION_STR,
+        "qt": QT_VERSION_STR,
+        "sqlite": sqlite,
+        "platform": platform.platform(),
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> bool:
+    """Print the timings against a baseline run.
+
+    Parameters
+    -----------------------
+    results : dict
+        Results of this run
+    baseline : dict
+        Results of the baseline run
+    tolerance : float
+        Tolerated relative slowdown
+
+    Returns
+    -----------------------
+    bool
+        `True` if no operation slowed down beyond `tolerance`
+    """
+    ok = True
+
+    print(f"{'operation':<10} {'baseline':>10} {'current':>10} {'ratio':>7}")
+    for name, result in results["operations"].items():
+        base = baseline["operations"].get(name)
+        if base is None:
+            print(f"{name:<10} {'-':>10} {result['median']:>9.3f}s")
+            continue
+
+        ratio = result["median"] / base["median"]
+        flag = ""
+        if ratio > 1.0 + tolerance:
+            ok = False
+            flag = "  SLOWER"
+
+        print(
+            f"{name:<10} {base['median']:>9.3f}s {result['median']:>9.3f}s "
+            f"{ratio:>7.2f}{flag}"
+        )
+
+    return ok
+
+
+def main():
+    """Run the benchmarks."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--ops",
+        default=",".join(OPERATIONS),
+        help=f"comma-separated subset of {', '.join(OPERATIONS)}",
+    )
+    parser.add_argument("--output", help="JSON file for the results")
+    parser.add_argument("--compare", help="JSON results of a baseline run")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    args = parser.parse_args()
+
+    names = args.ops.split(",")
+    for name in names:
+        if name not in OPERATIONS:
+            parser.error(f"unknown operation '{name}'")
+
+    _app = QApplication([])
+
+    results = {
+        "environment": environment(args.rows, args.seed, args.repeat),
+        "operations": {},
+    }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        fixture = Fixture(tmp, args.rows, args.seed)
+
+        for name in names:
+            runs = []
+            for _ in range(args.repeat):
+                runs.append(OPERATIONS[name](fixture))
+                QSqlDatabase.removeDatabase(CONNECTION)
+
+            results["operations"][name] = {
+                "median": statistics.median(runs),
+                "runs": runs,
+            }
+            print(f"{name:<10} {statistics.median(runs):>9.3f}s")
+
+    # kilobytes on Linux
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    results["environment"]["peak_rss_mb"] = round(rss / 1024, 1)
+
+    if args.output is not None:
+        with open(args.output, "w", encoding="utf-8") as output:
+            json.dump(results, output, indent=2, sort_keys=True)
+            output.write("\n")
+
+    if args.compare is not None:
+        with open(args.compare, encoding="utf-8") as base:
+            baseline = json.load(base)
+        if not compare(results, baseline, args.tolerance):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
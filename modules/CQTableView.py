@@ -31,9 +31,18 @@ CQTableView
 # OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
 # SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
 
+from PyQt6 import QtCore
+from PyQt6.QtCore import QAbstractItemModel, QEvent, Qt
 from PyQt6.QtGui import QColor, QPalette
 from PyQt6.QtWidgets import QWidget, QHeaderView, QTableView
 
+# rows sampled from each end of the model by sampled autosizing
+SAMPLE_ROWS = 50
+# horizontal padding of cells and headers [px]
+COLUMN_PADDING = 16
+# vertical padding of rows [px]
+ROW_PADDING = 6
+
 
 class CQTableView(QTableView):
     """Custom QTableView.
@@ -41,22 +50,68 @@ class CQTableView(QTableView):
     Builtin column width/sorting behavior and coloring
     routines.
 
+    Columns are resized to their contents by default. With
+    sampled autosizing, meant for large models, column widths
+    are instead estimated from the first and last `SAMPLE_ROWS`
+    rows, and from the longest value of each column if the model
+    provides `maxLengths()`; rows get a fixed height, so that
+    the view never measures more than the visible rows. Widths
+    are estimated again only when the columns or the font
+    change, or on a reset or insertion while no rows had been
+    sampled.
+
+    Private attributes
+    -----------------------
+    __sampled : bool
+        Whether column widths are estimated from a sample
+    __estimated : bool
+        Whether the last estimate included any row
+
     Public methods
     -----------------------
-    __init__(parent: QWidget)
+    __init__(parent: QWidget, sampled: bool)
         Constructor
+    setModel(QAbstractItemModel)
+        Set the model, estimating column widths if sampled.
+    changeEvent(QEvent)
+        Estimate column widths again on font changes.
+
+    Private methods
+    -----------------------
+    __estimateWidths()
+        Resize rows and columns after a sample of the model.
+    __sample() -> list[list]
+        Return the first and last rows of the model.
+
+    Private slots
+    -----------------------
+    __estimateIfEmpty()
+        Estimate column widths if no rows had been sampled.
+
+    Connections
+    -----------------------
+    model().columnsInserted, model().columnsRemoved
+        -> __estimateWidths(), if sampled
+    model().modelReset, model().rowsInserted
+        -> __estimateIfEmpty(), if sampled
     """
 
-    def __init__(self, parent: QWidget):
+    def __init__(self, parent: QWidget, sampled: bool = False):
         """Construct class instance.
 
         Parameters
         -----------------------
         parent : QWidget
             Parent QWidget
+        sampled : bool
+            Whether to estimate column widths from a sample of
+            the rows, instead of measuring all of them
         """
         super().__init__(parent)
 
+        self.__sampled = sampled
+        self.__estimated = False
+
         # sets sorting as activated on column click
         # ascending/descending order is toggled
         self.setSortingEnabled(True)
@@ -68,13 +123,120 @@ class CQTableView(QTableView):
         p.setBrush(QPalette.ColorRole.AlternateBase, gray)
         self.setPalette(p)
 
-        # autosize columns
-        self.horizontalHeader().setSectionResizeMode(
-            QHeaderView.ResizeMode.ResizeToContents
-        )
+        if sampled:
+            # estimated widths, uniform row heights
+            self.horizontalHeader().setSectionResizeMode(
+                QHeaderView.ResizeMode.Interactive
+            )
+            self.verticalHeader().setSectionResizeMode(
+                QHeaderView.ResizeMode.Fixed
+            )
+        else:
+            # autosize columns
+            self.horizontalHeader().setSectionResizeMode(
+                QHeaderView.ResizeMode.ResizeToContents
+            )
 
         # sets last column to take all available space
         self.horizontalHeader().setStretchLastSection(True)
 
         # alternating row colors
         self.setAlternatingRowColors(True)
+
+    def setModel(self, model: QAbstractItemModel):
+        """Set the model, estimating column widths if sampled.
+
+        Parameters
+        -----------------------
+        model : QAbstractItemModel
+            Model to display
+        """
+        super().setModel(model)
+
+        if not self.__sampled or model is None:
+            return
+
+        model.columnsInserted.connect(self.__estimateWidths)
+        model.columnsRemoved.connect(self.__estimateWidths)
+        model.modelReset.connect(self.__estimateIfEmpty)
+        model.rowsInserted.connect(self.__estimateIfEmpty)
+
+        self.__estimateWidths()
+
+    def changeEvent(self, event: QEvent):
+        """Estimate column widths again on font changes.
+
+        Parameters
+        -----------------------
+        event : QEvent
+            Change event
+        """
+        super().changeEvent(event)
+
+        if (
+            self.__sampled
+            and self.model() is not None
+            and event.type() == QEvent.Type.FontChange
+        ):
+            self.__estimateWidths()
+
+    def __estimateWidths(self):
+        """Resize rows and columns after a sample of the model."""
+        model = self.model()
+        metrics = self.fontMetrics()
+        headerMetrics = self.horizontalHeader().fontMetrics()
+
+        self.verticalHeader().setDefaultSectionSize(
+            metrics.height() + ROW_PADDING
+        )
+
+        rows = self.__sample()
+        self.__estimated = len(rows) > 0
+
+        # longest values, as a number of average characters
+        lengths = [0] * model.columnCount()
+        if hasattr(model, "maxLengths"):
+            lengths = model.maxLengths()
+
+        for column in range(model.columnCount()):
+            header = model.headerData(
+                column,
+                Qt.Orientation.Horizontal,
+                Qt.ItemDataRole.DisplayRole,
+            )
+            width = max(
+                [headerMetrics.horizontalAdvance(f"{header}")]
+                + [metrics.horizontalAdvance(f"{r[column]}") for r in rows]
+                + [metrics.averageCharWidth() * lengths[column]]
+            )
+            self.setColumnWidth(column, width + COLUMN_PADDING)
+
+    def __sample(self) -> list[list]:
+        """Return the first and last rows of the model.
+
+        Returns
+        -----------------------
+        list[list]
+            Up to `2 * SAMPLE_ROWS` rows, as lists of values
+        """
+        model = self.model()
+
+        if hasattr(model, "sample"):
+            return model.sample(SAMPLE_ROWS)
+
+        count = model.rowCount()
+        indices = sorted(
+            set(range(min(SAMPLE_ROWS, count)))
+            | set(range(max(count - SAMPLE_ROWS, 0), count))
+        )
+
+        return [
+            [model.index(i, j).data() for j in range(model.columnCount())]
+            for i in indices
+        ]
+
+    @QtCore.pyqtSlot()
+    def __estimateIfEmpty(self):
+        """Estimate column widths if no rows had been sampled."""
+        if not self.__estimated:
+            self.__estimateWidths()
@@ -0,0 +1,274 @@
+"""Background filter worker.
+
+Classes
+-----------------------
+FilterWorker
+    Worker querying filtered records off the GUI thread.
+"""
+
+# Copyright (c) 2022 Adriano Angelone
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the
+# Software.
+#
+# This file is part of sem-qt.
+#
+# This file may be used under the terms of the GNU General
+# Public License version 3.0 as published by the Free Software
+# Foundation and appearing in the file LICENSE included in the
+# packaging of this file.  Please review the following
+# information to ensure the GNU General Public License version
+# 3.0 requirements will be met:
+# http://www.gnu.org/copyleft/gpl.html.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY
+# KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE
+# WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR
+# PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+# OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+# SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+
+from PyQt6 import QtCore
+from PyQt6.QtCore import QObject, pyqtSignal
+from PyQt6.QtSql import QSqlDatabase
+
+from modules.ModelWrapper import DatabaseError
+from modules.PagedTableModel import PagedTableModel
+
+
+class FilterWorker(QObject):
+    """Worker querying filtered records off the GUI thread.
+
+    Meant to be moved to a QThread living as long as the
+    database is open, whose `finished` signal should be
+    connected to `stop()` with a direct connection. A dedicated
+    read-only connection to the database is opened in the
+    worker thread on the first request, and removed by `stop()`.
+
+    Requests are numbered by increasing generations: requests
+    superseded before being processed are skipped, and the
+    generation of each result is broadcast, so that results
+    superseded while being computed can be discarded.
+
+    Private attributes
+    -----------------------
+    __database : str
+        Filename of the database
+    __connName : str
+        Name of the worker connection
+    __model : PagedTableModel
+        Model on the worker connection, `None` until the first
+        request
+    __latest : int
+        Generation of the latest request
+
+    Public methods
+    -----------------------
+    __init__(str)
+        Construct class instance.
+    request(int, list[str], str, bool, int, Qt.SortOrder)
+        Request the records of a date range and search text.
+
+    Private methods
+    -----------------------
+    __open()
+        Open the worker connection and its model.
+
+    Signals
+    -----------------------
+    requested[int, object, str, bool, int, object]
+        Queue a request to the worker thread.
+    ready[int, int, list, object]
+        Broadcast the row count, first page and sums of a request.
+    failed[int, str]
+        Broadcast error message of a request.
+
+    Public slots
+    -----------------------
+    run(int, object, str, bool, int, object)
+        Perform a request, unless superseded.
+    stop()
+        Close the worker connection.
+
+    Connections
+    -----------------------
+    requested(generation, dates, text, sums, column, order)
+        -> run(generation, dates, text, sums, column, order)
+    """
+
+    def __init__(self, database: str):
+        """Construct class instance.
+
+        Parameters
+        -----------------------
+        database : str
+            Filename of the database
+        """
+        super().__init__()
+
+        self.__database = database
+        self.__connName = f"filter-{id(self)}"
+        self.__model = None
+        self.__latest = 0
+
+        # queued once moved to the worker thread
+        self.requested.connect(self.run)
+
+    def request(
+        self,
+        generation: int,
+        dates: list[str],
+        text: str,
+        sums: bool,
+        column: int,
+        order: QtCore.Qt.SortOrder,
+    ):
+        """Request the records of a date range and search text.
+
+        Thread-safe, supersedes all previous requests.
+
+        Parameters
+        -----------------------
+        generation : int
+            Number of the request, increasing
+        dates : list[str]
+            [startDate, endDate], `None` for all records
+        text : str
+            Words searched in the justifications, empty for all
+            records
+        sums : bool
+            Whether to compute the sums of the amounts by type
+        column : int
+            Index of the sort column
+        order : Qt.SortOrder
+            Sort order
+        """
+        self.__latest = generation
+        self.requested.emit(generation, dates, text, sums, column, order)
+
+    requested = pyqtSignal(int, object, str, bool, int, object)
+    """Queue a request to the worker thread.
+
+    Parameters
+    -----------------------
+    generation : int
+        Number of the request
+    dates : list[str]
+        [startDate, endDate], `None` for all records
+    text : str
+        Words searched in the justifications
+    sums : bool
+        Whether to compute the sums of the amounts by type
+    column : int
+        Index of the sort column
+    order : Qt.SortOrder
+        Sort order
+    """
+
+    ready = pyqtSignal(int, int, list, object)
+    """Broadcast the row count, first page and sums of a request.
+
+    Parameters
+    -----------------------
+    generation : int
+        Number of the request
+    count : int
+        Number of records matching the request
+    rows : list
+        Records of the first page, as lists of values
+    sums : list[tuple[str, float]]
+        Sums of the amounts by type, `None` if not requested
+    """
+
+    failed = pyqtSignal(int, str)
+    """Broadcast error message of a request.
+
+    Parameters
+    -----------------------
+    generation : int
+        Number of the request
+    message : str
+        Description of the error
+    """
+
+    @QtCore.pyqtSlot(int, object, str, bool, int, object)
+    def run(
+        self,
+        generation: int,
+        dates: list[str],
+        text: str,
+        sums: bool,
+        column: int,
+        order: QtCore.Qt.SortOrder,
+    ):
+        """Perform a request, unless superseded.
+
+        Parameters
+        -----------------------
+        generation : int
+            Number of the request
+        dates : list[str]
+            [startDate, endDate], `None` for all records
+        text : str
+            Words searched in the justifications, empty for all
+            records
+        sums : bool
+            Whether to compute the sums of the amounts by type
+        column : int
+            Index of the sort column
+        order : Qt.SortOrder
+            Sort order
+        """
+        if generation != self.__latest:
+            return
+
+        try:
+            if self.__model is None:
+                self.__open()
+
+            # sorting selects the filtered rows
+            self.__model.setFilter(dates, text)
+            self.__model.sort(column, order)
+            rows = self.__model.firstPage()
+
+            totals = self.__model.sums() if sums else None
+        except DatabaseError as err:
+            self.failed.emit(generation, f"{err}")
+            return
+
+        if generation == self.__latest:
+            self.ready.emit(generation, self.__model.rowCount(), rows, totals)
+
+    @QtCore.pyqtSlot()
+    def stop(self):
+        """Close the worker connection."""
+        if self.__model is None:
+            return
+
+        # connection can only be removed once unreferenced
+        self.__model = None
+        QSqlDatabase.database(self.__connName, False).close()
+        QSqlDatabase.removeDatabase(self.__connName)
+
+    def __open(self):
+        """Open the worker connection and its model.
+
+        Raises
+        -----------------------
+        - DatabaseError if connection errors
+        """
+        conn = QSqlDatabase.addDatabase("QSQLITE", self.__connName)
+        conn.setDatabaseName(self.__database)
+        conn.setConnectOptions("QSQLITE_OPEN_READONLY")
+
+        if not conn.open():
+            err = conn.lastError().text()
+            del conn
+            QSqlDatabase.removeDatabase(self.__connName)
+            raise DatabaseError(err)
+
+        self.__model = PagedTableModel(None, conn)
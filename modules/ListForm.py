@@ -32,19 +32,27 @@ ListForm
 # SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
 
 from PyQt6 import QtCore
-from PyQt6.QtCore import Qt, pyqtSignal, QPersistentModelIndex
+from PyQt6.QtCore import Qt, QTimer, pyqtSignal
 from PyQt6.QtWidgets import (
     QWidget,
     QLabel,
+    QLineEdit,
     QPushButton,
     QCalendarWidget,
+    QComboBox,
     QGroupBox,
+    QTabWidget,
 )
 from PyQt6.QtWidgets import QVBoxLayout, QHBoxLayout
-from PyQt6.QtSql import QSqlTableModel, QSqlQueryModel
-
 from modules.Common import lockSize
 from modules.CQTableView import CQTableView
+from modules.ModelWrapper import PIVOT_PERIODS
+from modules.PagedTableModel import PagedTableModel
+from modules.PivotModel import PIVOT_STATISTICS, PivotModel
+from modules.SummaryModel import SummaryModel
+
+# delay between the last date selection or keystroke and the filter [ms]
+FILTER_DELAY = 250
 
 
 class ListForm(QWidget):
@@ -52,9 +60,18 @@ class ListForm(QWidget):
 
     Attributes
     -----------------------
+    __tabs : QTabWidget
+        Switches between the list and the pivot of the expenses
     __tabList : CQTableView
         Contains the expenses with dates between the two
         selected dates, lists all fields
+    __tabPivot : CQTableView
+        Contains a statistic of the filtered expenses, by
+        period and type
+    __cmbPeriod : QComboBox
+        Selector of the period of the pivot
+    __cmbStatistic : QComboBox
+        Selector of the statistic shown in the pivot
     __tabSum : CQTableView
         Contains the sum of the expenses with dates between the
         two selected dates, grouped by category
@@ -62,6 +79,16 @@ class ListForm(QWidget):
         QCalendarWidget used to select start date in queries
     __calEnd : QCalendarWidget
         QCalendarWidget used to select end date in queries
+    __edtSearch : QLineEdit
+        Words searched in the justifications
+    __timer : QTimer
+        Single-shot timer delaying filtering after a date
+        selection or a search edit, restarted by each one
+    __datesActive : bool
+        Whether the selected dates filter the records, from
+        the first selection or update until clearing
+    __butUpdate : QPushButton
+        Filters immediately by the selected dates and text
     __butClear : QPushButton
         Clears all data filters
 
@@ -69,37 +96,76 @@ class ListForm(QWidget):
     -----------------------
     __init__(QWidget)
         Construct class instance.
-    setModels(QSqlTableModel)
+    setModels(PagedTableModel, SummaryModel, PivotModel)
         Set models for the CQTableView objects.
-    selection() -> list[QPersistentModelIndex]
-        Return the list of the indices of the selected rows.
+    clearModels()
+        Remove the models from the CQTableView objects.
+    pivotPeriod() -> str
+        Return the period of the pivot, if shown.
+    selection() -> list[int]
+        Return the list of the selected rows.
 
     Private methods
     -----------------------
     __initWidgets() -> QHBoxLayout
         Return the initialized and arranged widgets.
+    __initPivot() -> QWidget
+        Return the initialized pivot page.
     __initConnections()
         Init connections.
 
     Signals
     -----------------------
-    filterRequested[list[str]]
-        Broadcast request to update date filter.
+    filterRequested[object, str]
+        Broadcast request to update date and text filter.
     clearingRequested[]
-        Broadcast request to clear date filter.
+        Broadcast request to clear date and text filter.
+    pivotRequested[object]
+        Broadcast request to update the pivot by period.
 
     Private slots
     -----------------------
+    __selectDates()
+        Filter by the selected dates, after a delay.
+    __requestDates()
+        Filter by the selected dates immediately.
     __requestFilter()
         Request data filtering.
     __requestClearing()
         Request table clearing.
+    __requestPivot()
+        Request the pivot by the selected period.
+    __selectStatistic(str)
+        Show the selected statistic in the pivot.
 
     Connections
     -----------------------
+    __calStart.selectionChanged
+        -> __selectDates()
+    __calEnd.selectionChanged
+        -> __selectDates()
+    __edtSearch.textEdited
+        -> __timer.start()
+    __timer.timeout
+        -> __requestFilter()
+        -> filterRequested(dates, text)
+    __edtSearch.returnPressed
+        -> __requestFilter()
+        -> filterRequested(dates, text)
+    __butUpdate.clicked
+        -> __requestDates()
+        -> filterRequested(dates, text)
     __butClear.clicked
         -> __requestClearing()
         -> clearingRequested()
+    __tabs.currentChanged
+        -> __requestPivot()
+        -> pivotRequested(period)
+    __cmbPeriod.currentTextChanged
+        -> __requestPivot()
+        -> pivotRequested(period)
+    __cmbStatistic.currentTextChanged(name)
+        -> __selectStatistic(name)
     """
 
     def __init__(self, parent: QWidget):
@@ -112,10 +178,18 @@ class ListForm(QWidget):
         """
         super().__init__(parent)
 
+        self.__tabs = None
         self.__tabList = None
+        self.__tabPivot = None
+        self.__cmbPeriod = None
+        self.__cmbStatistic = None
         self.__tabSum = None
         self.__calStart = None
         self.__calEnd = None
+        self.__edtSearch = None
+        self.__timer = None
+        self.__datesActive = False
+        self.__butUpdate = None
         self.__butClear = None
 
         lay = self.__initWidgets()
@@ -125,33 +199,65 @@ class ListForm(QWidget):
 
     def setModels(
         self,
-        listModel: QSqlTableModel,
-        sumModel: QSqlQueryModel,
+        listModel: PagedTableModel,
+        sumModel: SummaryModel,
+        pivotModel: PivotModel,
     ):
         """Set models for the CQTableView objects.
 
         Parameters
         -----------------------
-        listModel: QSqlTableModel
+        listModel: PagedTableModel
             Model for the list CQTableView
-        sumModel: QSqQueryModel
+        sumModel: SummaryModel
             Model for the sum CQTableView
+        pivotModel: PivotModel
+            Model for the pivot CQTableView
         """
         self.__tabList.setModel(listModel)
         self.__tabSum.setModel(sumModel)
+        pivotModel.setStatistic(self.__cmbStatistic.currentText())
+        self.__tabPivot.setModel(pivotModel)
 
-    def selection(self) -> list[QPersistentModelIndex]:
-        """Return the list of selected indices.
+    def clearModels(self):
+        """Remove the models from the CQTableView objects.
+
+        The views keep a reference to their models, which
+        must be released before their connection is removed.
+        """
+        self.__tabList.setModel(None)
+        self.__tabSum.setModel(None)
+        self.__tabPivot.setModel(None)
+
+    def pivotPeriod(self) -> str:
+        """Return the period of the pivot, if shown.
 
         Returns
         -----------------------
-        list[QPersistentModelIndex]
-            The list of indices of the selected rows.
+        str
+            Selected period, `None` if the list is shown
         """
-        return [
-            QtCore.QPersistentModelIndex(model_idx)
-            for model_idx in self.__tabList.selectionModel().selectedRows()
-        ]
+        if self.__tabs.currentIndex() == 0:
+            return None
+
+        return self.__cmbPeriod.currentText()
+
+    def selection(self) -> list[int]:
+        """Return the list of the selected rows.
+
+        Computed from the selection ranges, without visiting
+        each selected cell.
+
+        Returns
+        -----------------------
+        list[int]
+            The list of the selected rows, sorted.
+        """
+        rows = set()
+        for rng in self.__tabList.selectionModel().selection():
+            rows.update(range(rng.top(), rng.bottom() + 1))
+
+        return sorted(rows)
 
     def __initWidgets(self) -> QHBoxLayout:
         """Return the initialized and arranged widgets.
@@ -162,7 +268,12 @@ class ListForm(QWidget):
             The initialized widget layout.
         """
         # expense list table
-        self.__tabList = CQTableView(self)
+        self.__tabList = CQTableView(self, sampled=True)
+
+        # list and pivot pages
+        self.__tabs = QTabWidget(self)
+        self.__tabs.addTab(self.__tabList, "List")
+        self.__tabs.addTab(self.__initPivot(), "Pivot")
 
         # sum table
         self.__tabSum = CQTableView(self)
@@ -192,6 +303,20 @@ class ListForm(QWidget):
         self.__calEnd = QCalendarWidget(self)
         self.__calEnd = lockSize(self.__calEnd)
 
+        # search label
+        labSearch = QLabel("Justification contains", self)
+        labSearch.setAlignment(Qt.AlignmentFlag.AlignCenter)
+
+        # search box
+        self.__edtSearch = QLineEdit(self)
+        self.__edtSearch.setPlaceholderText("Words to search")
+        self.__edtSearch.setClearButtonEnabled(True)
+
+        # live filtering, one filter per burst of selections
+        self.__timer = QTimer(self)
+        self.__timer.setSingleShot(True)
+        self.__timer.setInterval(FILTER_DELAY)
+
         # update button (graphical setup)
         self.__butUpdate = QPushButton("Update", self)
 
@@ -209,10 +334,12 @@ class ListForm(QWidget):
         layControls.addWidget(self.__calStart)
         layControls.addWidget(labEnd)
         layControls.addWidget(self.__calEnd)
+        layControls.addWidget(labSearch)
+        layControls.addWidget(self.__edtSearch)
         layControls.addLayout(layButtons)
 
         # control group box
-        gbxControl = QGroupBox("Filter by date")
+        gbxControl = QGroupBox("Filter by date and text")
         gbxControl.setLayout(layControls)
 
         # control-sum layout
@@ -222,49 +349,152 @@ class ListForm(QWidget):
 
         # overall layout
         lay = QHBoxLayout()
-        lay.addWidget(self.__tabList)
+        lay.addWidget(self.__tabs)
         lay.addLayout(layControlSum)
 
         return lay
 
+    def __initPivot(self) -> QWidget:
+        """Return the initialized pivot page.
+
+        Returns
+        -----------------------
+        QWidget
+            The pivot table, under its period and statistic
+            selectors.
+        """
+        page = QWidget(self)
+
+        # pivot selectors
+        self.__cmbPeriod = QComboBox(page)
+        self.__cmbPeriod.addItems(PIVOT_PERIODS)
+        self.__cmbPeriod.setCurrentText("month")
+        self.__cmbPeriod.setToolTip("Period of the rows")
+
+        self.__cmbStatistic = QComboBox(page)
+        self.__cmbStatistic.addItems(PIVOT_STATISTICS)
+        self.__cmbStatistic.setToolTip("Statistic of the amounts")
+
+        laySelectors = QHBoxLayout()
+        laySelectors.addWidget(QLabel("Period", page))
+        laySelectors.addWidget(self.__cmbPeriod)
+        laySelectors.addWidget(QLabel("Statistic", page))
+        laySelectors.addWidget(self.__cmbStatistic)
+        laySelectors.addStretch()
+
+        # pivot table, periods by types
+        self.__tabPivot = CQTableView(page)
+
+        lay = QVBoxLayout()
+        lay.addLayout(laySelectors)
+        lay.addWidget(self.__tabPivot)
+        page.setLayout(lay)
+
+        return page
+
     def __initConnections(self):
         """Init connections."""
-        self.__butUpdate.clicked.connect(self.__requestFilter)
+        self.__calStart.selectionChanged.connect(self.__selectDates)
+        self.__calEnd.selectionChanged.connect(self.__selectDates)
+        self.__edtSearch.textEdited.connect(self.__timer.start)
+        self.__timer.timeout.connect(self.__requestFilter)
+
+        self.__edtSearch.returnPressed.connect(self.__requestFilter)
+        self.__butUpdate.clicked.connect(self.__requestDates)
 
         self.__butClear.clicked.connect(self.__requestClearing)
 
-    filterRequested = pyqtSignal(list)
-    """Broadcast request to update date filter.
+        self.__tabs.currentChanged.connect(self.__requestPivot)
+        self.__cmbPeriod.currentTextChanged.connect(self.__requestPivot)
+        self.__cmbStatistic.currentTextChanged.connect(self.__selectStatistic)
+
+    filterRequested = pyqtSignal(object, str)
+    """Broadcast request to update date and text filter.
 
     Parameters
     -----------------------
     dates : list[str]
         [startDate, endDate], 'yyyy-mm-dd'
         may be None
+    text : str
+        Words searched in the justifications, may be empty
     """
 
     clearingRequested = pyqtSignal()
-    """Broadcast request to clear date filter."""
+    """Broadcast request to clear date and text filter."""
+
+    pivotRequested = pyqtSignal(object)
+    """Broadcast request to update the pivot by period.
+
+    Parameters
+    -----------------------
+    period : str
+        One of `PIVOT_PERIODS`, `None` if the pivot is hidden
+    """
+
+    @QtCore.pyqtSlot()
+    def __selectDates(self):
+        """Filter by the selected dates, after a delay."""
+        self.__datesActive = True
+        self.__timer.start()
+
+    @QtCore.pyqtSlot()
+    def __requestDates(self):
+        """Filter by the selected dates immediately."""
+        self.__datesActive = True
+        self.__requestFilter()
 
     @QtCore.pyqtSlot()
     def __requestFilter(self):
         """Request data filtering.
 
-        Fetches start and end dates
-        and emits 'filterRequested' signal
-        with start and end date as arguments
+        Fetches start and end dates, if filtering by date,
+        and the search text, and emits 'filterRequested'
+        signal with them as arguments
         """
-        fmt = Qt.DateFormat.ISODate
-        startDate = self.__calStart.selectedDate().toString(fmt)
-        endDate = self.__calEnd.selectedDate().toString(fmt)
+        self.__timer.stop()
 
-        self.filterRequested.emit([startDate, endDate])
+        dates = None
+        if self.__datesActive:
+            fmt = Qt.DateFormat.ISODate
+            startDate = self.__calStart.selectedDate().toString(fmt)
+            endDate = self.__calEnd.selectedDate().toString(fmt)
+            dates = [startDate, endDate]
+
+        self.filterRequested.emit(dates, self.__edtSearch.text())
 
     @QtCore.pyqtSlot()
     def __requestClearing(self):
         """Request table clearing.
 
-        Emits 'filterRequested' signal with `None` argument,
-        requesting clearing of date filters
+        Clears the search text and emits 'clearingRequested'
+        signal, requesting clearing of all filters
         """
+        self.__timer.stop()
+
+        self.__datesActive = False
+        self.__edtSearch.clear()
+
         self.clearingRequested.emit()
+
+    @QtCore.pyqtSlot()
+    def __requestPivot(self):
+        """Request the pivot by the selected period.
+
+        Emits 'pivotRequested' signal with the selected period,
+        or `None` if the list is shown
+        """
+        self.pivotRequested.emit(self.pivotPeriod())
+
+    @QtCore.pyqtSlot(str)
+    def __selectStatistic(self, name: str):
+        """Show the selected statistic in the pivot.
+
+        Parameters
+        -----------------------
+        name : str
+            One of `PIVOT_STATISTICS`
+        """
+        model = self.__tabPivot.model()
+        if model is not None:
+            model.setStatistic(name)
@@ -31,13 +31,34 @@ MainWindow
 # OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
 # SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
 
+import os
+
 from PyQt6 import QtCore
-from PyQt6.QtCore import QSize
-from PyQt6.QtGui import QAction, QIcon
-from PyQt6.QtWidgets import QToolBar, QFileDialog, QMainWindow
+from PyQt6.QtCore import Qt, QSize, QThread
+from PyQt6.QtGui import QAction, QCloseEvent, QIcon
+from PyQt6.QtWidgets import (
+    QComboBox,
+    QLabel,
+    QToolBar,
+    QFileDialog,
+    QMainWindow,
+    QMessageBox,
+    QProgressDialog,
+)
 
 from modules.Common import ErrorMsg
-from modules.ModelWrapper import DatabaseError, ModelWrapper
+from modules.ModelWrapper import (
+    DUPLICATE_MODES,
+    PROFILES,
+    SNAPSHOT_SUFFIX,
+    DatabaseError,
+    ModelWrapper,
+)
+from modules.FilterWorker import FilterWorker
+from modules.SnapshotWorker import SnapshotWorker
+from modules.TransferWorker import TransferWorker
+from modules.TimingDialog import TimingDialog
+from modules.ValidationDialog import ValidationDialog
 
 from modules.ListForm import ListForm
 
@@ -67,11 +88,62 @@ class MainWindow(QMainWindow):
         The action of importing an external CSV file
     __actExport : QAction
         The action of saving the database to an external file
+    __actSnapshot : QAction
+        The action of saving a snapshot of the database
+    __actRestore : QAction
+        The action of replacing the database with a snapshot
+    __cmbDuplicates : QComboBox
+        Selector of the handling of imported rows duplicating
+        records
+    __actBatch : QAction
+        The action of toggling batched edits
+    __actSubmit : QAction
+        The action of writing the pending edits to the database
+    __actRevert : QAction
+        The action of discarding the pending edits
+    __cmbProfile : QComboBox
+        Selector of the performance profile of the database
+    __actTrace : QAction
+        The action of toggling the tracing of queries
+    __actSaveTrace : QAction
+        The action of saving the traced queries to a file
+    __actTimings : QAction
+        The action of showing the histograms of the timings
+    __lblLatency : QLabel
+        Status bar readout of the latency of the last operation
+    __thread : QThread
+        Thread running the current import/export, if any
+    __worker : TransferWorker
+        Worker performing the current import/export, if any
+    __dlgProgress : QProgressDialog
+        Progress dialog of the current import/export, if any
+    __invalidRows : tuple
+        Errors, filenames, rejects file and handling of the
+        duplicates of the invalid rows of the current import,
+        reviewed once it ends, if any
+    __duplicateRows : tuple
+        Rows duplicating records in the current import, and
+        their handling, reported once it ends, if checked
+    __snapshotThread : QThread
+        Thread saving the current snapshot, if any
+    __snapshotWorker : SnapshotWorker
+        Worker saving the current snapshot, if any
+    __filterThread : QThread
+        Thread running the date filters, while a DB is open
+    __filterWorker : FilterWorker
+        Worker querying the date filters, while a DB is open
+    __filterGeneration : int
+        Number of the latest filter request
+    __pendingFilter : tuple
+        Dates, search text and sorting of the latest filter
+        request, `None` once applied
 
     Public methods
     -----------------------
     __init__()
         Construct class instance.
+    closeEvent(QCloseEvent)
+        Settle pending edits and stop the background threads.
 
     Private methods
     -----------------------
@@ -83,6 +155,22 @@ class MainWindow(QMainWindow):
         Init form and dialog connections.
     __initTbConnections()
         Init connections of toolbar actions.
+    __startTransfer(list[str], bool, list[str], str, str)
+        Start CSV import or export in a worker thread.
+    __reviewInvalid(list[tuple], list[str], str, str)
+        Show the invalid rows of an import, offering to skip them.
+    __reviewDuplicates(list[tuple], str)
+        Report the rows of an import duplicating records.
+    __initDBView()
+        Init models, forms and profile selector for the new DB.
+    __startFilterWorker()
+        Start the filter thread on the current DB.
+    __stopFilterWorker()
+        Stop the filter thread, if running.
+    __resubmitFilter()
+        Repeat the pending filter request after a change to the DB.
+    __settleEdits() -> bool
+        Ask whether to submit or discard the pending edits.
 
     Private slots
     -----------------------
@@ -95,16 +183,64 @@ class MainWindow(QMainWindow):
     __requestRemove()
         Attempt to remove the selected row in the view.
     __requestImport()
-        Collect filename from user and loads CSV data.
+        Collect filenames from user and loads CSV data.
     __requestExport()
         Collect filename from user and dumps database.
+    __requestSnapshot()
+        Start saving a snapshot of the database in a worker thread.
+    __requestRestore()
+        Collect snapshot from user and restore the database.
+    __requestProfile(str)
+        Attempt to switch the performance profile of the database.
+    __requestBatch(bool)
+        Switch between immediate and batched edits.
+    __requestSubmit()
+        Attempt to write the pending edits to the database.
+    __requestRevert()
+        Discard the pending edits.
+    __showPending(int)
+        Enable submission and reversion while edits are pending.
+    __requestFilter(list[str], str)
+        Request the filter from the filter thread.
+    __applyFilter(int, int, list, object)
+        Apply the latest filter result and repaint the form.
+    __reportFilterFailure(int, str)
+        Report the failure of the latest filter request.
+    __requestPivot(str)
+        Attempt to switch the period of the pivot.
+    __requestSaveTrace()
+        Collect filename from user and dumps the traced queries.
+    __requestTimings()
+        Show the histograms of the operation timings.
+    __showLatency(str, float)
+        Show the latency of the last operation in the status bar.
+    __updateProgress(int, int)
+        Update progress dialog of the current transfer.
+    __reportFailure(str)
+        Report the failure of the current transfer or snapshot.
+    __reportInvalid(list)
+        Store the invalid rows of the current import for review.
+    __reportDuplicates(list)
+        Store the duplicated rows of the current import for review.
+    __endTransfer()
+        Clean up after the end of the current transfer.
+    __refreshModels()
+        Refresh models after a successful import.
+    __reportSnapshot(str)
+        Show the filename of the saved snapshot in the status bar.
+    __endSnapshot()
+        Clean up after the end of the current snapshot.
 
     Connections
     -----------------------
-    __formLst.filterRequested(dates)
-        -> __models.applyDateFilter(dates)
+    __formLst.filterRequested(dates, text)
+        -> __requestFilter(dates, text)
     __formLst.clearingRequested()
-        -> __models.applyDateFilter(None)
+        -> __requestFilter(None, "")
+    __formLst.pivotRequested(period)
+        -> __requestPivot(period)
+    __models.tracer.operationTimed(name, ms)
+        -> __showLatency(name, ms)
     __actCreate.triggered
         -> __requestCreate()
     __actOpen.triggered
@@ -117,6 +253,54 @@ class MainWindow(QMainWindow):
         -> __requestImport()
     __actExport.triggered
         -> __requestExport()
+    __actSnapshot.triggered
+        -> __requestSnapshot()
+    __actRestore.triggered
+        -> __requestRestore()
+    __actBatch.toggled(enabled)
+        -> __requestBatch(enabled)
+    __actSubmit.triggered
+        -> __requestSubmit()
+    __actRevert.triggered
+        -> __requestRevert()
+    __cmbProfile.textActivated(name)
+        -> __requestProfile(name)
+    __actTrace.toggled(enabled)
+        -> __models.tracer.setEnabled(enabled)
+    __actSaveTrace.triggered
+        -> __requestSaveTrace()
+    __actTimings.triggered
+        -> __requestTimings()
+    __worker.progress(rows, nbytes)
+        -> __updateProgress(rows, nbytes)
+    __worker.failed(message)
+        -> __reportFailure(message)
+    __worker.invalid(errors)
+        -> __reportInvalid(errors), imports only
+    __worker.duplicated(rows)
+        -> __reportDuplicates(rows), imports only
+    __worker.succeeded()
+        -> __refreshModels(), imports only
+    __worker.finished()
+        -> __endTransfer()
+    __dlgProgress.canceled()
+        -> __worker.cancel()
+    __snapshotWorker.succeeded(filename)
+        -> __reportSnapshot(filename)
+    __snapshotWorker.failed(message)
+        -> __reportFailure(message)
+    __snapshotWorker.finished()
+        -> __endSnapshot()
+    __filterWorker.ready(generation, count, rows, sums)
+        -> __applyFilter(generation, count, rows, sums)
+    __filterWorker.failed(generation, message)
+        -> __reportFilterFailure(generation, message)
+    __filterThread.finished()
+        -> __filterWorker.stop(), in the filter thread
+    __models.listModel.rowEdited(old, new)
+        -> __resubmitFilter()
+    __models.listModel.pendingChanged(count)
+        -> __showPending(count)
     """
 
     def __init__(self):
@@ -131,6 +315,28 @@ class MainWindow(QMainWindow):
         self.__actRemove = None
         self.__actImport = None
         self.__actExport = None
+        self.__actSnapshot = None
+        self.__actRestore = None
+        self.__cmbDuplicates = None
+        self.__actBatch = None
+        self.__actSubmit = None
+        self.__actRevert = None
+        self.__cmbProfile = None
+        self.__actTrace = None
+        self.__actSaveTrace = None
+        self.__actTimings = None
+        self.__lblLatency = None
+        self.__thread = None
+        self.__worker = None
+        self.__dlgProgress = None
+        self.__invalidRows = None
+        self.__duplicateRows = None
+        self.__snapshotThread = None
+        self.__snapshotWorker = None
+        self.__filterThread = None
+        self.__filterWorker = None
+        self.__filterGeneration = 0
+        self.__pendingFilter = None
 
         # set to narrow size by default
         self.resize(MAIN_WINDOW_WIDTH, MAIN_WINDOW_HEIGHT)
@@ -143,12 +349,35 @@ class MainWindow(QMainWindow):
         self.__formLst = ListForm(self)
         # initializing toolbar
         self.__initToolbar()
+        # initializing latency readout
+        self.__lblLatency = QLabel(self)
+        self.statusBar().addPermanentWidget(self.__lblLatency)
 
         self.setCentralWidget(self.__formLst)
 
         self.__initConnections()
         self.__initTbConnections()
 
+    def closeEvent(self, event: QCloseEvent):
+        """Settle pending edits and stop the background threads.
+
+        A running snapshot is waited for.
+
+        Parameters
+        -----------------------
+        event : QCloseEvent
+            Close event, ignored if the pending edits are kept
+        """
+        if not self.__settleEdits():
+            event.ignore()
+            return
+
+        self.__stopFilterWorker()
+        if self.__snapshotThread is not None:
+            self.__snapshotThread.quit()
+            self.__snapshotThread.wait()
+        super().closeEvent(event)
+
     def __initToolbar(self):
         """Init toolbar and the contained actions."""
         tb = QToolBar(self)
@@ -173,13 +402,57 @@ class MainWindow(QMainWindow):
         self.__actImport = QAction(
             QIcon("resources/import.png"), "Import", self
         )
-        self.__actImport.setToolTip("Import external CSV file")
+        self.__actImport.setToolTip("Import external CSV files")
 
         self.__actExport = QAction(
             QIcon("resources/export.png"), "Export", self
         )
         self.__actExport.setToolTip("Export database to CSV file")
 
+        self.__actSnapshot = QAction("Snapshot", self)
+        self.__actSnapshot.setToolTip("Save a snapshot of the database")
+
+        self.__actRestore = QAction("Restore", self)
+        self.__actRestore.setToolTip("Replace the database with a snapshot")
+
+        self.__cmbDuplicates = QComboBox(self)
+        self.__cmbDuplicates.addItem("Keep duplicates", None)
+        for mode in DUPLICATE_MODES:
+            self.__cmbDuplicates.addItem(
+                f"{mode.capitalize()} duplicates", mode
+            )
+        self.__cmbDuplicates.setToolTip(
+            "Handling of imported rows repeating expenses in the database"
+        )
+
+        self.__actBatch = QAction("Batch edit", self)
+        self.__actBatch.setToolTip("Hold edits until submitted")
+        self.__actBatch.setCheckable(True)
+        self.__actBatch.setEnabled(False)
+
+        self.__actSubmit = QAction("Submit", self)
+        self.__actSubmit.setToolTip("Write pending edits to the database")
+        self.__actSubmit.setEnabled(False)
+
+        self.__actRevert = QAction("Revert", self)
+        self.__actRevert.setToolTip("Discard pending edits")
+        self.__actRevert.setEnabled(False)
+
+        self.__cmbProfile = QComboBox(self)
+        self.__cmbProfile.addItems(PROFILES.keys())
+        self.__cmbProfile.setToolTip("Performance profile of the database")
+        self.__cmbProfile.setEnabled(False)
+
+        self.__actTrace = QAction("Trace", self)
+        self.__actTrace.setToolTip("Record the executed queries")
+        self.__actTrace.setCheckable(True)
+
+        self.__actSaveTrace = QAction("Save trace", self)
+        self.__actSaveTrace.setToolTip("Save the recorded queries to file")
+
+        self.__actTimings = QAction("Timings", self)
+        self.__actTimings.setToolTip("Show histograms of operation timings")
+
         tb.addAction(self.__actCreate)
         tb.addAction(self.__actOpen)
         tb.addSeparator()
@@ -188,19 +461,34 @@ class MainWindow(QMainWindow):
         tb.addSeparator()
         tb.addAction(self.__actImport)
         tb.addAction(self.__actExport)
+        tb.addAction(self.__actSnapshot)
+        tb.addAction(self.__actRestore)
+        tb.addWidget(self.__cmbDuplicates)
+        tb.addSeparator()
+        tb.addAction(self.__actBatch)
+        tb.addAction(self.__actSubmit)
+        tb.addAction(self.__actRevert)
+        tb.addSeparator()
+        tb.addWidget(self.__cmbProfile)
+        tb.addSeparator()
+        tb.addAction(self.__actTrace)
+        tb.addAction(self.__actSaveTrace)
+        tb.addAction(self.__actTimings)
 
         self.addToolBar(tb)
 
     def __initConnections(self):
         """Init form and dialog connections."""
-        self.__formLst.filterRequested.connect(
-            lambda dates: self.__models.applyDateFilter(dates)
-        )
+        self.__formLst.filterRequested.connect(self.__requestFilter)
 
         self.__formLst.clearingRequested.connect(
-            lambda: self.__models.applyDateFilter(None)
+            lambda: self.__requestFilter(None, "")
         )
 
+        self.__formLst.pivotRequested.connect(self.__requestPivot)
+
+        self.__models.tracer.operationTimed.connect(self.__showLatency)
+
     def __initTbConnections(self):
         """Init connections of toolbar actions."""
         # create action
@@ -221,9 +509,295 @@ class MainWindow(QMainWindow):
         # request exporting to CSV
         self.__actExport.triggered.connect(self.__requestExport)
 
+        # request saving a snapshot
+        self.__actSnapshot.triggered.connect(self.__requestSnapshot)
+
+        # request restoring a snapshot
+        self.__actRestore.triggered.connect(self.__requestRestore)
+
+        # toggle batched edits
+        self.__actBatch.toggled.connect(self.__requestBatch)
+
+        # request writing pending edits
+        self.__actSubmit.triggered.connect(self.__requestSubmit)
+
+        # request discarding pending edits
+        self.__actRevert.triggered.connect(self.__requestRevert)
+
+        # request switching profile
+        self.__cmbProfile.textActivated.connect(self.__requestProfile)
+
+        # toggle query tracing
+        self.__actTrace.toggled.connect(self.__models.tracer.setEnabled)
+
+        # request saving the trace
+        self.__actSaveTrace.triggered.connect(self.__requestSaveTrace)
+
+        # request timing histograms
+        self.__actTimings.triggered.connect(self.__requestTimings)
+
+    def __startTransfer(
+        self,
+        filenames: list[str],
+        export: bool,
+        dates: list[str] = None,
+        rejects: str = None,
+        duplicates: str = None,
+    ):
+        """Start CSV import or export in a worker thread.
+
+        Parameters
+        -----------------------
+        filenames : list[str]
+            Filenames of the CSV files, a single one for exports
+        export : bool
+            `True` to dump the database, `False` to import
+        dates : list[str]
+            [startDate, endDate], restricts exports to the
+            records in this range, `None` for all records
+        rejects : str
+            Filename receiving the invalid rows of imports,
+            which are skipped, `None` to reject the whole import
+            instead
+        duplicates : str
+            Handling of the imported rows duplicating records,
+            one of `DUPLICATE_MODES`, `None` to import them
+            unchecked
+        """
+        # progress is measured in rows for exports,
+        # in bytes for imports
+        try:
+            database = self.__models.databaseName()
+            maximum = (
+                self.__models.countRecords(dates)
+                if export
+                else sum(os.path.getsize(f) for f in filenames)
+            )
+        except (DatabaseError, OSError) as err:
+            ErrorMsg(err)
+            return
+
+        self.__dlgProgress = QProgressDialog(
+            "Exporting..." if export else "Importing...",
+            "Cancel",
+            0,
+            maximum,
+            self,
+        )
+        self.__dlgProgress.setWindowModality(Qt.WindowModality.WindowModal)
+        self.__dlgProgress.setAutoClose(False)
+        self.__dlgProgress.setAutoReset(False)
+        self.__dlgProgress.setMinimumDuration(0)
+        self.__dlgProgress.setValue(0)
+
+        self.__thread = QThread(self)
+        self.__worker = TransferWorker(
+            database, filenames, export, dates, rejects, duplicates
+        )
+        self.__worker.moveToThread(self.__thread)
+
+        self.__thread.started.connect(self.__worker.run)
+        self.__worker.progress.connect(self.__updateProgress)
+        self.__worker.failed.connect(self.__reportFailure)
+        self.__worker.finished.connect(self.__endTransfer)
+        # direct connection, the worker thread is busy
+        self.__dlgProgress.canceled.connect(
+            self.__worker.cancel, Qt.ConnectionType.DirectConnection
+        )
+        if not export:
+            self.__worker.invalid.connect(self.__reportInvalid)
+            self.__worker.duplicated.connect(self.__reportDuplicates)
+            self.__worker.succeeded.connect(self.__refreshModels)
+
+        self.__thread.start()
+
+    def __reviewInvalid(
+        self,
+        errors: list[tuple[str, int, str, str]],
+        filenames: list[str],
+        rejects: str,
+        duplicates: str,
+    ):
+        """Show the invalid rows of an import, offering to skip them.
+
+        Parameters
+        -----------------------
+        errors : list[tuple[str, int, str, str]]
+            (filename, line, column, reason) of each error
+        filenames : list[str]
+            Filenames of the imported CSV files
+        rejects : str
+            Filename the skipped rows were written to, `None` if
+            the import was rejected
+        duplicates : str
+            Handling of the duplicated rows of the import, kept
+            when importing again
+        """
+        dialog = ValidationDialog(self, errors, rejects)
+        accepted = dialog.exec() == ValidationDialog.DialogCode.Accepted
+
+        # skipped rows are only reported
+        if not accepted or rejects is not None:
+            return
+
+        rejects = QFileDialog.getSaveFileName(
+            self,
+            "Specify file for the invalid rows",
+            f"{os.path.splitext(filenames[0])[0]}.rejects.csv",
+            "CSV files (*.csv)",
+        )[0]
+
+        if rejects == "":
+            return
+
+        self.__startTransfer(
+            filenames, False, rejects=rejects, duplicates=duplicates
+        )
+
+    def __reviewDuplicates(
+        self, duplicated: list[tuple[str, int]], duplicates: str
+    ):
+        """Report the rows of an import duplicating records.
+
+        The number of rows is shown in the status bar, flagged
+        rows are also listed in a message box.
+
+        Parameters
+        -----------------------
+        duplicated : list[tuple[str, int]]
+            (filename, line) of each duplicated row
+        duplicates : str
+            One of `DUPLICATE_MODES`
+        """
+        action = "skipped" if duplicates == "skip" else "imported, flagged"
+        summary = f"{len(duplicated)} duplicate rows {action}"
+        self.statusBar().showMessage(summary)
+
+        if duplicates != "flag" or not duplicated:
+            return
+
+        box = QMessageBox(
+            QMessageBox.Icon.Information,
+            "Duplicates",
+            f"{summary}.",
+            parent=self,
+        )
+        box.setDetailedText(
+            "\n".join(
+                f"{os.path.basename(filename)}:{line}"
+                for filename, line in duplicated
+            )
+        )
+        box.exec()
+
+    def __initDBView(self):
+        """Init models, forms and profile selector for the new DB."""
+        self.__models.initModels()
+        self.__formLst.setModels(
+            self.__models.listModel,
+            self.__models.sumModel,
+            self.__models.pivotModel,
+        )
+
+        self.__cmbProfile.setCurrentText(self.__models.profile())
+        self.__cmbProfile.setEnabled(True)
+
+        self.__models.listModel.rowEdited.connect(self.__resubmitFilter)
+
+        self.__models.listModel.setBatched(self.__actBatch.isChecked())
+        self.__models.listModel.pendingChanged.connect(self.__showPending)
+        self.__actBatch.setEnabled(True)
+        self.__showPending(0)
+
+        self.__startFilterWorker()
+
+    def __startFilterWorker(self):
+        """Start the filter thread on the current DB."""
+        self.__stopFilterWorker()
+
+        self.__filterThread = QThread(self)
+        self.__filterWorker = FilterWorker(self.__models.databaseName())
+        self.__filterWorker.moveToThread(self.__filterThread)
+
+        self.__filterWorker.ready.connect(self.__applyFilter)
+        self.__filterWorker.failed.connect(self.__reportFilterFailure)
+        # direct connection, closing the connection in its thread
+        self.__filterThread.finished.connect(
+            self.__filterWorker.stop, Qt.ConnectionType.DirectConnection
+        )
+
+        self.__filterThread.start()
+
+    def __stopFilterWorker(self):
+        """Stop the filter thread, if running."""
+        if self.__filterThread is None:
+            return
+
+        # results still queued are discarded
+        self.__filterGeneration += 1
+        self.__pendingFilter = None
+
+        self.__filterThread.quit()
+        self.__filterThread.wait()
+
+        self.__filterWorker.deleteLater()
+        self.__filterThread.deleteLater()
+
+        self.__filterWorker = None
+        self.__filterThread = None
+
+    def __resubmitFilter(self):
+        """Repeat the pending filter request after a change to the DB.
+
+        The result being computed may predate the change.
+        """
+        if self.__pendingFilter is not None:
+            self.__requestFilter(*self.__pendingFilter[:2])
+
+    def __settleEdits(self) -> bool:
+        """Ask whether to submit or discard the pending edits.
+
+        Returns
+        -----------------------
+        bool
+            `True` if no edit is left pending, `False` if the
+            user cancelled or the submission failed
+        """
+        listModel = self.__models.listModel
+        if listModel is None or not listModel.pendingEdits():
+            return True
+
+        answer = QMessageBox.question(
+            self,
+            "Pending edits",
+            "Submit the pending edits?",
+            QMessageBox.StandardButton.Save
+            | QMessageBox.StandardButton.Discard
+            | QMessageBox.StandardButton.Cancel,
+        )
+
+        if answer == QMessageBox.StandardButton.Discard:
+            listModel.revertAll()
+            return True
+
+        if answer == QMessageBox.StandardButton.Save:
+            try:
+                self.__models.submitEdits()
+            except DatabaseError as err:
+                ErrorMsg(err)
+                return False
+
+            self.__resubmitFilter()
+            return True
+
+        return False
+
     @QtCore.pyqtSlot()
     def __requestCreate(self):
         """Attempt creation of database."""
+        if not self.__settleEdits():
+            return
+
         filename = QFileDialog.getSaveFileName(
             self,
             "Select name for new database",
@@ -238,14 +812,14 @@ class MainWindow(QMainWindow):
             ErrorMsg(err)
             return
 
-        self.__models.initModels()
-        self.__formLst.setModels(
-            self.__models.listModel, self.__models.sumModel
-        )
+        self.__initDBView()
 
     @QtCore.pyqtSlot()
     def __requestOpen(self):
         """Attempt to open database."""
+        if not self.__settleEdits():
+            return
+
         filename = QFileDialog.getOpenFileName(
             self, "Select database to access"
         )[0]
@@ -259,36 +833,33 @@ class MainWindow(QMainWindow):
             ErrorMsg(err)
             return
 
-        self.__models.initModels()
-        self.__formLst.setModels(
-            self.__models.listModel, self.__models.sumModel
-        )
+        self.__initDBView()
 
     @QtCore.pyqtSlot()
     def __requestAdd(self):
         """Manually add expenses to the database."""
         self.__models.addDefaultRecord()
+        self.__resubmitFilter()
 
     @QtCore.pyqtSlot()
     def __requestRemove(self):
         """Attempt to remove the selected row in the view."""
         self.__models.removeRecords(self.__formLst.selection())
+        self.__resubmitFilter()
 
     @QtCore.pyqtSlot()
     def __requestImport(self):
-        """Collect filename from user and loads CSV data."""
-        filename = QFileDialog.getOpenFileName(self, "Specify file to import")[
-            0
-        ]
+        """Collect filenames from user and loads CSV data."""
+        filenames = QFileDialog.getOpenFileNames(
+            self, "Specify files to import"
+        )[0]
 
-        if filename == "":
+        if not filenames:
             return
 
-        try:
-            self.__models.importCSV(filename)
-        except DatabaseError as err:
-            ErrorMsg(err)
-            return
+        self.__startTransfer(
+            filenames, False, duplicates=self.__cmbDuplicates.currentData()
+        )
 
     @QtCore.pyqtSlot()
     def __requestExport(self):
@@ -303,8 +874,424 @@ class MainWindow(QMainWindow):
         if filename == "":
             return
 
+        # offering to restrict the export to the filtered records
+        dates = self.__models.dateFilter()
+        if dates is not None:
+            answer = QMessageBox.question(
+                self,
+                "Export",
+                f"Export only expenses between {dates[0]} and {dates[1]}?",
+            )
+            if answer != QMessageBox.StandardButton.Yes:
+                dates = None
+
+        self.__startTransfer([filename], True, dates)
+
+    @QtCore.pyqtSlot()
+    def __requestSnapshot(self):
+        """Start saving a snapshot of the database in a worker thread.
+
+        The database stays usable meanwhile, older snapshots are
+        rotated out.
+        """
+        if self.__snapshotThread is not None:
+            return
+
         try:
-            self.__models.saveCSV(filename)
+            database = self.__models.databaseName()
         except DatabaseError as err:
             ErrorMsg(err)
             return
+
+        self.__snapshotThread = QThread(self)
+        self.__snapshotWorker = SnapshotWorker(database)
+        self.__snapshotWorker.moveToThread(self.__snapshotThread)
+
+        self.__snapshotThread.started.connect(self.__snapshotWorker.run)
+        self.__snapshotWorker.succeeded.connect(self.__reportSnapshot)
+        self.__snapshotWorker.failed.connect(self.__reportFailure)
+        self.__snapshotWorker.finished.connect(self.__endSnapshot)
+
+        self.__actSnapshot.setEnabled(False)
+        self.__actRestore.setEnabled(False)
+        self.statusBar().showMessage("Saving snapshot...")
+
+        self.__snapshotThread.start()
+
+    @QtCore.pyqtSlot()
+    def __requestRestore(self):
+        """Collect snapshot from user and restore the database."""
+        try:
+            database = self.__models.databaseName()
+        except DatabaseError as err:
+            ErrorMsg(err)
+            return
+
+        filename = QFileDialog.getOpenFileName(
+            self,
+            "Select snapshot to restore",
+            database + SNAPSHOT_SUFFIX,
+            "Snapshots (*.db)",
+        )[0]
+
+        if filename == "":
+            return
+
+        if not self.__settleEdits():
+            return
+
+        answer = QMessageBox.question(
+            self,
+            "Restore",
+            f"Replace the database with {os.path.basename(filename)}? "
+            "Changes saved after the snapshot will be lost.",
+        )
+        if answer != QMessageBox.StandardButton.Yes:
+            return
+
+        # restoring needs the only connection to the DB,
+        # released by the views and the filter thread
+        self.__stopFilterWorker()
+        self.__formLst.clearModels()
+
+        try:
+            self.__models.restoreSnapshot(filename)
+        except DatabaseError as err:
+            ErrorMsg(err)
+
+        # reopened in any case, models are initialized again
+        self.__initDBView()
+
+    @QtCore.pyqtSlot(str)
+    def __requestProfile(self, name: str):
+        """Attempt to switch the performance profile of the database.
+
+        Parameters
+        -----------------------
+        name : str
+            Name of the selected profile
+        """
+        # journal mode changes need the only connection to the DB
+        self.__stopFilterWorker()
+
+        try:
+            self.__models.setProfile(name)
+        except DatabaseError as err:
+            ErrorMsg(err)
+
+        self.__cmbProfile.setCurrentText(self.__models.profile())
+
+        self.__startFilterWorker()
+
+    @QtCore.pyqtSlot(bool)
+    def __requestBatch(self, enabled: bool):
+        """Switch between immediate and batched edits.
+
+        Pending edits are settled before leaving batched mode.
+
+        Parameters
+        -----------------------
+        enabled : bool
+            `True` to hold edits until submitted
+        """
+        if not enabled and not self.__settleEdits():
+            # still batched, the toggle is restored silently
+            self.__actBatch.blockSignals(True)
+            self.__actBatch.setChecked(True)
+            self.__actBatch.blockSignals(False)
+            return
+
+        self.__models.listModel.setBatched(enabled)
+
+    @QtCore.pyqtSlot()
+    def __requestSubmit(self):
+        """Attempt to write the pending edits to the database."""
+        try:
+            self.__models.submitEdits()
+        except DatabaseError as err:
+            ErrorMsg(err)
+            return
+
+        self.__resubmitFilter()
+
+    @QtCore.pyqtSlot()
+    def __requestRevert(self):
+        """Discard the pending edits."""
+        self.__models.listModel.revertAll()
+
+    @QtCore.pyqtSlot(int)
+    def __showPending(self, count: int):
+        """Enable submission and reversion while edits are pending.
+
+        Parameters
+        -----------------------
+        count : int
+            Number of records with pending edits
+        """
+        self.__actSubmit.setEnabled(count > 0)
+        self.__actRevert.setEnabled(count > 0)
+        self.__actSubmit.setText(f"Submit ({count})" if count else "Submit")
+
+    @QtCore.pyqtSlot(object, str)
+    def __requestFilter(self, dates: list[str], text: str):
+        """Request the filter from the filter thread.
+
+        Supersedes previous requests, the result is applied by
+        `__applyFilter()`.
+
+        Parameters
+        -----------------------
+        dates : list[str]
+            [startDate, endDate], `None` to clear the date filter
+        text : str
+            Words searched in the justifications, empty to clear
+            the search
+        """
+        if self.__filterWorker is None:
+            return
+
+        sorting = self.__models.listModel.sorting()
+
+        # in-memory sums are cheap, unlike sums of a search
+        searching = bool(text.split())
+        try:
+            sums = searching and not self.__models.isSummaryCached(dates, text)
+        except DatabaseError as err:
+            ErrorMsg(err)
+            return
+
+        self.__filterGeneration += 1
+        self.__pendingFilter = (dates, text, sorting)
+        self.__filterWorker.request(
+            self.__filterGeneration, dates, text, sums, *sorting
+        )
+
+    @QtCore.pyqtSlot(int, int, list, object)
+    def __applyFilter(
+        self, generation: int, count: int, rows: list, sums: list
+    ):
+        """Apply the latest filter result and repaint the form.
+
+        Superseded results are discarded. The repaint is timed
+        with the filter, as the summary view is resized to its
+        new contents.
+
+        Parameters
+        -----------------------
+        generation : int
+            Number of the filter request
+        count : int
+            Number of records matching the filter
+        rows : list
+            Records of the first page of the list
+        sums : list
+            Sums of the amounts by type, `None` to compute them
+        """
+        if generation != self.__filterGeneration:
+            return
+
+        dates, text, sorting = self.__pendingFilter
+        self.__pendingFilter = None
+
+        tracer = self.__models.tracer
+
+        with tracer.operation("filter"):
+            try:
+                self.__models.applyFilterResult(
+                    dates, text, sorting, count, rows, sums
+                )
+            except DatabaseError as err:
+                ErrorMsg(err)
+                return
+
+            with tracer.operation("paint"):
+                self.__formLst.repaint()
+
+    @QtCore.pyqtSlot(int, str)
+    def __reportFilterFailure(self, generation: int, message: str):
+        """Report the failure of the latest filter request.
+
+        Parameters
+        -----------------------
+        generation : int
+            Number of the filter request
+        message : str
+            Description of the error
+        """
+        if generation != self.__filterGeneration:
+            return
+
+        self.__pendingFilter = None
+        ErrorMsg(DatabaseError(message))
+
+    @QtCore.pyqtSlot(object)
+    def __requestPivot(self, period: str):
+        """Attempt to switch the period of the pivot.
+
+        Parameters
+        -----------------------
+        period : str
+            Period of the pivot rows, `None` if the pivot is
+            hidden
+        """
+        try:
+            self.__models.setPivotPeriod(period)
+        except DatabaseError as err:
+            ErrorMsg(err)
+
+    @QtCore.pyqtSlot()
+    def __requestSaveTrace(self):
+        """Collect filename from user and dumps the traced queries."""
+        filename = QFileDialog.getSaveFileName(
+            self,
+            "Specify file for the trace",
+            None,
+            "JSON lines files (*.jsonl)",
+        )[0]
+
+        if filename == "":
+            return
+
+        try:
+            self.__models.tracer.dump(filename)
+        except OSError as err:
+            ErrorMsg(err)
+
+    @QtCore.pyqtSlot()
+    def __requestTimings(self):
+        """Show the histograms of the operation timings."""
+        TimingDialog(self, self.__models.tracer).exec()
+
+    @QtCore.pyqtSlot(str, float)
+    def __showLatency(self, name: str, ms: float):
+        """Show the latency of the last operation in the status bar.
+
+        Parameters
+        -----------------------
+        name : str
+            Name of the operation
+        ms : float
+            Duration of the operation, in milliseconds
+        """
+        self.__lblLatency.setText(f"{name}: {ms:.1f} ms")
+
+    @QtCore.pyqtSlot(int, int)
+    def __updateProgress(self, rows: int, nbytes: int):
+        """Update progress dialog of the current transfer.
+
+        Parameters
+        -----------------------
+        rows : int
+            Number of rows transferred so far
+        nbytes : int
+            Number of bytes read or written so far
+        """
+        if self.__worker is None:
+            return
+
+        # exports are measured in rows, imports in bytes
+        value = rows if self.__worker.isExport() else nbytes
+
+        self.__dlgProgress.setLabelText(f"{rows} rows, {nbytes} bytes")
+        self.__dlgProgress.setValue(min(value, self.__dlgProgress.maximum()))
+
+    @QtCore.pyqtSlot(str)
+    def __reportFailure(self, message: str):
+        """Report the failure of the current transfer or snapshot.
+
+        Parameters
+        -----------------------
+        message : str
+            Description of the error
+        """
+        ErrorMsg(DatabaseError(message))
+
+    @QtCore.pyqtSlot(list)
+    def __reportInvalid(self, errors: list):
+        """Store the invalid rows of the current import for review.
+
+        Reviewed by `__endTransfer()`, as skipping them starts
+        a new import.
+
+        Parameters
+        -----------------------
+        errors : list
+            (filename, line, column, reason) of each error
+        """
+        self.__invalidRows = (
+            errors,
+            self.__worker.filenames(),
+            self.__worker.rejects(),
+            self.__worker.duplicates(),
+        )
+
+    @QtCore.pyqtSlot(list)
+    def __reportDuplicates(self, duplicated: list):
+        """Store the duplicated rows of the current import for review.
+
+        Reported by `__endTransfer()`, with the progress dialog
+        closed.
+
+        Parameters
+        -----------------------
+        duplicated : list
+            (filename, line) of each duplicated row
+        """
+        self.__duplicateRows = (duplicated, self.__worker.duplicates())
+
+    @QtCore.pyqtSlot()
+    def __endTransfer(self):
+        """Clean up after the end of the current transfer."""
+        self.__dlgProgress.close()
+        self.__thread.quit()
+        self.__thread.wait()
+
+        self.__worker.deleteLater()
+        self.__thread.deleteLater()
+        self.__dlgProgress.deleteLater()
+
+        self.__worker = None
+        self.__thread = None
+        self.__dlgProgress = None
+
+        if self.__duplicateRows is not None:
+            duplicated, self.__duplicateRows = self.__duplicateRows, None
+            self.__reviewDuplicates(*duplicated)
+
+        if self.__invalidRows is not None:
+            invalid, self.__invalidRows = self.__invalidRows, None
+            self.__reviewInvalid(*invalid)
+
+    @QtCore.pyqtSlot()
+    def __refreshModels(self):
+        """Refresh models after a successful import."""
+        self.__models.refreshModels(appended=True)
+        self.__resubmitFilter()
+
+    @QtCore.pyqtSlot(str)
+    def __reportSnapshot(self, filename: str):
+        """Show the filename of the saved snapshot in the status bar.
+
+        Parameters
+        -----------------------
+        filename : str
+            Filename of the snapshot
+        """
+        self.statusBar().showMessage(f"Snapshot saved to {filename}")
+
+    @QtCore.pyqtSlot()
+    def __endSnapshot(self):
+        """Clean up after the end of the current snapshot."""
+        self.__snapshotThread.quit()
+        self.__snapshotThread.wait()
+
+        self.__snapshotWorker.deleteLater()
+        self.__snapshotThread.deleteLater()
+
+        self.__snapshotWorker = None
+        self.__snapshotThread = None
+
+        self.__actSnapshot.setEnabled(True)
+        self.__actRestore.setEnabled(True)
+        if self.statusBar().currentMessage() == "Saving snapshot...":
+            self.statusBar().clearMessage()
@@ -4,6 +4,10 @@ Classes
 -----------------------
 DatabaseError
     Subclassed exception for errors in db Connection.
+OperationCancelled
+    Subclassed exception for operations cancelled by the user.
+InvalidRows
+    Subclassed exception for CSV rows failing validation.
 ModelWrapper
     Wrapper for list and sum models.
 """
@@ -33,83 +37,436 @@ ModelWrapper
 # OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
 # SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
 
-from string import Template
+from collections import OrderedDict
+from collections.abc import Callable, Iterable
+from concurrent.futures import BrokenExecutor, ProcessPoolExecutor
+from typing import TextIO
+import bisect
 import csv
+import itertools
+import json
+import multiprocessing
 import os
+import math
+import re
+import shutil
 import datetime
 
-from PyQt6.QtCore import Qt, QPersistentModelIndex
-from PyQt6.QtWidgets import QWidget
-from PyQt6.QtSql import (
-    QSqlDatabase,
-    QSqlQuery,
-    QSqlTableModel,
-    QSqlQueryModel,
+from PyQt6.QtCore import Qt, QObject
+from PyQt6.QtSql import QSqlDatabase, QSqlQuery
+
+from modules.PagedTableModel import (
+    INCREMENTAL_LIMIT,
+    PagedTableModel,
+    searchCondition,
 )
+from modules.PivotModel import PivotModel
+from modules.PrefixSums import PrefixSums
+from modules.QueryCache import QueryCache
+from modules.QueryTracer import QueryTracer, traced
+from modules.SummaryModel import SummaryModel
+from modules.Validation import ValidationError, checkRow, parseFile
+
+
+# number of rows bound as a JSON array to each INSERT when importing
+IMPORT_BATCH_SIZE = 5000
+# number of rows written to file at once when exporting,
+# also the interval between progress reports
+EXPORT_CHUNK_SIZE = 5000
+# size of the output buffer when exporting
+EXPORT_BUFFER_SIZE = 1 << 20
+# number of ids bound to each DELETE statement
+# (at most 32766 variables per statement in SQLite)
+DELETE_CHUNK_SIZE = 5000
+
+# records below which the planner may legitimately prefer full
+# scans of 'expenses', not reported by `checkQueryPlans()`
+PLAN_CHECK_MIN_ROWS = 1000
+
+# number of summaries kept in memory
+SUMMARY_CACHE_SIZE = 64
+# number of daily pivots kept in memory, with their roll-ups
+PIVOT_CACHE_SIZE = 8
+
+# snapshots kept by default, older ones are removed
+SNAPSHOT_RETENTION = 10
+# directory of the snapshots, appended to the DB filename
+SNAPSHOT_SUFFIX = ".snapshots"
+# timestamp in the snapshot filenames, sorting chronologically
+SNAPSHOT_FORMAT = "%Y%m%d-%H%M%S-%f"
+
+# changes of the records since a checkpoint, one row per id, with
+# an operation marker: added records are found by id, edits and
+# removals in the 'expense_changes' log; records added and then
+# removed are omitted
+DELTA_QUERY = """
+    SELECT
+        CASE
+            WHEN e.id IS NULL THEN 'D'
+            WHEN c.op = 'I' THEN 'I'
+            ELSE 'U'
+        END,
+        c.id, e.date, e.type, e.amount, e.justification
+    FROM (
+        SELECT id, op, MIN(seq)
+        FROM expense_changes
+        WHERE seq > ? AND id <= ?
+        GROUP BY id
+    ) AS c
+    LEFT JOIN expenses AS e ON e.id = c.id
+    WHERE e.id IS NOT NULL OR c.op != 'I'
+    UNION ALL
+    SELECT 'I', id, date, type, amount, justification
+    FROM expenses
+    WHERE id > ? ;
+"""
+
+# periods of the pivots, from the finest
+PIVOT_PERIODS = ["day", "week", "month", "year"]
+
+# columns of the 'expenses' table
+EXPENSE_COLUMNS = ["id", "date", "type", "amount", "justification"]
+
+# SQLite settings applied when opening a DB, by profile name
+# (negative cache sizes are in KiB, mmap sizes in bytes);
+# temp_store=MEMORY is avoided, as it keeps the per-batch
+# savepoint journals of imports in memory and slows them down
+PROFILES = {
+    "safe": {
+        "journal_mode": "DELETE",
+        "synchronous": "FULL",
+        "cache_size": -2000,
+        "mmap_size": 0,
+        "temp_store": "DEFAULT",
+    },
+    "fast": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -65536,
+        "mmap_size": 268435456,
+        "temp_store": "DEFAULT",
+    },
+    "bulk-load": {
+        "journal_mode": "WAL",
+        "synchronous": "OFF",
+        "cache_size": -262144,
+        "mmap_size": 1073741824,
+        "temp_store": "DEFAULT",
+    },
+}
+# profile of new DBs, and of DBs created by older versions
+DEFAULT_PROFILE = "fast"
+
+# indexes of 'expenses': by date and by each sortable column
+# (each implicitly followed by id, for keyset pagination),
+# and by content, covering the summaries by date range and the
+# duplicate checks of imports
+EXPENSE_INDEXES = {
+    "date_index": "date",
+    "type_index": "type",
+    "amount_index": "amount",
+    "justification_index": "justification",
+    "content_index": "date, type, amount, justification",
+}
+# indexes created by older versions, superseded by the above
+OBSOLETE_INDEXES = ["date_type_amount_index"]
+
+# handling of imported rows duplicating records
+DUPLICATE_MODES = ["skip", "flag"]
+# records matched by each row of a JSON batch, among the ones
+# up to an id, by position in the batch
+DUPLICATE_QUERY = """
+    SELECT b.key, b.value ->> 1, b.value ->> 2, b.value ->> 3,
+        b.value ->> 4, COUNT(*)
+    FROM json_each(?) AS b
+    JOIN expenses AS e
+        ON e.date = b.value ->> 1
+        AND e.type = b.value ->> 2
+        AND e.amount = b.value ->> 3
+        AND e.justification = b.value ->> 4
+    WHERE e.id <= ?
+    GROUP BY b.key
+    ORDER BY b.key ;
+"""
 
 
 class DatabaseError(Exception):
     """Subclassed exception for errors in db Connection."""
 
 
+class OperationCancelled(DatabaseError):
+    """Subclassed exception for operations cancelled by the user."""
+
+
+class InvalidRows(DatabaseError):
+    """Subclassed exception for CSV rows failing validation.
+
+    Public attributes
+    -----------------------
+    errors : list[tuple[str, int, str, str]]
+        (filename, line, column, reason) of each error, grouped
+        by file, the column is empty for errors of whole rows
+
+    Public methods
+    -----------------------
+    __init__(list[tuple[str, int, str, str]])
+        Construct class instance.
+    """
+
+    def __init__(self, errors: list[tuple[str, int, str, str]]):
+        """Construct class instance.
+
+        Parameters
+        -----------------------
+        errors : list[tuple[str, int, str, str]]
+            (filename, line, column, reason) of each error
+        """
+        rows = len({(filename, line) for filename, line, _, _ in errors})
+        filename, line, column, reason = errors[0]
+        field = f" :: {column}" if column else ""
+
+        super().__init__(
+            f"{len(errors)} errors in {rows} rows, first :: "
+            f"{filename} :: row {line}{field} :: {reason}"
+        )
+
+        self.errors = errors
+
+
 class ModelWrapper:
     """Wrapper for list and sum models.
 
     Public attributes
     -----------------------
-    listModel: QSqlTableModel
+    listModel: PagedTableModel
         Model for general expense data
-    sumModel: QSqlQueryModel
+    sumModel: SummaryModel
         Model for expense amounts aggregated by type
+    pivotModel: PivotModel
+        Model for expense statistics by period and type
+    tracer: QueryTracer
+        Timer of the operations and queries on the DB
 
     Private attributes
     -----------------------
-    __parent: QWidget
-        Parent QWidget
+    __parent: QObject
+        Parent of the models
+    __connName: str
+        Name of the database connection, `None` for default
     __conn: QSqlDatabase
         Database connection
+    __statements: QueryCache
+        Prepared statements on the connection
+    __dates: list[str]
+        Currently applied date filter, `None` if unfiltered
+    __text: str
+        Currently applied search text, empty if unfiltered
+    __sums: PrefixSums
+        Index of the amounts by type and date
+    __summaries: OrderedDict[tuple, tuple]
+        Cached summaries by normalized filter, least recently
+        used first
+    __summaryHits: int
+        Number of summaries served from the cache
+    __summaryMisses: int
+        Number of summaries computed
+    __pivots: OrderedDict[tuple, dict[str, tuple]]
+        Cached pivots by normalized filter, least recently used
+        first, each by period
+    __period: str
+        Period of the pivot model, `None` while not shown
+    __dataVersion: int
+        'data_version' of the connection when the index of the
+        amounts was built, changed by external writers
+    __lastId: int
+        Highest id of the records known to the list model,
+        records with higher ids are appended to it
 
     Public methods
     -----------------------
-    __init__()
+    __init__(QObject, str)
         Construct class instance.
     createDB(str)
         Create and init connection to new DB.
     openDB(str)
         Create and init connection to existing DB.
+    profile() -> str
+        Return the performance profile of the connected DB.
+    setProfile(str)
+        Store and apply the performance profile of the DB.
+    databaseName() -> str
+        Return the filename of the connected DB.
     initModels()
-        Initialize list and sum models.
-    applyDateFilter(list[str])
-        Apply filter to models with the specified dates.
+        Initialize list, sum and pivot models.
+    refreshModels(bool)
+        Re-run the queries of list, sum and pivot models.
+    applyDateFilter(list[str], str)
+        Apply filter to models with the specified dates and text.
+    applyFilterResult(list[str], str, tuple, int, list[list], list)
+        Apply a filter whose rows were fetched elsewhere.
+    dateFilter() -> list[str]
+        Return the currently applied date filter.
+    searchText() -> str
+        Return the currently applied search text.
+    countRecords(list[str]) -> int
+        Return the number of records in the DB.
+    dateRange() -> list[str]
+        Return the dates of the oldest and newest records.
+    summary(list[str], str) -> list[tuple[str, float]]
+        Return the sums of the amounts by type in a date range.
+    isSummaryCached(list[str], str) -> bool
+        Return whether a summary would be served from the cache.
+    summaryCacheStats() -> tuple[int, int]
+        Return the number of summary cache hits and misses.
+    pivot(str, list[str], str) -> list[tuple]
+        Return statistics of the amounts by period and type.
+    pivotPeriod() -> str
+        Return the period of the pivot model.
+    setPivotPeriod(str)
+        Change the period of the pivot model.
+    checkSummary(list[str]) -> bool
+        Check the summary against aggregation in SQL.
+    checkQueryPlans() -> list[str]
+        Return the queries falling back to a full table scan.
     addDefaultRecord()
         Add a default record to the end of the DB.
-    removeRecords(list[QPersistentModelIndex])
-        Remove the records with the given indices from the model.
-    importCSV(str)
+    removeRecords(list[int])
+        Remove the records in the given rows of the list model.
+    submitEdits()
+        Write the pending edits of the list model to the DB.
+    importCSV(str, Callable[[int, int], bool], str, str, list) -> list[tuple]
         Append the contents of a CSV file to the database.
-    saveCSV(str)
+    importCSVs(list[str], Callable[[int, int], bool], int, str, str, list) -> list[tuple]
+        Append the contents of several CSV files to the database.
+    saveCSV(str, Callable[[int, int], bool], list[str], list[str])
         Dump the database to a CSV file.
+    writeCSV(TextIO, Callable[[int, int], bool], list[str], list[str]) -> int
+        Stream the database as CSV to an open text file.
+    checkpoints() -> list[tuple[str, int, str]]
+        Return the checkpoints of the delta exports.
+    removeCheckpoint(str)
+        Remove a checkpoint of the delta exports.
+    saveDelta(str, str, Callable[[int, int], bool], bool)
+        Dump the changes since a checkpoint to a CSV file.
+    writeDelta(TextIO, str, Callable[[int, int], bool], bool) -> int
+        Stream the changes since a checkpoint as CSV.
+    snapshot(str, int) -> str
+        Save a consistent copy of the DB, rotating older copies.
+    snapshots(str) -> list[str]
+        Return the snapshots of the DB, newest first.
+    restoreSnapshot(str)
+        Replace the DB with one of its snapshots.
     closeDB()
         Close connection with DB.
+
+    Private methods
+    -----------------------
+    __writeRows(QSqlQuery, int, TextIO, Callable[[int, int], bool]) -> int
+        Write the rows of an executed query as CSV.
+    __snapshotDirectory(str) -> str
+        Return the directory of the snapshots.
+    __checkSnapshot(str)
+        Check that a file is an intact snapshot.
+    __addConnection(str)
+        Add and open the connection to the given DB.
+    __initSettings()
+        Create the 'settings' table, if missing.
+    __applyProfile(str)
+        Apply a performance profile to the connection.
+    __initIndexes()
+        Create the indexes of 'expenses', if missing.
+    __initAggregates()
+        Create and backfill the 'daily_totals' table, if missing.
+    __initSearch()
+        Create and backfill the 'expenses_fts' index, if missing.
+    __initChangeLog()
+        Create the 'expense_changes' and 'checkpoints' tables, if
+        missing.
+    __pruneChanges()
+        Remove the changes seen by all checkpoints.
+    __buildSums()
+        Rebuild the index of the amounts from 'daily_totals'.
+    __checkDataVersion()
+        Rebuild the index of the amounts after external writes.
+    __maxId() -> int
+        Return the highest id of the records.
+    __syncAppended(list[int])
+        Insert the appended records in the list model.
+    __summaryKey(list[str], str) -> tuple
+        Return the cache key of a summary.
+    __cacheSummary(tuple, list[tuple[str, float]])
+        Store a summary in the cache.
+    __touchDates(Iterable[str])
+        Discard the cached summaries and pivots including any of
+        the dates.
+    __recordEdit(list, list)
+        Account for an in-cell edit in the index of the amounts.
+    __recordEdits(list[list], list[list])
+        Account for edited records in the index of the amounts.
+    __updateSummary()
+        Recompute the sum and pivot models for the current filter.
+    __updatePivot()
+        Recompute the pivot model for the current filter.
+    __dailyPivot(list[str], str) -> list[tuple]
+        Return statistics of the amounts by day and type.
+    __rollUp(list[tuple], str) -> list[tuple]
+        Merge daily statistics into coarser periods.
+    __datedQuery(str, list[str], str, str) -> QSqlQuery
+        Return a prepared query restricted to a date range.
+    __editedRecords(str) -> list[list]
+        Return the records with the given ids.
+    __insertBatch(QSqlQuery, str, list[int], list[tuple]) -> int
+        Insert a batch of rows with the prepared query.
+    __checkDuplicates(str, list[int], int, dict[tuple, int]) -> list[int]
+        Return the positions of the rows duplicating records.
+    __dropRows(str, list[int], list[int]) -> tuple[str, list[int]]
+        Remove rows from a batch.
+    __skipFailed(str, list[tuple], list[tuple], list[list[str]])
+        Report the rows rejected by the DB as skipped.
+    __commitImport(set[str])
+        Commit an import and refresh the models.
+    __writeRejects(str, list[list[str]])
+        Write the fields of the skipped rows to a CSV file.
     """
 
-    def __init__(self, parent: QWidget):
+    def __init__(self, parent: QObject, connName: str = None):
         """Construct class instance.
 
         Parameters
         -----------------------
-        parent : QWidget
-            Parent QWidget
+        parent : QObject
+            Parent of the models
+        connName : str
+            Name of the database connection, required when
+            used outside the GUI thread, default connection if
+            `None`
         """
         super().__init__()
 
         self.listModel = None
         self.sumModel = None
+        self.pivotModel = None
+        self.tracer = None
         self.__parent = None
+        self.__connName = None
         self.__conn = None
+        self.__statements = None
+        self.__dates = None
+        self.__text = ""
+        self.__sums = PrefixSums()
+        self.__summaries = OrderedDict()
+        self.__summaryHits = 0
+        self.__summaryMisses = 0
+        self.__pivots = OrderedDict()
+        self.__period = None
+        self.__dataVersion = None
+        self.__lastId = 0
 
         self.__parent = parent
+        self.__connName = connName
+        self.tracer = QueryTracer(parent)
 
+    @traced
     def createDB(self, filename: str):
         """Create and init connection to new DB.
 
@@ -127,21 +484,12 @@ class ModelWrapper:
         if os.path.isfile(filename):
             raise DatabaseError("Database already exists")
 
-        # Closing connection if currently active
-        if self.__conn is not None:
-            if self.__conn.isOpen():
-                self.__conn.close()
-
-        # opening default connection
-        self.__conn = QSqlDatabase.addDatabase("QSQLITE")
-        self.__conn.setDatabaseName(filename)
+        self.__addConnection(filename)
 
-        # misc errors in connection opening
-        chk = self.__conn.open()
-        if not chk:
-            raise DatabaseError(self.__conn.lastError().text())
+        self.__initSettings()
+        self.__applyProfile(self.profile())
 
-        query = QSqlQuery()
+        query = QSqlQuery(self.__conn)
 
         # creating and indexing 'expenses' table
         # checks here because SQLite is "dynamically" typed
@@ -159,11 +507,16 @@ class ModelWrapper:
                     CHECK (LENGTH(justification) <= 100)
             ) ;
         """
-        query.exec(command)
-        query.exec("CREATE INDEX date_index ON expenses(date) ;")
-
+        self.tracer.exec(query, command)
         query.finish()
 
+        self.__initIndexes()
+        self.__initAggregates()
+        self.__initSearch()
+        self.__initChangeLog()
+        self.__buildSums()
+
+    @traced
     def openDB(self, filename: str):
         """Create and init connection to existing DB.
 
@@ -183,28 +536,16 @@ class ModelWrapper:
         if not os.path.isfile(filename):
             raise DatabaseError("Database does not exists")
 
-        # Closing connection if currently active
-        if self.__conn is not None:
-            if self.__conn.isOpen():
-                self.__conn.close()
-
-        # opening default connection
-        self.__conn = QSqlDatabase.addDatabase("QSQLITE")
-        self.__conn.setDatabaseName(filename)
-
-        # misc errors in connection opening
-        chk = self.__conn.open()
-        if not chk:
-            raise DatabaseError(self.__conn.lastError().text())
+        self.__addConnection(filename)
 
-        query = QSqlQuery()
+        query = QSqlQuery(self.__conn)
 
         # checking for existence of 'expenses' table
         if "expenses" not in self.__conn.tables():
             raise DatabaseError("Invalid database schema")
 
         # checking for validity of schema of 'expense' table
-        query.exec("PRAGMA TABLE_INFO('expenses') ;")
+        self.tracer.exec(query, "PRAGMA TABLE_INFO('expenses') ;")
 
         names, types, notnulls = [], [], []
         nm, tp, nn = 1, 2, 3
@@ -214,18 +555,12 @@ class ModelWrapper:
             names.append(query.value(nm))
             types.append(query.value(tp))
             notnulls.append(query.value(nn))
+        self.tracer.fetched(len(names))
 
         # checking against expected output
         # (apparently for SQLite3 primary keys are not not-null...)
         if (
-            names
-            != [
-                "id",
-                "date",
-                "type",
-                "amount",
-                "justification",
-            ]
+            names != EXPENSE_COLUMNS
             or types
             != [
                 "INTEGER",
@@ -240,8 +575,23 @@ class ModelWrapper:
 
         query.finish()
 
-    def initModels(self):
-        """Initialize list and sum models.
+        # migrating databases created by older versions
+        self.__initSettings()
+        self.__applyProfile(self.profile())
+
+        self.__initIndexes()
+        self.__initAggregates()
+        self.__initSearch()
+        self.__initChangeLog()
+        self.__buildSums()
+
+    def profile(self) -> str:
+        """Return the performance profile of the connected DB.
+
+        Returns
+        -----------------------
+        str
+            One of the keys of `PROFILES`
 
         Raises
         -----------------------
@@ -250,39 +600,129 @@ class ModelWrapper:
         if self.__conn is None:
             raise DatabaseError("Uninitialized connection")
 
-        # using default connection
-        self.listModel = QSqlTableModel(self.__parent)
-        self.listModel.setTable("expenses")
-        # sorting by date (newest first)
-        self.listModel.setSort(0, Qt.SortOrder.DescendingOrder)
-
-        # setting edit strategy
-        self.listModel.setEditStrategy(
-            QSqlTableModel.EditStrategy.OnFieldChange
+        query = QSqlQuery(self.__conn)
+        self.tracer.exec(
+            query, "SELECT value FROM settings WHERE key = 'profile' ;"
         )
 
-        self.listModel.select()
+        found = query.next()
+        name = query.value(0) if found else DEFAULT_PROFILE
+        self.tracer.fetched(int(found))
+        query.finish()
+
+        return name if name in PROFILES else DEFAULT_PROFILE
+
+    def setProfile(self, name: str):
+        """Store and apply the performance profile of the DB.
+
+        Parameters
+        -----------------------
+        name : str
+            One of the keys of `PROFILES`
+
+        Raises
+        -----------------------
+        - DatabaseError if invalid Connection
+        - DatabaseError if unknown profile
+        - DatabaseError if the profile cannot be applied
+        """
+        if self.__conn is None:
+            raise DatabaseError("Uninitialized connection")
 
-        # sum model
-        self.sumModel = QSqlQueryModel()
+        if name not in PROFILES:
+            raise DatabaseError(f"Unknown profile '{name}'")
 
-        # setting basic query
-        self.sumModel.setQuery(
+        self.__applyProfile(name)
+
+        query = QSqlQuery(self.__conn)
+        query.prepare(
             """
-            SELECT type, SUM(amount)
-            FROM expenses
-            GROUP BY type
-            ORDER BY type ;
+            INSERT INTO settings (key, value) VALUES ('profile', ?)
+            ON CONFLICT (key) DO UPDATE SET value = excluded.value ;
+        """
+        )
+        query.addBindValue(name)
+        chk = self.tracer.exec(query)
+        query.finish()
+        if not chk:
+            raise DatabaseError("Error in storing profile")
+
+    def databaseName(self) -> str:
+        """Return the filename of the connected DB.
+
+        Returns
+        -----------------------
+        str
+            Filename of the DB
+
+        Raises
+        -----------------------
+        - DatabaseError if invalid Connection
+        """
+        if self.__conn is None:
+            raise DatabaseError("Uninitialized connection")
+
+        return self.__conn.databaseName()
+
+    @traced
+    def initModels(self):
+        """Initialize list, sum and pivot models.
+
+        Raises
+        -----------------------
+        - DatabaseError if invalid Connection
         """
+        if self.__conn is None:
+            raise DatabaseError("Uninitialized connection")
+
+        self.listModel = PagedTableModel(
+            self.__parent, self.__conn, self.tracer, self.__statements
         )
 
-        # has to be done after setting up the query
-        # or names will be overridden by the query fields
-        colnames = ["type", "sum"]
-        for i, c in enumerate(colnames):
-            self.sumModel.setHeaderData(i, Qt.Orientation.Horizontal, c)
+        # in-cell edits are tracked for the summary
+        self.listModel.rowEdited.connect(self.__recordEdit)
+
+        self.listModel.select()
+        self.__lastId = self.__maxId()
+
+        # sum model, computed from the index of the amounts
+        self.sumModel = SummaryModel(self.__parent)
+        # pivot model, computed only while shown
+        self.pivotModel = PivotModel(self.__parent)
+        self.__dates = None
+        self.__text = ""
+        self.__updateSummary()
+
+    @traced
+    def refreshModels(self, appended: bool = False):
+        """Re-run the queries of list, sum and pivot models.
 
-    def applyDateFilter(self, dates: list[str]):
+        Required after changes performed through other
+        connections, keeps the current filter.
+
+        Parameters
+        -----------------------
+        appended : bool
+            Whether the other connections only appended records,
+            as imports do, which are then inserted in the list
+            model without resetting it
+        """
+        if self.listModel is None:
+            return
+
+        # unknown changes, no cached summary can be trusted
+        self.__buildSums()
+        self.__summaries.clear()
+        self.__pivots.clear()
+
+        if appended:
+            self.__syncAppended()
+            self.__updateSummary()
+        else:
+            self.applyDateFilter(self.__dates, self.__text)
+
+    @traced
+    def applyDateFilter(self, dates: list[str], text: str = ""):
         """Apply data filter to the model.
 
         Parameters
@@ -290,6 +730,9 @@ class ModelWrapper:
         dates : list[str]
             - [startDate, endDate], both included
             - `None` removes all filters
+        text : str
+            Words searched in the justifications, see
+            `searchCondition()`, empty for no search
 
         Raises
         -----------------------
@@ -299,171 +742,2785 @@ class ModelWrapper:
         if self.__conn is None:
             raise DatabaseError("Uninitialized connection")
 
-        # string template for the sum model
-        queryTemplate = Template(
-            """
-            SELECT type, SUM(amount)
-            FROM expenses
-            WHERE $flt
-            GROUP BY type
-            ORDER BY type ;
+        # summary first, validates dates
+        self.sumModel.setSums(self.summary(dates, text))
+
+        self.listModel.setFilter(dates, text)
+        self.listModel.select()
+        self.__lastId = self.__maxId()
+
+        self.__dates = dates
+        self.__text = text
+        self.__updatePivot()
+
+    @traced
+    def applyFilterResult(
+        self,
+        dates: list[str],
+        text: str,
+        sorting: tuple[int, Qt.SortOrder],
+        count: int,
+        rows: list[list],
+        sums: list[tuple[str, float]] = None,
+    ):
+        """Apply a filter whose rows were fetched elsewhere.
+
+        Reuses the row count and the first page computed on
+        another connection (see `FilterWorker`), requerying only
+        if the list has been sorted differently since.
+
+        Parameters
+        -----------------------
+        dates : list[str]
+            - [startDate, endDate], both included
+            - `None` removes all filters
+        text : str
+            Words searched in the justifications, empty for no
+            search
+        sorting : tuple[int, Qt.SortOrder]
+            Sort column and order of the fetched rows
+        count : int
+            Number of records matching the filter
+        rows : list[list]
+            Records of the first page of the list
+        sums : list[tuple[str, float]]
+            Sums of the amounts by type of the filtered records,
+            cached as summary, computed by `summary()` if `None`
+
+        Raises
+        -----------------------
+        - DatabaseError if invalid Connection
+        - DatabaseError if invalid date range
         """
-        )
+        if self.__conn is None:
+            raise DatabaseError("Uninitialized connection")
 
-        # setting query filter
-        flt = "TRUE"
-        if dates is not None:
-            if len(dates) != 2:
-                raise DatabaseError("Invalid date interval")
+        # summary first, validates dates
+        if sums is None:
+            sums = self.summary(dates, text)
+        else:
+            key = self.__summaryKey(dates, text)
+            self.__checkDataVersion()
+            self.__cacheSummary(key, sums)
+        self.sumModel.setSums(sums)
+
+        self.listModel.setFilter(dates, text)
+        if self.listModel.sorting() == tuple(sorting):
+            self.listModel.selectFrom(count, rows)
+        else:
+            self.listModel.select()
+        self.__lastId = self.__maxId()
 
-            flt = f"date BETWEEN '{dates[0]}' AND '{dates[1]}'"
+        self.__dates = dates
+        self.__text = text
+        self.__updatePivot()
 
-        # applying filters, setQuery() requires WHERE
-        self.listModel.setFilter(flt)
-        self.sumModel.setQuery(queryTemplate.substitute(flt=flt))
+    def dateFilter(self) -> list[str]:
+        """Return the currently applied date filter.
 
-        self.listModel.select()
+        Returns
+        -----------------------
+        list[str]
+            [startDate, endDate], `None` if unfiltered
+        """
+        return self.__dates
 
-    def addDefaultRecord(self):
-        """Add a default record to the end of the DB.
+    def searchText(self) -> str:
+        """Return the currently applied search text.
+
+        Returns
+        -----------------------
+        str
+            Words searched in the justifications, empty if
+            unfiltered
+        """
+        return self.__text
+
+    def countRecords(self, dates: list[str] = None) -> int:
+        """Return the number of records in the DB.
+
+        Parameters
+        -----------------------
+        dates : list[str]
+            [startDate, endDate], both included, `None` to count
+            all records
+
+        Returns
+        -----------------------
+        int
+            Number of records in the 'expenses' table
 
         Raises
         -----------------------
-        - DatabaseError if unsuccessful addition
+        - DatabaseError if invalid Connection
+        - DatabaseError if invalid date range
         """
-        # empty reference record
-        record = self.listModel.record()
+        if self.__conn is None:
+            raise DatabaseError("Uninitialized connection")
 
-        # allowing to auto-set primary key
-        record.remove(0)
+        query = self.__datedQuery("SELECT COUNT(*) FROM expenses", dates)
+        self.tracer.exec(query)
+        query.next()
+        count = query.value(0)
+        self.tracer.fetched(1)
+        query.finish()
 
-        # setting default values for other fields
-        # notice the realigned indices
-        record.setValue(0, datetime.date.today().strftime("%Y-%m-%d"))
-        record.setValue(1, "-")
-        record.setValue(2, 0.0)
-        record.setValue(3, "-")
+        return count
 
-        # inserting in last position
-        chk = self.listModel.insertRecord(-1, record)
-        if not chk:
-            raise DatabaseError("Error in inserting record")
+    def dateRange(self) -> list[str]:
+        """Return the dates of the oldest and newest records.
 
-    def removeRecords(self, indices: list[QPersistentModelIndex]):
-        """Remove the records with the given indices from the model.
+        Returns
+        -----------------------
+        list[str]
+            [firstDate, lastDate], `None` if the DB is empty
 
         Raises
         -----------------------
-        - DatabaseError if unsuccessful removal
+        - DatabaseError if invalid Connection
         """
-        for i, index in enumerate(indices):
-            chk = self.listModel.removeRow(index.row())
-            if not chk:
-                raise DatabaseError(f"Error in deleting record {i}")
+        if self.__conn is None:
+            raise DatabaseError("Uninitialized connection")
 
-        # updating changes
-        self.listModel.select()
+        query = QSqlQuery(self.__conn)
+        self.tracer.exec(query, "SELECT MIN(date), MAX(date) FROM expenses ;")
+        query.next()
+        dates = [query.value(0), query.value(1)]
+        self.tracer.fetched(1)
+        query.finish()
 
-    def importCSV(self, filename: str):
-        """Append the contents of a CSV file to the database.
+        return None if dates[0] in (None, "") else dates
+
+    @traced
+    def summary(
+        self, dates: list[str], text: str = ""
+    ) -> list[tuple[str, float]]:
+        """Return the sums of the amounts by type in a date range.
+
+        Computed from the in-memory index of the amounts, without
+        querying the DB, unless searching the justifications.
+        The last `SUMMARY_CACHE_SIZE` summaries are cached, until
+        a change to a date in their range, or an external write.
 
         Parameters
         -----------------------
-        filename : str
-            Filename of the output CSV file
+        dates : list[str]
+            [startDate, endDate], both included, `None` for all
+            records
+        text : str
+            Words searched in the justifications, empty for all
+            records
+
+        Returns
+        -----------------------
+        list[tuple[str, float]]
+            (type, sum) tuples, ordered by type
+
+        Raises
+        -----------------------
+        - DatabaseError if invalid date range
+        """
+        key = self.__summaryKey(dates, text)
+
+        self.__checkDataVersion()
+        if key in self.__summaries:
+            self.__summaryHits += 1
+            self.__summaries.move_to_end(key)
+            return list(self.__summaries[key])
+
+        self.__summaryMisses += 1
+
+        if not text.split():
+            sums = self.__sums.sums(dates)
+        else:
+            # the index of the amounts knows nothing of the text
+            query = self.__datedQuery(
+                "SELECT type, SUM(amount) FROM expenses",
+                dates,
+                "GROUP BY type ORDER BY type",
+                text,
+            )
+            query.setForwardOnly(True)
+            if not self.tracer.exec(query):
+                err = query.lastError().text()
+                query.finish()
+                raise DatabaseError(err)
+
+            sums = []
+            while query.next():
+                sums.append((query.value(0), query.value(1)))
+            self.tracer.fetched(len(sums))
+            query.finish()
+
+        self.__cacheSummary(key, sums)
+
+        return sums
+
+    def isSummaryCached(self, dates: list[str], text: str = "") -> bool:
+        """Return whether a summary would be served from the cache.
+
+        Parameters
+        -----------------------
+        dates : list[str]
+            [startDate, endDate], both included, `None` for all
+            records
+        text : str
+            Words searched in the justifications, empty for all
+            records
+
+        Returns
+        -----------------------
+        bool
+            `True` if `summary()` would not compute the sums
+
+        Raises
+        -----------------------
+        - DatabaseError if invalid date range
+        """
+        key = self.__summaryKey(dates, text)
+        self.__checkDataVersion()
+
+        return key in self.__summaries
+
+    def summaryCacheStats(self) -> tuple[int, int]:
+        """Return the number of summary cache hits and misses.
+
+        Returns
+        -----------------------
+        tuple[int, int]
+            Summaries served from the cache, and computed
+        """
+        return self.__summaryHits, self.__summaryMisses
+
+    @traced
+    def pivot(
+        self, period: str, dates: list[str] = None, text: str = ""
+    ) -> list[tuple]:
+        """Return statistics of the amounts by period and type.
+
+        Computed in one grouped pass over the records, by day
+        and type, then rolled up to the requested period. The
+        last `PIVOT_CACHE_SIZE` daily pivots are cached with their
+        roll-ups, so that changing period does not query the DB
+        again, until a change to a date in their range, or an
+        external write.
+
+        Parameters
+        -----------------------
+        period : str
+            One of `PIVOT_PERIODS`, labelled as 'yyyy-mm-dd',
+            'yyyy-Www' (ISO weeks), 'yyyy-mm' and 'yyyy'
+        dates : list[str]
+            [startDate, endDate], both included, `None` for all
+            records
+        text : str
+            Words searched in the justifications, empty for all
+            records
+
+        Returns
+        -----------------------
+        list[tuple]
+            (period, type, sum, count, avg, min, max) tuples,
+            ordered by period and type
 
         Raises
         -----------------------
         - DatabaseError if invalid Connection
-        - DatabaseError if file does not exist
-        - DatabaseError if invalid file content
+        - DatabaseError if invalid period
+        - DatabaseError if invalid date range
+        - DatabaseError if query errors
         """
         if self.__conn is None:
             raise DatabaseError("Uninitialized connection")
 
-        # handreading of csv file required
-        # (QSqlQuery cannot pass .mode commands,
-        # and record() is not iterable)
-        with open(filename, "r", newline="", encoding="utf-8") as csvfile:
-            reader = csv.reader(csvfile, quotechar='"')
+        if period not in PIVOT_PERIODS:
+            raise DatabaseError(f"Invalid period '{period}'")
 
-            try:
-                for ir, row in enumerate(reader):
-                    # empty record will contain info on the table schema
-                    record = self.listModel.record()
-
-                    # if 1st field is left unspecified, auto-assign
-                    # (id, primary key, autoincrement integer)
-                    # setting NULL does not work, found this solution
-                    if row[0] == "":
-                        record.remove(0)
-                    else:
-                        record.setValue(0, row[0])
-
-                    # setting other fields
-                    for ic, col in enumerate(row[1:]):
-                        record.setValue(ic, col)
-
-                    # inserting at last position
-                    chk = self.listModel.insertRecord(-1, record)
-                    if not chk:
-                        raise DatabaseError(
-                            f"Error in inserting record {ir + 1}"
-                        )
+        key = self.__summaryKey(dates, text)
 
-                    # SQLite performs type-checking here
-                    # inserting line-by-line to check lines
-                    chk = self.listModel.submitAll()
-                    if not chk:
-                        raise DatabaseError(f"Error in inserting row {ir + 1}")
-            except csv.Error as err:
-                raise DatabaseError(
-                    f"CSV file error :: line {reader.line_num} :: {err}"
-                )
+        self.__checkDataVersion()
+        if key in self.__pivots:
+            self.__pivots.move_to_end(key)
+        else:
+            self.__pivots[key] = {"day": self.__dailyPivot(dates, text)}
+            if len(self.__pivots) > PIVOT_CACHE_SIZE:
+                self.__pivots.popitem(last=False)
 
-            self.listModel.select()
+        pivots = self.__pivots[key]
+        if period not in pivots:
+            pivots[period] = self.__rollUp(pivots["day"], period)
 
-    def saveCSV(self, filename: str):
-        """Dump the database to a CSV file.
+        return list(pivots[period])
+
+    def pivotPeriod(self) -> str:
+        """Return the period of the pivot model.
+
+        Returns
+        -----------------------
+        str
+            One of `PIVOT_PERIODS`, `None` while not shown
+        """
+        return self.__period
+
+    def setPivotPeriod(self, period: str):
+        """Change the period of the pivot model.
+
+        The pivot model follows the filter of the list model
+        while a period is set.
 
         Parameters
         -----------------------
-        filename : str
-            Filename of the output CSV file
+        period : str
+            One of `PIVOT_PERIODS`, `None` when the pivot is not
+            shown, to skip its updates
+
+        Raises
+        -----------------------
+        - DatabaseError if invalid period
+        - DatabaseError if query errors
+        """
+        if period is not None and period not in PIVOT_PERIODS:
+            raise DatabaseError(f"Invalid period '{period}'")
+
+        self.__period = period
+        self.__updatePivot()
+
+    def checkSummary(self, dates: list[str]) -> bool:
+        """Check the summary against aggregation in SQL.
+
+        Parameters
+        -----------------------
+        dates : list[str]
+            [startDate, endDate], both included, `None` for all
+            records
+
+        Returns
+        -----------------------
+        bool
+            `True` if `summary()` matches the sums by type
+            computed on 'expenses', up to rounding errors
 
         Raises
         -----------------------
         - DatabaseError if invalid Connection
+        - DatabaseError if invalid date range
         """
         if self.__conn is None:
             raise DatabaseError("Uninitialized connection")
 
-        query = QSqlQuery()
+        query = self.__datedQuery(
+            "SELECT type, SUM(amount) FROM expenses",
+            dates,
+            "GROUP BY type ORDER BY type",
+        )
+        self.tracer.exec(query)
 
-        # extracting data from database
-        query.exec("SELECT * FROM expenses ;")
+        expected = []
+        while query.next():
+            expected.append((query.value(0), query.value(1)))
+        self.tracer.fetched(len(expected))
+        query.finish()
 
-        # number of fields
-        COLS = query.record().count()
+        computed = self.summary(dates)
 
-        # handwriting of csv file required
-        # (QSqlQuery cannot pass .mode commands,
-        # and record() is not iterable)
-        with open(filename, "w", newline="", encoding="utf-8") as csvfile:
-            writer = csv.writer(
-                csvfile,
-                quotechar='"',
-                quoting=csv.QUOTE_NONNUMERIC,
-            )
+        return [t for t, _ in computed] == [t for t, _ in expected] and all(
+            math.isclose(c, e, rel_tol=1e-9, abs_tol=1e-6)
+            for (_, c), (_, e) in zip(computed, expected)
+        )
 
-            while query.next():
-                writer.writerow([query.value(i) for i in range(COLS)])
+    @traced
+    def checkQueryPlans(self) -> list[str]:
+        """Return the queries falling back to a full table scan.
 
-        query.finish()
+        Runs EXPLAIN QUERY PLAN on the queries issued by the
+        wrapper and by the list model, for all sort columns and
+        orders, with and without date filter and text search. Full
+        exports are exempt, as they read the whole table by design.
+        Tables with fewer than `PLAN_CHECK_MIN_ROWS` records are
+        not checked: once analyzed, scanning them is cheaper than
+        going through an index, and the planner may choose to.
 
-    def closeDB(self):
-        """Close connection with DB."""
+        Returns
+        -----------------------
+        list[str]
+            "statement :: plan step" for each full scan of
+            'expenses', empty if none or if the table is small
+
+        Raises
+        -----------------------
+        - DatabaseError if invalid Connection
+        - DatabaseError if a query cannot be planned
+        """
         if self.__conn is None:
             raise DatabaseError("Uninitialized connection")
 
-        self.__conn.close()
+        if self.countRecords() < PLAN_CHECK_MIN_ROWS:
+            return []
+
+        dates = ["2000-01-01", "2000-12-31"]
+        ids = json.dumps([1])
+        search, match = searchCondition("x")
+
+        queries = [
+            ("SELECT COUNT(*) FROM expenses ;", []),
+            (
+                "SELECT COUNT(*) FROM expenses WHERE date BETWEEN ? AND ? ;",
+                dates,
+            ),
+            ("SELECT MIN(date), MAX(date) FROM expenses ;", []),
+            (
+                "SELECT type, SUM(amount) FROM expenses "
+                "GROUP BY type ORDER BY type ;",
+                [],
+            ),
+            (
+                "SELECT type, SUM(amount) FROM expenses "
+                "WHERE date BETWEEN ? AND ? GROUP BY type ORDER BY type ;",
+                dates,
+            ),
+            (
+                "SELECT type, SUM(amount) FROM expenses "
+                f"WHERE date BETWEEN ? AND ? AND {search} "
+                "GROUP BY type ORDER BY type ;",
+                dates + [match],
+            ),
+            (
+                "SELECT date, type, SUM(amount), COUNT(*), MIN(amount), "
+                "MAX(amount) FROM expenses "
+                "GROUP BY date, type ORDER BY date, type ;",
+                [],
+            ),
+            (
+                "SELECT date, type, SUM(amount), COUNT(*), MIN(amount), "
+                "MAX(amount) FROM expenses WHERE date BETWEEN ? AND ? "
+                "GROUP BY date, type ORDER BY date, type ;",
+                dates,
+            ),
+            (
+                f"SELECT {', '.join(EXPENSE_COLUMNS)} FROM expenses "
+                "WHERE date BETWEEN ? AND ? ;",
+                dates,
+            ),
+            (
+                "SELECT date, type, SUM(amount), COUNT(*) FROM expenses "
+                "WHERE id IN (SELECT value FROM json_each(?)) "
+                "GROUP BY date, type ;",
+                [ids],
+            ),
+            (
+                "DELETE FROM expenses "
+                "WHERE id IN (SELECT value FROM json_each(?)) ;",
+                [ids],
+            ),
+            (DELTA_QUERY, [0, 0, 0]),
+            (
+                DUPLICATE_QUERY,
+                [json.dumps([[None, dates[0], "x", 0.0, "x"]]), 0],
+            ),
+        ]
+        queries += [
+            (f"UPDATE expenses SET {column} = ? WHERE id = ? ;", [None, 1])
+            for column in EXPENSE_COLUMNS[1:]
+        ]
+
+        # list model queries, on a separate model to keep the view
+        model = PagedTableModel(
+            None, self.__conn, self.tracer, self.__statements
+        )
+        for column in range(len(EXPENSE_COLUMNS)):
+            for order in Qt.SortOrder:
+                for filter_, text in itertools.product(
+                    (None, dates), ("", "x")
+                ):
+                    model.setFilter(filter_, text)
+                    model.sort(column, order)
+                    queries += model.queries()
+
+        scans = []
+        query = QSqlQuery(self.__conn)
+        for command, values in queries:
+            query.prepare(f"EXPLAIN QUERY PLAN {command}")
+            for value in values:
+                query.addBindValue(value)
+            if not self.tracer.exec(query):
+                err = query.lastError().text()
+                query.finish()
+                raise DatabaseError(f"Error in planning '{command}' :: {err}")
+
+            # plan steps are in the 'detail' column
+            details = []
+            while query.next():
+                details.append(query.value(3))
+            self.tracer.fetched(len(details))
+            query.finish()
+
+            # scans through an index are not full scans, nor are
+            # table scans in id order, which stop after a page
+            paged = "LIMIT" in command and not any(
+                "TEMP B-TREE" in detail for detail in details
+            )
+            scans += [
+                f"{command} :: {detail}"
+                for detail in details
+                if re.fullmatch(r"SCAN expenses( AS \w+)?", detail)
+                and not paged
+            ]
+
+        return scans
+
+    @traced
+    def addDefaultRecord(self):
+        """Add a default record to the DB.
+
+        Raises
+        -----------------------
+        - DatabaseError if unsuccessful addition
+        """
+        if self.__conn is None:
+            raise DatabaseError("Uninitialized connection")
+
+        # default values, primary key auto-set
+        values = [datetime.date.today().strftime("%Y-%m-%d"), "-", 0.0, "-"]
+
+        query = self.__statements.query(
+            "INSERT INTO expenses (date, type, amount, justification) "
+            "VALUES (?, ?, ?, ?) ;",
+            values,
+        )
+
+        chk = self.tracer.exec(query)
+        rowid = query.lastInsertId()
+        query.finish()
+        if not chk:
+            raise DatabaseError("Error in inserting record")
+
+        self.__sums.add(values[0], values[1], values[2])
+        self.__touchDates([values[0]])
+
+        self.__syncAppended([rowid])
+        self.__updateSummary()
+
+    @traced
+    def removeRecords(self, rows: list[int]):
+        """Remove the records in the given rows of the list model.
+
+        Records are identified by id before any removal, and
+        deleted in chunks of `DELETE_CHUNK_SIZE` within one
+        transaction.
+
+        Parameters
+        -----------------------
+        rows : list[int]
+            Rows of the records in the list model
+
+        Raises
+        -----------------------
+        - DatabaseError if invalid Connection
+        - DatabaseError if unsuccessful removal
+        """
+        if self.__conn is None:
+            raise DatabaseError("Uninitialized connection")
+
+        rowids = self.listModel.rowIds(rows)
+        # ordered as the rows, for the list model
+        positions = dict(zip(rowids, sorted(set(rows))))
+
+        if not self.__conn.transaction():
+            raise DatabaseError(self.__conn.lastError().text())
+
+        # ids are bound as a single JSON array per chunk,
+        # Qt binds long lists of placeholders slowly
+        aggregate = QSqlQuery(self.__conn)
+        aggregate.setForwardOnly(True)
+        aggregate.prepare(
+            """
+            SELECT date, type, SUM(amount), COUNT(*)
+            FROM expenses
+            WHERE id IN (SELECT value FROM json_each(?))
+            GROUP BY date, type ;
+        """
+        )
+
+        query = QSqlQuery(self.__conn)
+        query.prepare(
+            """
+            DELETE FROM expenses
+            WHERE id IN (SELECT value FROM json_each(?)) ;
+        """
+        )
+
+        # removed amounts and counts by date and type,
+        # for the index of the amounts
+        removed = []
+        for i in range(0, len(rowids), DELETE_CHUNK_SIZE):
+            chunk = json.dumps(rowids[i : i + DELETE_CHUNK_SIZE])
+
+            aggregate.addBindValue(chunk)
+            self.tracer.exec(aggregate)
+            before = len(removed)
+            while aggregate.next():
+                removed.append(
+                    (
+                        aggregate.value(0),
+                        aggregate.value(1),
+                        aggregate.value(2),
+                        aggregate.value(3),
+                    )
+                )
+            self.tracer.fetched(len(removed) - before)
+            aggregate.finish()
+
+            query.addBindValue(chunk)
+            if not self.tracer.exec(query):
+                err = query.lastError().text()
+                query.finish()
+                self.__conn.rollback()
+                raise DatabaseError(f"Error in deleting records :: {err}")
+
+        query.finish()
+        if not self.__conn.commit():
+            err = self.__conn.lastError().text()
+            self.__conn.rollback()
+            raise DatabaseError(err)
+
+        for date, type_, amount, count in removed:
+            self.__sums.add(date, type_, -amount, -count)
+        self.__touchDates(date for date, _, _, _ in removed)
+
+        # updating changes, the last id is kept as ids are never
+        # reused (AUTOINCREMENT)
+        self.listModel.applyChanges(positions, {})
+        self.__updateSummary()
+
+    @traced
+    def submitEdits(self):
+        """Write the pending edits of the list model to the DB.
+
+        All edits are written within one transaction, the sum
+        and pivot models are recomputed once. Pending edits are
+        kept if unsuccessful.
+
+        Raises
+        -----------------------
+        - DatabaseError if invalid Connection
+        - DatabaseError if unsuccessful edit
+        """
+        if self.__conn is None:
+            raise DatabaseError("Uninitialized connection")
+
+        pending = self.listModel.pendingEdits()
+        if not pending:
+            return
+
+        if not self.__conn.transaction():
+            raise DatabaseError(self.__conn.lastError().text())
+
+        # records before and after the edits, for the index of
+        # the amounts; ids bound as a single JSON array
+        rowids = json.dumps(list(pending))
+        old = self.__editedRecords(rowids)
+
+        # rows located only if they may move
+        columns = {column for values in pending.values() for column in values}
+        reorders = self.listModel.reorders(columns)
+        if reorders:
+            before = self.listModel.positions(pending)
+        else:
+            before = self.listModel.cachedRows(pending)
+
+        for rowid, values in pending.items():
+            # column names come from the table schema
+            assignments = ", ".join(f"{column} = ?" for column in values)
+            query = self.__statements.query(
+                f"UPDATE expenses SET {assignments} WHERE id = ? ;",
+                list(values.values()) + [rowid],
+            )
+            if not self.tracer.exec(query):
+                err = query.lastError().text()
+                query.finish()
+                self.__conn.rollback()
+                raise DatabaseError(f"Error in editing record {rowid} :: {err}")
+            query.finish()
+
+        new = self.__editedRecords(rowids)
+
+        if not self.__conn.commit():
+            err = self.__conn.lastError().text()
+            self.__conn.rollback()
+            raise DatabaseError(err)
+
+        self.listModel.revertAll()
+        self.listModel.applyChanges(
+            before, self.listModel.positions(pending) if reorders else before
+        )
+        self.__recordEdits(old, new)
+
+    def __editedRecords(self, rowids: str) -> list[list]:
+        """Return the records with the given ids.
+
+        Parameters
+        -----------------------
+        rowids : str
+            JSON array of the ids
+
+        Returns
+        -----------------------
+        list[list]
+            Values of the records, ordered as the columns
+        """
+        query = self.__statements.query(
+            "SELECT * FROM expenses "
+            "WHERE id IN (SELECT value FROM json_each(?)) ;",
+            [rowids],
+        )
+        query.setForwardOnly(True)
+        self.tracer.exec(query)
+
+        ncols = query.record().count()
+        rows = []
+        while query.next():
+            rows.append([query.value(i) for i in range(ncols)])
+        self.tracer.fetched(len(rows))
+        query.finish()
+
+        return rows
+
+    @traced
+    def importCSV(
+        self,
+        filename: str,
+        progress: Callable[[int, int], bool] = None,
+        rejects: str = None,
+        duplicates: str = None,
+        duplicated: list[tuple[str, int]] = None,
+    ) -> list[tuple[str, int, str, str]]:
+        """Append the contents of a CSV file to the database.
+
+        Rows are validated (see `Validation.checkRow()`) and
+        inserted in batches of `IMPORT_BATCH_SIZE` within one
+        transaction, in a single read of the file. All invalid
+        rows are reported: without `rejects`, writing stops at
+        the first of them, the rest of the file is only validated
+        and the whole import is rolled back; with `rejects`,
+        valid rows are imported and invalid ones written to the
+        `rejects` file.
+
+        With `duplicates`, rows repeating the date, type, amount
+        and justification of records already in the database are
+        skipped or flagged: the n-th occurrence of some values in
+        the file is a duplicate if the database held at least n
+        such records before the import. Repeated rows within the
+        file are kept, overlapping files are not doubled. Each
+        check is a lookup in 'content_index'.
+
+        Parameters
+        -----------------------
+        filename : str
+            Filename of the input CSV file
+        progress : Callable[[int, int], bool]
+            Called every `IMPORT_BATCH_SIZE` rows with the number
+            of rows imported and bytes read so far, returning
+            `False` cancels the import, may be `None`
+        rejects : str
+            Filename of the CSV file receiving the fields of the
+            invalid rows, only written if any, `None` to reject
+            the whole import instead
+        duplicates : str
+            One of `DUPLICATE_MODES`, "skip" to leave out the rows
+            duplicating records, "flag" to import and report them,
+            `None` to import all rows unchecked
+        duplicated : list[tuple[str, int]]
+            Receives (filename, line) of the rows duplicating
+            records, skipped or flagged, may be `None`
+
+        Returns
+        -----------------------
+        list[tuple[str, int, str, str]]
+            (filename, line, column, reason) of the errors of the
+            skipped rows, empty if all rows were imported
+
+        Raises
+        -----------------------
+        - DatabaseError if invalid Connection
+        - DatabaseError if invalid duplicate mode
+        - DatabaseError if file does not exist
+        - DatabaseError if the file is not valid CSV
+        - InvalidRows if invalid rows, without `rejects`
+        - OperationCancelled if cancelled by `progress`
+        """
+        if self.__conn is None:
+            raise DatabaseError("Uninitialized connection")
+
+        if duplicates is not None and duplicates not in DUPLICATE_MODES:
+            raise DatabaseError(f"Invalid duplicate mode {duplicates}")
+        if duplicated is None:
+            duplicated = []
+
+        query = QSqlQuery(self.__conn)
+        query.prepare(
+            """
+            INSERT INTO expenses (id, date, type, amount, justification)
+            VALUES (?, ?, ?, ?, ?) ;
+        """
+        )
+
+        if not self.__conn.transaction():
+            raise DatabaseError(self.__conn.lastError().text())
+
+        # (filename, line, column, reason) of each error,
+        # and fields of the rejected rows
+        errors, skipped = [], []
+        # rows rejected by the DB, only skipped with `rejects`
+        failed = [] if rejects is not None else None
+        # records before the import, and occurrences in the file
+        # of the values of the duplicated ones
+        since, seen = self.__maxId(), {}
+
+        try:
+            # handreading of csv file required
+            # (QSqlQuery cannot pass .mode commands)
+            with open(filename, "r", newline="", encoding="utf-8") as csvfile:
+                reader = csv.reader(csvfile, quotechar='"')
+
+                # rows of the current batch, with their line numbers
+                rows, lines = [], []
+                read, imported = 0, 0
+                # dates of the imported rows, for the summary cache
+                touched = set()
+
+                try:
+                    for row in reader:
+                        read += 1
+                        values, problems = checkRow(row)
+                        if problems:
+                            errors += [
+                                (filename, reader.line_num, column, reason)
+                                for column, reason in problems
+                            ]
+                            skipped.append(row)
+                            # strict imports only validate from here
+                            if rejects is None:
+                                rows, lines = [], []
+                        elif rejects is not None or not errors:
+                            rows.append(values)
+                            lines.append(reader.line_num)
+
+                        if len(rows) == IMPORT_BATCH_SIZE:
+                            batch = json.dumps(rows)
+                            if duplicates is not None:
+                                found = self.__checkDuplicates(
+                                    batch, lines, since, seen
+                                )
+                                duplicated += [
+                                    (filename, lines[i]) for i in found
+                                ]
+                                if duplicates == "skip":
+                                    batch, lines = self.__dropRows(
+                                        batch, lines, found
+                                    )
+                            imported += self.__insertBatch(
+                                query, batch, lines, failed
+                            )
+                            touched.update(r[1] for r in rows)
+                            rows, lines = [], []
+
+                        # the text layer reads ahead, the position
+                        # of the underlying buffer is approximate
+                        if (
+                            read % IMPORT_BATCH_SIZE == 0
+                            and progress is not None
+                            and not progress(imported, csvfile.buffer.tell())
+                        ):
+                            raise OperationCancelled("Import cancelled")
+                except csv.Error as err:
+                    raise DatabaseError(
+                        f"CSV file error :: line {reader.line_num} :: {err}"
+                    ) from err
+                except UnicodeDecodeError as err:
+                    raise DatabaseError(
+                        f"Invalid encoding after line {reader.line_num}"
+                    ) from err
+
+                if rows:
+                    batch = json.dumps(rows)
+                    if duplicates is not None:
+                        found = self.__checkDuplicates(
+                            batch, lines, since, seen
+                        )
+                        duplicated += [(filename, lines[i]) for i in found]
+                        if duplicates == "skip":
+                            batch, lines = self.__dropRows(batch, lines, found)
+                    imported += self.__insertBatch(query, batch, lines, failed)
+                    touched.update(r[1] for r in rows)
+
+                if progress is not None:
+                    progress(imported, csvfile.buffer.tell())
+
+            if errors and rejects is None:
+                raise InvalidRows(errors)
+
+            self.__skipFailed(filename, failed, errors, skipped)
+            if skipped:
+                self.__writeRejects(rejects, skipped)
+        except DatabaseError:
+            query.finish()
+            self.__conn.rollback()
+            raise
+        except OSError as err:
+            query.finish()
+            self.__conn.rollback()
+            raise DatabaseError(f"{err}") from err
+
+        query.finish()
+        self.__commitImport(touched)
+
+        return errors
+
+    @traced
+    def importCSVs(
+        self,
+        filenames: list[str],
+        progress: Callable[[int, int], bool] = None,
+        workers: int = None,
+        rejects: str = None,
+        duplicates: str = None,
+        duplicated: list[tuple[str, int]] = None,
+    ) -> list[tuple[str, int, str, str]]:
+        """Append the contents of several CSV files to the database.
+
+        Files are parsed and validated in parallel by a pool of
+        processes (see `Validation.parseFile()`), while this
+        connection inserts their batches as they become available,
+        in the order of the files, within one transaction. Invalid
+        rows are handled as in `importCSV()`: without `rejects`
+        writing stops at the first file including any, the other
+        files are only validated and the whole import is rolled
+        back. Duplicates are handled as in `importCSV()`, each
+        file is checked against the records before it, including
+        the ones imported from the previous files.
+
+        Parameters
+        -----------------------
+        filenames : list[str]
+            Filenames of the input CSV files
+        progress : Callable[[int, int], bool]
+            Called after each file with the number of rows and
+            bytes imported so far, returning `False` cancels the
+            import, may be `None`
+        workers : int
+            Maximum number of parsing processes, the number of
+            CPUs if `None`, files are parsed in this process if 1
+        rejects : str
+            Filename of the CSV file receiving the fields of the
+            invalid rows of all files, only written if any, `None`
+            to reject the whole import instead
+        duplicates : str
+            One of `DUPLICATE_MODES`, "skip" to leave out the rows
+            duplicating records, "flag" to import and report them,
+            `None` to import all rows unchecked
+        duplicated : list[tuple[str, int]]
+            Receives (filename, line) of the rows duplicating
+            records, skipped or flagged, may be `None`
+
+        Returns
+        -----------------------
+        list[tuple[str, int, str, str]]
+            (filename, line, column, reason) of the errors of the
+            skipped rows, empty if all rows were imported
+
+        Raises
+        -----------------------
+        - DatabaseError if invalid Connection
+        - DatabaseError if invalid duplicate mode
+        - DatabaseError if a file does not exist
+        - DatabaseError if a file is not valid CSV
+        - DatabaseError if a parsing process fails
+        - InvalidRows if invalid rows, without `rejects`
+        - OperationCancelled if cancelled by `progress`
+        """
+        if self.__conn is None:
+            raise DatabaseError("Uninitialized connection")
+
+        if duplicates is not None and duplicates not in DUPLICATE_MODES:
+            raise DatabaseError(f"Invalid duplicate mode {duplicates}")
+        if duplicated is None:
+            duplicated = []
+
+        if workers is None:
+            workers = os.cpu_count() or 1
+        workers = min(workers, len(filenames))
+
+        query = QSqlQuery(self.__conn)
+        query.prepare(
+            """
+            INSERT INTO expenses (id, date, type, amount, justification)
+            VALUES (?, ?, ?, ?, ?) ;
+        """
+        )
+
+        if not self.__conn.transaction():
+            raise DatabaseError(self.__conn.lastError().text())
+
+        # (filename, line, column, reason) of each error,
+        # and fields of the rejected rows
+        errors, skipped = [], []
+
+        pool = None
+        try:
+            sizes = [os.path.getsize(filename) for filename in filenames]
+
+            # spawned, as forking a multi-threaded process is unsafe
+            batchSizes = itertools.repeat(IMPORT_BATCH_SIZE)
+            if workers > 1:
+                pool = ProcessPoolExecutor(
+                    workers, mp_context=multiprocessing.get_context("spawn")
+                )
+                parsed = pool.map(parseFile, filenames, batchSizes)
+            else:
+                parsed = map(parseFile, filenames, batchSizes)
+
+            imported, nbytes = 0, 0
+            # dates of the imported rows, for the summary cache
+            touched = set()
+
+            for filename, size, (batches, dates, invalid) in zip(
+                filenames, sizes, parsed
+            ):
+                for line, fields, problems in invalid:
+                    errors += [
+                        (filename, line, column, reason)
+                        for column, reason in problems
+                    ]
+                    skipped.append(fields)
+
+                # strict imports only validate, after the first error
+                if rejects is not None or not errors:
+                    # rows rejected by the DB, only skipped with `rejects`
+                    failed = [] if rejects is not None else None
+                    # records before the file, and occurrences in it
+                    # of the values of the duplicated ones
+                    since, seen = self.__maxId(), {}
+                    try:
+                        for batch, lines in batches:
+                            if duplicates is not None:
+                                found = self.__checkDuplicates(
+                                    batch, lines, since, seen
+                                )
+                                duplicated += [
+                                    (filename, lines[i]) for i in found
+                                ]
+                                if duplicates == "skip":
+                                    batch, lines = self.__dropRows(
+                                        batch, lines, found
+                                    )
+                            imported += self.__insertBatch(
+                                query, batch, lines, failed
+                            )
+                    except DatabaseError as err:
+                        raise DatabaseError(f"{filename} :: {err}") from err
+
+                    self.__skipFailed(filename, failed, errors, skipped)
+                    touched.update(dates)
+
+                nbytes += size
+
+                if progress is not None and not progress(imported, nbytes):
+                    raise OperationCancelled("Import cancelled")
+
+            if errors and rejects is None:
+                raise InvalidRows(errors)
+            if skipped:
+                self.__writeRejects(rejects, skipped)
+        except DatabaseError:
+            query.finish()
+            self.__conn.rollback()
+            raise
+        except (ValidationError, OSError) as err:
+            query.finish()
+            self.__conn.rollback()
+            raise DatabaseError(f"{err}") from err
+        except BrokenExecutor as err:
+            query.finish()
+            self.__conn.rollback()
+            raise DatabaseError(f"Parsing process failed :: {err}") from err
+        finally:
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
+
+        query.finish()
+        self.__commitImport(touched)
+
+        return errors
+
+    def __insertBatch(
+        self,
+        query: QSqlQuery,
+        batch: str,
+        lines: list[int],
+        failed: list[tuple[int, list, str]] = None,
+    ) -> int:
+        """Insert a batch of rows with the prepared query.
+
+        The batch is inserted by a single statement, reading the
+        rows from a JSON array: triggers updating 'expenses_fts'
+        flush their pending index data once per statement.
+
+        Parameters
+        -----------------------
+        query : QSqlQuery
+            Prepared INSERT query of a single row, replayed to
+            locate errors
+        batch : str
+            JSON array of the rows to insert, each as returned
+            by `Validation.checkRow()`
+        lines : list[int]
+            Line numbers of the rows, for error reporting
+        failed : list[tuple[int, list, str]]
+            Receives (line, values, message) of the rows rejected
+            by the DB, which are skipped, `None` to raise instead
+
+        Returns
+        -----------------------
+        int
+            Number of inserted rows
+
+        Raises
+        -----------------------
+        - DatabaseError if any row is rejected, without `failed`
+        """
+        # savepoint allows to undo partial insertions of a failed batch
+        sp = QSqlQuery(self.__conn)
+        self.tracer.exec(sp, "SAVEPOINT batch ;")
+
+        insert = self.__statements.query(
+            """
+            INSERT INTO expenses (id, date, type, amount, justification)
+            SELECT value ->> 0, value ->> 1, value ->> 2, value ->> 3,
+                value ->> 4
+            FROM json_each(?) ;
+            """,
+            [batch],
+        )
+
+        # SQLite performs type-checking here
+        chk = self.tracer.exec(insert)
+        insert.finish()
+        if chk:
+            self.tracer.exec(sp, "RELEASE batch ;")
+            return len(lines)
+
+        self.tracer.exec(sp, "ROLLBACK TO batch ;")
+
+        # replaying the batch row-by-row to locate the failing lines
+        inserted = 0
+        for row, line in zip(json.loads(batch), lines):
+            for value in row:
+                query.addBindValue(value)
+
+            if self.tracer.exec(query):
+                inserted += 1
+            elif failed is not None:
+                failed.append((line, row, query.lastError().text()))
+            else:
+                raise DatabaseError(
+                    f"Error in inserting row {line} :: "
+                    f"{query.lastError().text()}"
+                )
+
+        return inserted
+
+    def __checkDuplicates(
+        self, batch: str, lines: list[int], since: int, seen: dict[tuple, int]
+    ) -> list[int]:
+        """Return the positions of the rows duplicating records.
+
+        Each row is looked up in 'content_index', among the
+        records with id up to `since`: the rows imported by the
+        same file are not counted.
+
+        Parameters
+        -----------------------
+        batch : str
+            JSON array of the rows, each as returned by
+            `Validation.checkRow()`
+        lines : list[int]
+            Line numbers of the rows
+        since : int
+            Highest id of the records before the file
+        seen : dict[tuple, int]
+            Occurrences in the file of the values of the rows
+            matching any record, by (date, type, amount,
+            justification), updated
+
+        Returns
+        -----------------------
+        list[int]
+            Positions in the batch of the duplicates, ascending
+
+        Raises
+        -----------------------
+        - DatabaseError if unsuccessful lookup
+        """
+        query = self.__statements.query(DUPLICATE_QUERY, [batch, since])
+        query.setForwardOnly(True)
+        if not self.tracer.exec(query):
+            err = query.lastError().text()
+            query.finish()
+            raise DatabaseError(
+                f"Error in checking rows {lines[0]}-{lines[-1]} :: {err}"
+            )
+
+        found, fetched = [], 0
+        while query.next():
+            fetched += 1
+            values = tuple(query.value(i) for i in range(1, 5))
+            seen[values] = seen.get(values, 0) + 1
+            if seen[values] <= query.value(5):
+                found.append(query.value(0))
+        self.tracer.fetched(fetched)
+        query.finish()
+
+        return found
+
+    def __dropRows(
+        self, batch: str, lines: list[int], positions: list[int]
+    ) -> tuple[str, list[int]]:
+        """Remove rows from a batch.
+
+        Parameters
+        -----------------------
+        batch : str
+            JSON array of the rows
+        lines : list[int]
+            Line numbers of the rows
+        positions : list[int]
+            Positions in the batch of the rows to remove
+
+        Returns
+        -----------------------
+        tuple[str, list[int]]
+            JSON array and line numbers of the remaining rows
+        """
+        if not positions:
+            return batch, lines
+
+        dropped = set(positions)
+        rows = json.loads(batch)
+        kept = [i for i in range(len(rows)) if i not in dropped]
+
+        return json.dumps([rows[i] for i in kept]), [lines[i] for i in kept]
+
+    def __skipFailed(
+        self,
+        filename: str,
+        failed: list[tuple[int, list, str]],
+        errors: list[tuple[str, int, str, str]],
+        skipped: list[list[str]],
+    ):
+        """Report the rows rejected by the DB as skipped.
+
+        Parameters
+        -----------------------
+        filename : str
+            Filename of the CSV file of the rows
+        failed : list[tuple[int, list, str]]
+            (line, values, message) of the rejected rows, as
+            filled by `__insertBatch()`, may be `None`
+        errors : list[tuple[str, int, str, str]]
+            Receives (filename, line, column, reason) of the
+            errors, with empty column
+        skipped : list[list[str]]
+            Receives the fields of the rejected rows
+        """
+        for line, values, message in failed or []:
+            errors.append((filename, line, "", message))
+            skipped.append(["" if v is None else f"{v}" for v in values])
+
+    def __commitImport(self, touched: set[str]):
+        """Commit an import and refresh the models.
+
+        Parameters
+        -----------------------
+        touched : set[str]
+            Dates of the imported rows
+
+        Raises
+        -----------------------
+        - DatabaseError if the commit fails, rolling back
+        """
+        if not self.__conn.commit():
+            err = self.__conn.lastError().text()
+            self.__conn.rollback()
+            raise DatabaseError(err)
+
+        # bulk changes, rebuilding from the aggregates is cheaper
+        self.__buildSums()
+        self.__touchDates(touched)
+
+        # refreshing models only once
+        if self.listModel is not None:
+            self.__syncAppended()
+            self.__updateSummary()
+
+    def __writeRejects(self, filename: str, rows: list[list[str]]):
+        """Write the fields of the skipped rows to a CSV file.
+
+        Parameters
+        -----------------------
+        filename : str
+            Filename of the output CSV file, overwritten
+        rows : list[list[str]]
+            Fields of the skipped rows, as read
+
+        Raises
+        -----------------------
+        - OSError if the file cannot be written
+        """
+        with open(filename, "w", newline="", encoding="utf-8") as csvfile:
+            csv.writer(csvfile).writerows(rows)
+
+    def saveCSV(
+        self,
+        filename: str,
+        progress: Callable[[int, int], bool] = None,
+        dates: list[str] = None,
+        columns: list[str] = None,
+    ):
+        """Dump the database to a CSV file.
+
+        Parameters
+        -----------------------
+        filename : str
+            Filename of the output CSV file
+        progress : Callable[[int, int], bool]
+            Called after each chunk with the number of rows and
+            bytes written so far, returning `False` cancels the
+            export and removes the file, may be `None`
+        dates : list[str]
+            [startDate, endDate], both included, only the
+            records in this range are exported, `None` to export
+            all records
+        columns : list[str]
+            Subset of `EXPENSE_COLUMNS` to export, in order,
+            `None` to export all columns
+
+        Raises
+        -----------------------
+        - DatabaseError if invalid Connection
+        - DatabaseError if invalid date range
+        - DatabaseError if invalid columns
+        - OperationCancelled if cancelled by `progress`
+        """
+        try:
+            with open(
+                filename,
+                "w",
+                buffering=EXPORT_BUFFER_SIZE,
+                newline="",
+                encoding="utf-8",
+            ) as csvfile:
+                self.writeCSV(csvfile, progress, dates, columns)
+        except OperationCancelled:
+            # partial dumps are not kept
+            os.remove(filename)
+            raise
+
+    @traced
+    def writeCSV(
+        self,
+        csvfile: TextIO,
+        progress: Callable[[int, int], bool] = None,
+        dates: list[str] = None,
+        columns: list[str] = None,
+    ) -> int:
+        """Stream the database as CSV to an open text file.
+
+        Rows are read from a forward-only query and written in
+        chunks of `EXPORT_CHUNK_SIZE`, memory usage does not
+        depend on the size of the table. The file may be a pipe,
+        such as `sys.stdout`.
+
+        Parameters
+        -----------------------
+        csvfile : TextIO
+            Output file, opened with `newline=""`
+        progress : Callable[[int, int], bool]
+            Called after each chunk with the number of rows and
+            bytes written so far (0 bytes if the file is not
+            seekable), returning `False` cancels the export,
+            may be `None`
+        dates : list[str]
+            [startDate, endDate], both included, only the
+            records in this range are exported, `None` to export
+            all records
+        columns : list[str]
+            Subset of `EXPENSE_COLUMNS` to export, in order,
+            `None` to export all columns
+
+        Returns
+        -----------------------
+        int
+            Number of exported records
+
+        Raises
+        -----------------------
+        - DatabaseError if invalid Connection
+        - DatabaseError if invalid date range
+        - DatabaseError if invalid columns
+        - OperationCancelled if cancelled by `progress`
+        """
+        if self.__conn is None:
+            raise DatabaseError("Uninitialized connection")
+
+        if columns is None:
+            columns = EXPENSE_COLUMNS
+        elif not columns or not set(columns) <= set(EXPENSE_COLUMNS):
+            raise DatabaseError("Invalid columns")
+
+        # column names are validated, dates are bound
+        query = self.__datedQuery(
+            f"SELECT {', '.join(columns)} FROM expenses", dates
+        )
+        # no caching of visited rows
+        query.setForwardOnly(True)
+
+        # extracting data from database
+        if not self.tracer.exec(query):
+            raise DatabaseError(query.lastError().text())
+
+        return self.__writeRows(query, len(columns), csvfile, progress)
+
+    def checkpoints(self) -> list[tuple[str, int, str]]:
+        """Return the checkpoints of the delta exports.
+
+        Returns
+        -----------------------
+        list[tuple[str, int, str]]
+            (name, highest exported id, time of the export) of
+            each checkpoint, by name
+
+        Raises
+        -----------------------
+        - DatabaseError if invalid Connection
+        """
+        if self.__conn is None:
+            raise DatabaseError("Uninitialized connection")
+
+        query = self.__statements.query(
+            "SELECT name, last_id, time FROM checkpoints ORDER BY name ;"
+        )
+        self.tracer.exec(query)
+
+        checkpoints = []
+        while query.next():
+            checkpoints.append((query.value(0), query.value(1), query.value(2)))
+        self.tracer.fetched(len(checkpoints))
+        query.finish()
+
+        return checkpoints
+
+    @traced
+    def removeCheckpoint(self, name: str):
+        """Remove a checkpoint of the delta exports.
+
+        Changes are logged only while checkpoints exist, and kept
+        until seen by all of them: unused checkpoints should be
+        removed.
+
+        Parameters
+        -----------------------
+        name : str
+            Name of the checkpoint
+
+        Raises
+        -----------------------
+        - DatabaseError if invalid Connection
+        - DatabaseError if checkpoint not found
+        - DatabaseError if unsuccessful removal
+        """
+        if self.__conn is None:
+            raise DatabaseError("Uninitialized connection")
+
+        if not self.__conn.transaction():
+            raise DatabaseError(self.__conn.lastError().text())
+
+        query = self.__statements.query(
+            "DELETE FROM checkpoints WHERE name = ? ;", [name]
+        )
+        chk = self.tracer.exec(query)
+        err = query.lastError().text()
+        removed = query.numRowsAffected()
+        query.finish()
+
+        if not chk or removed == 0:
+            self.__conn.rollback()
+            raise DatabaseError(
+                err if not chk else f"Unknown checkpoint {name}"
+            )
+
+        try:
+            self.__pruneChanges()
+        except DatabaseError:
+            self.__conn.rollback()
+            raise
+
+        if not self.__conn.commit():
+            err = self.__conn.lastError().text()
+            self.__conn.rollback()
+            raise DatabaseError(err)
+
+    def saveDelta(
+        self,
+        filename: str,
+        checkpoint: str,
+        progress: Callable[[int, int], bool] = None,
+        advance: bool = True,
+    ):
+        """Dump the changes since a checkpoint to a CSV file.
+
+        Parameters
+        -----------------------
+        filename : str
+            Filename of the output CSV file
+        checkpoint : str
+            Name of the checkpoint, all records are exported if
+            not found
+        progress : Callable[[int, int], bool]
+            Called after each chunk with the number of rows and
+            bytes written so far, returning `False` cancels the
+            export and removes the file, may be `None`
+        advance : bool
+            Whether to move the checkpoint to the exported state,
+            creating it if missing
+
+        Raises
+        -----------------------
+        - DatabaseError if invalid Connection
+        - DatabaseError if unsuccessful export
+        - OperationCancelled if cancelled by `progress`
+        """
+        try:
+            with open(
+                filename,
+                "w",
+                buffering=EXPORT_BUFFER_SIZE,
+                newline="",
+                encoding="utf-8",
+            ) as csvfile:
+                self.writeDelta(csvfile, checkpoint, progress, advance)
+        except (DatabaseError, OperationCancelled):
+            # the checkpoint is not moved, partial dumps are not kept
+            os.remove(filename)
+            raise
+
+    @traced
+    def writeDelta(
+        self,
+        csvfile: TextIO,
+        checkpoint: str,
+        progress: Callable[[int, int], bool] = None,
+        advance: bool = True,
+    ) -> int:
+        """Stream the changes since a checkpoint as CSV.
+
+        Each row is an operation marker followed by the columns
+        in `EXPENSE_COLUMNS`: 'I' for records added since the
+        checkpoint and 'U' for edited records, with their current
+        values, 'D' for removed records, with the id alone. Each
+        id appears at most once. Added records are found by id,
+        edits and removals in the log filled by triggers, so the
+        cost grows with the number of changes, not with the size
+        of the table.
+
+        With `advance`, the write lock is held from the start:
+        no change can fall between the exported state and the
+        moved checkpoint. The checkpoint is moved after the file
+        is flushed, and not at all if unsuccessful.
+
+        Parameters
+        -----------------------
+        csvfile : TextIO
+            Output file, opened with `newline=""`
+        checkpoint : str
+            Name of the checkpoint, all records are exported if
+            not found
+        progress : Callable[[int, int], bool]
+            Called after each chunk with the number of rows and
+            bytes written so far (0 bytes if the file is not
+            seekable), returning `False` cancels the export,
+            may be `None`
+        advance : bool
+            Whether to move the checkpoint to the exported state,
+            creating it if missing
+
+        Returns
+        -----------------------
+        int
+            Number of exported rows
+
+        Raises
+        -----------------------
+        - DatabaseError if invalid Connection
+        - DatabaseError if unsuccessful export
+        - OperationCancelled if cancelled by `progress`
+        """
+        if self.__conn is None:
+            raise DatabaseError("Uninitialized connection")
+
+        query = QSqlQuery(self.__conn)
+        chk = self.tracer.exec(
+            query, "BEGIN IMMEDIATE ;" if advance else "BEGIN ;"
+        )
+        err = query.lastError().text()
+        query.finish()
+        if not chk:
+            raise DatabaseError(err)
+
+        try:
+            # (highest id, last change) seen by the checkpoint
+            query = self.__statements.query(
+                "SELECT last_id, last_change FROM checkpoints "
+                "WHERE name = ? ;",
+                [checkpoint],
+            )
+            self.tracer.exec(query)
+            since = [query.value(0), query.value(1)] if query.next() else [0, 0]
+            query.finish()
+
+            # ids and changes are never reused (AUTOINCREMENT)
+            query = self.__statements.query(
+                "SELECT name, seq FROM sqlite_sequence "
+                "WHERE name IN ('expenses', 'expense_changes') ;"
+            )
+            self.tracer.exec(query)
+            sequences = {"expenses": 0, "expense_changes": 0}
+            while query.next():
+                sequences[query.value(0)] = query.value(1)
+            query.finish()
+
+            query = QSqlQuery(self.__conn)
+            query.setForwardOnly(True)
+            query.prepare(DELTA_QUERY)
+            for value in [since[1], since[0], since[0]]:
+                query.addBindValue(value)
+            if not self.tracer.exec(query):
+                err = query.lastError().text()
+                query.finish()
+                raise DatabaseError(err)
+
+            exported = self.__writeRows(
+                query, len(EXPENSE_COLUMNS) + 1, csvfile, progress
+            )
+            csvfile.flush()
+
+            if advance:
+                query = self.__statements.query(
+                    "INSERT OR REPLACE INTO checkpoints "
+                    "(name, last_id, last_change, time) "
+                    "VALUES (?, ?, ?, ?) ;",
+                    [
+                        checkpoint,
+                        sequences["expenses"],
+                        sequences["expense_changes"],
+                        datetime.datetime.now().isoformat(timespec="seconds"),
+                    ],
+                )
+                chk = self.tracer.exec(query)
+                err = query.lastError().text()
+                query.finish()
+                if not chk:
+                    raise DatabaseError(f"Error in saving checkpoint :: {err}")
+
+                self.__pruneChanges()
+        except BaseException:
+            self.__conn.rollback()
+            raise
+
+        if not self.__conn.commit():
+            err = self.__conn.lastError().text()
+            self.__conn.rollback()
+            raise DatabaseError(err)
+
+        return exported
+
+    @traced
+    def snapshot(
+        self, directory: str = None, keep: int = SNAPSHOT_RETENTION
+    ) -> str:
+        """Save a consistent copy of the DB, rotating older copies.
+
+        The copy is written by `VACUUM INTO` within a single read
+        transaction, keeping types, indexes and settings. Other
+        connections keep reading, and writing in WAL mode; with
+        rollback journals, writers wait for the copy to end.
+
+        Parameters
+        -----------------------
+        directory : str
+            Directory of the snapshots, created if missing,
+            `<database>.snapshots` if `None`
+        keep : int
+            Number of snapshots kept, older ones are removed,
+            `None` to keep all of them
+
+        Returns
+        -----------------------
+        str
+            Filename of the new snapshot
+
+        Raises
+        -----------------------
+        - DatabaseError if invalid Connection
+        - DatabaseError if unsuccessful copy
+        """
+        if self.__conn is None:
+            raise DatabaseError("Uninitialized connection")
+
+        directory = self.__snapshotDirectory(directory)
+        stem = os.path.splitext(os.path.basename(self.databaseName()))[0]
+        stamp = datetime.datetime.now().strftime(SNAPSHOT_FORMAT)
+        filename = os.path.join(directory, f"{stem}-{stamp}.db")
+
+        try:
+            os.makedirs(directory, exist_ok=True)
+        except OSError as err:
+            raise DatabaseError(f"Error in creating {directory} :: {err}")
+
+        query = QSqlQuery(self.__conn)
+        query.prepare("VACUUM INTO ? ;")
+        query.addBindValue(filename)
+        chk = self.tracer.exec(query)
+        err = query.lastError().text()
+        query.finish()
+        if not chk:
+            raise DatabaseError(f"Error in saving snapshot :: {err}")
+
+        if keep is not None:
+            for old in self.snapshots(directory)[keep:]:
+                try:
+                    os.remove(old)
+                except OSError as err:
+                    raise DatabaseError(f"Error in removing {old} :: {err}")
+
+        return filename
+
+    def snapshots(self, directory: str = None) -> list[str]:
+        """Return the snapshots of the DB, newest first.
+
+        Parameters
+        -----------------------
+        directory : str
+            Directory of the snapshots, `<database>.snapshots`
+            if `None`
+
+        Returns
+        -----------------------
+        list[str]
+            Filenames of the snapshots, empty if the directory
+            is missing
+
+        Raises
+        -----------------------
+        - DatabaseError if invalid Connection
+        """
+        if self.__conn is None:
+            raise DatabaseError("Uninitialized connection")
+
+        directory = self.__snapshotDirectory(directory)
+        if not os.path.isdir(directory):
+            return []
+
+        stem = os.path.splitext(os.path.basename(self.databaseName()))[0]
+        pattern = re.compile(rf"{re.escape(stem)}-\d{{8}}-\d{{6}}-\d{{6}}\.db")
+
+        return [
+            os.path.join(directory, name)
+            for name in sorted(os.listdir(directory), reverse=True)
+            if pattern.fullmatch(name)
+        ]
+
+    @traced
+    def restoreSnapshot(self, filename: str):
+        """Replace the DB with one of its snapshots.
+
+        The snapshot is checked, copied next to the DB and moved
+        over it while the connection is closed, then the DB is
+        reopened; models must be initialized again. No other
+        connection to the DB may be open.
+
+        Parameters
+        -----------------------
+        filename : str
+            Filename of the snapshot
+
+        Raises
+        -----------------------
+        - DatabaseError if invalid Connection
+        - DatabaseError if the snapshot is not intact
+        - DatabaseError if other connections are open
+        - DatabaseError if unsuccessful copy
+        """
+        if self.__conn is None:
+            raise DatabaseError("Uninitialized connection")
+
+        self.__checkSnapshot(filename)
+
+        database = self.databaseName()
+        # a partial copy never replaces the DB
+        restored = f"{database}.restore"
+        try:
+            shutil.copyfile(filename, restored)
+        except OSError as err:
+            raise DatabaseError(f"Error in copying {filename} :: {err}")
+
+        # unparented, the models are deleted once unreferenced
+        for model in (self.listModel, self.sumModel, self.pivotModel):
+            if model is not None:
+                model.setParent(None)
+        model = None
+        self.listModel = None
+        self.sumModel = None
+        self.pivotModel = None
+        self.closeDB()
+
+        # dropping the connection before openDB() adds it again
+        connName = self.__conn.connectionName()
+        self.__conn = None
+        self.__statements = None
+        QSqlDatabase.removeDatabase(connName)
+
+        try:
+            # the last connection closing removes the WAL
+            wal = f"{database}-wal"
+            if os.path.isfile(wal) and os.path.getsize(wal) > 0:
+                raise DatabaseError("Database in use by other connections")
+
+            for suffix in ("-wal", "-shm", "-journal"):
+                if os.path.isfile(database + suffix):
+                    os.remove(database + suffix)
+            os.replace(restored, database)
+        except (DatabaseError, OSError) as err:
+            # the copy is left behind only if not moved over the DB
+            try:
+                os.remove(restored)
+            except OSError:
+                pass
+
+            # reopening the previous DB, the original error is raised
+            try:
+                self.openDB(database)
+            except DatabaseError:
+                pass
+
+            if isinstance(err, DatabaseError):
+                raise
+            raise DatabaseError(
+                f"Error in restoring {filename} :: {err}"
+            ) from err
+        else:
+            self.openDB(database)
+
+    def closeDB(self):
+        """Close connection with DB."""
+        if self.__conn is None:
+            raise DatabaseError("Uninitialized connection")
+
+        # refreshing planner statistics, if worthwhile
+        query = QSqlQuery(self.__conn)
+        self.tracer.exec(query, "PRAGMA optimize ;")
+        query.finish()
+
+        self.__statements.clear()
+        self.__conn.close()
+
+    def __writeRows(
+        self,
+        query: QSqlQuery,
+        width: int,
+        csvfile: TextIO,
+        progress: Callable[[int, int], bool],
+    ) -> int:
+        """Write the rows of an executed query as CSV.
+
+        Parameters
+        -----------------------
+        query : QSqlQuery
+            Executed forward-only query, finished on return
+        width : int
+            Number of columns of the query
+        csvfile : TextIO
+            Output file, opened with `newline=""`
+        progress : Callable[[int, int], bool]
+            Called after each chunk with the number of rows and
+            bytes written so far, may be `None`
+
+        Returns
+        -----------------------
+        int
+            Number of written rows
+
+        Raises
+        -----------------------
+        - OperationCancelled if cancelled by `progress`
+        """
+        value = query.value
+        indices = range(width)
+        seekable = csvfile.seekable()
+
+        # handwriting of csv file required
+        # (QSqlQuery cannot pass .mode commands,
+        # and record() is not iterable)
+        writer = csv.writer(
+            csvfile,
+            quotechar='"',
+            quoting=csv.QUOTE_NONNUMERIC,
+        )
+
+        exported = 0
+        chunk = []
+
+        while query.next():
+            chunk.append([value(i) for i in indices])
+
+            if len(chunk) == EXPORT_CHUNK_SIZE:
+                writer.writerows(chunk)
+                exported += len(chunk)
+                chunk = []
+
+                if progress is not None and not progress(
+                    exported, csvfile.tell() if seekable else 0
+                ):
+                    self.tracer.fetched(exported)
+                    query.finish()
+                    raise OperationCancelled("Export cancelled")
+
+        writer.writerows(chunk)
+        exported += len(chunk)
+        self.tracer.fetched(exported)
+        query.finish()
+
+        if progress is not None:
+            progress(exported, csvfile.tell() if seekable else 0)
+
+        return exported
+
+    def __snapshotDirectory(self, directory: str) -> str:
+        """Return the directory of the snapshots.
+
+        Parameters
+        -----------------------
+        directory : str
+            Directory of the snapshots, `None` for the default
+
+        Returns
+        -----------------------
+        str
+            `directory`, or `<database>.snapshots` if `None`
+        """
+        if directory is not None:
+            return directory
+
+        return self.databaseName() + SNAPSHOT_SUFFIX
+
+    def __checkSnapshot(self, filename: str):
+        """Check that a file is an intact snapshot.
+
+        The file is attached to the connection, and must pass
+        SQLite's quick check and hold the 'expenses' table.
+
+        Parameters
+        -----------------------
+        filename : str
+            Filename of the snapshot
+
+        Raises
+        -----------------------
+        - DatabaseError if the snapshot is missing or not intact
+        """
+        if not os.path.isfile(filename):
+            raise DatabaseError(f"Snapshot {filename} does not exist")
+
+        query = QSqlQuery(self.__conn)
+        query.prepare("ATTACH DATABASE ? AS snapshot ;")
+        query.addBindValue(filename)
+        if not self.tracer.exec(query):
+            err = query.lastError().text()
+            query.finish()
+            raise DatabaseError(f"Error in opening {filename} :: {err}")
+
+        checks = []
+        for statement in (
+            "PRAGMA snapshot.quick_check ;",
+            "SELECT COUNT(*) FROM snapshot.sqlite_master "
+            "WHERE type = 'table' AND name = 'expenses' ;",
+        ):
+            chk = self.tracer.exec(query, statement) and query.next()
+            checks.append(query.value(0) if chk else None)
+            query.finish()
+
+        self.tracer.exec(query, "DETACH DATABASE snapshot ;")
+        query.finish()
+
+        if checks != ["ok", 1]:
+            raise DatabaseError(f"Invalid snapshot {filename}")
+
+    def __addConnection(self, filename: str):
+        """Add and open the connection to the given DB.
+
+        Parameters
+        -----------------------
+        filename : str
+            Path of the database to open
+
+        Raises
+        -----------------------
+        - DatabaseError if connection errors
+        """
+        # Closing connection if currently active
+        if self.__conn is not None:
+            self.__statements.clear()
+            if self.__conn.isOpen():
+                self.__conn.close()
+
+        # opening default connection, unless named
+        if self.__connName is None:
+            self.__conn = QSqlDatabase.addDatabase("QSQLITE")
+        else:
+            self.__conn = QSqlDatabase.addDatabase("QSQLITE", self.__connName)
+        self.__conn.setDatabaseName(filename)
+        self.__statements = QueryCache(self.__conn)
+        self.__summaries.clear()
+        self.__pivots.clear()
+
+        # misc errors in connection opening
+        chk = self.__conn.open()
+        if not chk:
+            raise DatabaseError(self.__conn.lastError().text())
+
+    def __initSettings(self):
+        """Create the 'settings' table, if missing.
+
+        'settings' holds (key, value) pairs stored with the DB,
+        such as the performance profile.
+
+        Raises
+        -----------------------
+        - DatabaseError if unsuccessful creation
+        """
+        if "settings" in self.__conn.tables():
+            return
+
+        query = QSqlQuery(self.__conn)
+        chk = self.tracer.exec(
+            query,
+            """
+            CREATE TABLE settings (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            ) ;
+        """,
+        )
+        query.finish()
+        if not chk:
+            raise DatabaseError(query.lastError().text())
+
+    def __applyProfile(self, name: str):
+        """Apply a performance profile to the connection.
+
+        Parameters
+        -----------------------
+        name : str
+            One of the keys of `PROFILES`
+
+        Raises
+        -----------------------
+        - DatabaseError if the profile cannot be applied
+        """
+        query = QSqlQuery(self.__conn)
+
+        for pragma, value in PROFILES[name].items():
+            # values come from PROFILES, PRAGMA does not bind
+            if not self.tracer.exec(query, f"PRAGMA {pragma} = {value} ;"):
+                err = query.lastError().text()
+                query.finish()
+                raise DatabaseError(f"Error in setting {pragma} :: {err}")
+
+            # the journal mode is silently kept while the DB is busy
+            if pragma == "journal_mode":
+                mode = query.value(0) if query.next() else None
+                if str(mode).upper() != value:
+                    query.finish()
+                    raise DatabaseError("Database busy, cannot change journal")
+
+        query.finish()
+
+    def __initIndexes(self):
+        """Create the indexes of 'expenses', if missing.
+
+        Indexes of older versions in `OBSOLETE_INDEXES` are
+        dropped.
+
+        Raises
+        -----------------------
+        - DatabaseError if unsuccessful creation
+        """
+        query = QSqlQuery(self.__conn)
+
+        for name in OBSOLETE_INDEXES:
+            if not self.tracer.exec(query, f"DROP INDEX IF EXISTS {name} ;"):
+                err = query.lastError().text()
+                query.finish()
+                raise DatabaseError(f"Error in dropping {name} :: {err}")
+
+        for name, columns in EXPENSE_INDEXES.items():
+            if not self.tracer.exec(
+                query,
+                f"CREATE INDEX IF NOT EXISTS {name} ON expenses({columns}) ;",
+            ):
+                err = query.lastError().text()
+                query.finish()
+                raise DatabaseError(f"Error in creating {name} :: {err}")
+
+        query.finish()
+
+    def __initAggregates(self):
+        """Create and backfill the 'daily_totals' table, if missing.
+
+        'daily_totals' holds the sum and number of the expenses
+        of each type for each date, and is kept up to date by
+        triggers on 'expenses': summaries scan one row per date
+        and type, instead of one per expense.
+
+        Raises
+        -----------------------
+        - DatabaseError if unsuccessful creation
+        """
+        if "daily_totals" in self.__conn.tables():
+            return
+
+        commands = [
+            """
+            CREATE TABLE daily_totals (
+                date DATE NOT NULL,
+                type CHAR(1) NOT NULL,
+                total DOUBLE PRECISION NOT NULL,
+                count INTEGER NOT NULL,
+                PRIMARY KEY (date, type)
+            ) WITHOUT ROWID ;
+            """,
+            """
+            CREATE TRIGGER daily_totals_insert
+            AFTER INSERT ON expenses
+            BEGIN
+                INSERT INTO daily_totals (date, type, total, count)
+                VALUES (NEW.date, NEW.type, NEW.amount, 1)
+                ON CONFLICT (date, type) DO UPDATE
+                SET total = total + excluded.total, count = count + 1 ;
+            END ;
+            """,
+            """
+            CREATE TRIGGER daily_totals_delete
+            AFTER DELETE ON expenses
+            BEGIN
+                UPDATE daily_totals
+                SET total = total - OLD.amount, count = count - 1
+                WHERE date = OLD.date AND type = OLD.type ;
+
+                DELETE FROM daily_totals
+                WHERE date = OLD.date AND type = OLD.type AND count = 0 ;
+            END ;
+            """,
+            """
+            CREATE TRIGGER daily_totals_update
+            AFTER UPDATE OF date, type, amount ON expenses
+            BEGIN
+                UPDATE daily_totals
+                SET total = total - OLD.amount, count = count - 1
+                WHERE date = OLD.date AND type = OLD.type ;
+
+                DELETE FROM daily_totals
+                WHERE date = OLD.date AND type = OLD.type AND count = 0 ;
+
+                INSERT INTO daily_totals (date, type, total, count)
+                VALUES (NEW.date, NEW.type, NEW.amount, 1)
+                ON CONFLICT (date, type) DO UPDATE
+                SET total = total + excluded.total, count = count + 1 ;
+            END ;
+            """,
+            """
+            INSERT INTO daily_totals (date, type, total, count)
+            SELECT date, type, SUM(amount), COUNT(*)
+            FROM expenses
+            GROUP BY date, type ;
+            """,
+        ]
+
+        if not self.__conn.transaction():
+            raise DatabaseError(self.__conn.lastError().text())
+
+        query = QSqlQuery(self.__conn)
+        for command in commands:
+            if not self.tracer.exec(query, command):
+                err = query.lastError().text()
+                query.finish()
+                self.__conn.rollback()
+                raise DatabaseError(err)
+
+        query.finish()
+        self.__conn.commit()
+
+    def __initSearch(self):
+        """Create and backfill the 'expenses_fts' index, if missing.
+
+        'expenses_fts' is an FTS5 full-text index of the
+        justifications, with 'expenses' as external content, kept
+        up to date by triggers on 'expenses'.
+
+        Raises
+        -----------------------
+        - DatabaseError if unsuccessful creation
+        """
+        if "expenses_fts" in self.__conn.tables():
+            return
+
+        commands = [
+            """
+            CREATE VIRTUAL TABLE expenses_fts USING fts5 (
+                justification,
+                content = 'expenses',
+                content_rowid = 'id'
+            ) ;
+            """,
+            """
+            CREATE TRIGGER expenses_fts_insert
+            AFTER INSERT ON expenses
+            BEGIN
+                INSERT INTO expenses_fts (rowid, justification)
+                VALUES (NEW.id, NEW.justification) ;
+            END ;
+            """,
+            """
+            CREATE TRIGGER expenses_fts_delete
+            AFTER DELETE ON expenses
+            BEGIN
+                INSERT INTO expenses_fts (expenses_fts, rowid, justification)
+                VALUES ('delete', OLD.id, OLD.justification) ;
+            END ;
+            """,
+            """
+            CREATE TRIGGER expenses_fts_update
+            AFTER UPDATE OF justification ON expenses
+            BEGIN
+                INSERT INTO expenses_fts (expenses_fts, rowid, justification)
+                VALUES ('delete', OLD.id, OLD.justification) ;
+
+                INSERT INTO expenses_fts (rowid, justification)
+                VALUES (NEW.id, NEW.justification) ;
+            END ;
+            """,
+            """
+            INSERT INTO expenses_fts (expenses_fts) VALUES ('rebuild') ;
+            """,
+        ]
+
+        if not self.__conn.transaction():
+            raise DatabaseError(self.__conn.lastError().text())
+
+        query = QSqlQuery(self.__conn)
+        for command in commands:
+            if not self.tracer.exec(query, command):
+                err = query.lastError().text()
+                query.finish()
+                self.__conn.rollback()
+                raise DatabaseError(err)
+
+        query.finish()
+        self.__conn.commit()
+
+    def __initChangeLog(self):
+        """Create the 'expense_changes' and 'checkpoints' tables, if missing.
+
+        'checkpoints' holds the highest id and the last change
+        seen by each delta export. 'expense_changes' logs the
+        edits and removals of the records, and the additions
+        below the highest id of a checkpoint, in order. Triggers
+        only log while checkpoints exist, and only records
+        already seen by one of them: additions to the end of the
+        table cost nothing more.
+
+        Raises
+        -----------------------
+        - DatabaseError if unsuccessful creation
+        """
+        if "expense_changes" in self.__conn.tables():
+            return
+
+        commands = [
+            """
+            CREATE TABLE checkpoints (
+                name TEXT PRIMARY KEY,
+                last_id INTEGER NOT NULL,
+                last_change INTEGER NOT NULL,
+                time TEXT NOT NULL
+            ) ;
+            """,
+            """
+            CREATE TABLE expense_changes (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                id INTEGER NOT NULL,
+                op CHAR(1) NOT NULL
+            ) ;
+            """,
+            """
+            CREATE TRIGGER expense_changes_insert
+            AFTER INSERT ON expenses
+            WHEN NEW.id <= (SELECT MAX(last_id) FROM checkpoints)
+            BEGIN
+                INSERT INTO expense_changes (id, op) VALUES (NEW.id, 'I') ;
+            END ;
+            """,
+            """
+            CREATE TRIGGER expense_changes_update
+            AFTER UPDATE ON expenses
+            WHEN OLD.id <= (SELECT MAX(last_id) FROM checkpoints)
+            BEGIN
+                INSERT INTO expense_changes (id, op) VALUES (OLD.id, 'U') ;
+            END ;
+            """,
+            """
+            CREATE TRIGGER expense_changes_delete
+            AFTER DELETE ON expenses
+            WHEN OLD.id <= (SELECT MAX(last_id) FROM checkpoints)
+            BEGIN
+                INSERT INTO expense_changes (id, op) VALUES (OLD.id, 'D') ;
+            END ;
+            """,
+        ]
+
+        if not self.__conn.transaction():
+            raise DatabaseError(self.__conn.lastError().text())
+
+        query = QSqlQuery(self.__conn)
+        for command in commands:
+            if not self.tracer.exec(query, command):
+                err = query.lastError().text()
+                query.finish()
+                self.__conn.rollback()
+                raise DatabaseError(err)
+
+        query.finish()
+        self.__conn.commit()
+
+    def __pruneChanges(self):
+        """Remove the changes seen by all checkpoints.
+
+        Raises
+        -----------------------
+        - DatabaseError if unsuccessful removal
+        """
+        query = self.__statements.query(
+            """
+            DELETE FROM expense_changes
+            WHERE seq <= (SELECT MIN(last_change) FROM checkpoints)
+                OR NOT EXISTS (SELECT 1 FROM checkpoints) ;
+            """
+        )
+        chk = self.tracer.exec(query)
+        err = query.lastError().text()
+        query.finish()
+        if not chk:
+            raise DatabaseError(f"Error in pruning changes :: {err}")
+
+    def __buildSums(self):
+        """Rebuild the index of the amounts from 'daily_totals'."""
+        query = QSqlQuery(self.__conn)
+        query.setForwardOnly(True)
+        self.tracer.exec(
+            query, "SELECT date, type, total, count FROM daily_totals ;"
+        )
+
+        totals = []
+        while query.next():
+            totals.append(
+                (query.value(0), query.value(1), query.value(2), query.value(3))
+            )
+        self.tracer.fetched(len(totals))
+        query.finish()
+
+        self.__sums.build(totals)
+
+        query = self.__statements.query("PRAGMA data_version ;")
+        self.tracer.exec(query)
+        query.next()
+        self.__dataVersion = query.value(0)
+        self.tracer.fetched(1)
+        query.finish()
+
+    def __checkDataVersion(self):
+        """Rebuild the index of the amounts after external writes.
+
+        'data_version' changes when other connections, or other
+        processes, commit changes to the DB. Cached summaries and
+        pivots are discarded in that case.
+        """
+        if self.__conn is None:
+            return
+
+        query = self.__statements.query("PRAGMA data_version ;")
+        self.tracer.exec(query)
+        query.next()
+        version = query.value(0)
+        self.tracer.fetched(1)
+        query.finish()
+
+        if version != self.__dataVersion:
+            self.__buildSums()
+            self.__summaries.clear()
+            self.__pivots.clear()
+
+    def __maxId(self) -> int:
+        """Return the highest id of the records.
+
+        Returns
+        -----------------------
+        int
+            Highest primary key, 0 if there are no records
+        """
+        query = self.__statements.query("SELECT MAX(id) FROM expenses ;")
+        self.tracer.exec(query)
+        query.next()
+        rowid = query.value(0) or 0
+        self.tracer.fetched(1)
+        query.finish()
+
+        return rowid
+
+    def __syncAppended(self, rowids: list[int] = None):
+        """Insert the appended records in the list model.
+
+        Records with ids higher than the last known one, by
+        this or other connections, are inserted in place without
+        resetting the list model, unless more than
+        `INCREMENTAL_LIMIT`. Without `rowids`, as after imports,
+        the rows are recounted: records with explicit ids below
+        the last known one reset the list model.
+
+        Parameters
+        -----------------------
+        rowids : list[int]
+            Ids of all the records added by this connection,
+            `None` if unknown
+        """
+        query = self.__statements.query(
+            "SELECT id FROM expenses WHERE id > ? ORDER BY id LIMIT ? ;",
+            [self.__lastId, INCREMENTAL_LIMIT + 1],
+        )
+        query.setForwardOnly(True)
+        self.tracer.exec(query)
+
+        appended = set(rowids or [])
+        while query.next():
+            appended.add(query.value(0))
+        self.tracer.fetched(len(appended))
+        query.finish()
+
+        if len(appended) > INCREMENTAL_LIMIT:
+            self.listModel.select()
+        else:
+            self.listModel.applyChanges({}, self.listModel.positions(appended))
+            # imported ids may fill gaps left by removals
+            if rowids is None and (
+                self.listModel.count() != self.listModel.rowCount()
+            ):
+                self.listModel.select()
+
+        self.__lastId = self.__maxId()
+
+    def __summaryKey(self, dates: list[str], text: str) -> tuple:
+        """Return the cache key of a summary.
+
+        Parameters
+        -----------------------
+        dates : list[str]
+            [startDate, endDate], both included, `None` for all
+            records
+        text : str
+            Words searched in the justifications, empty for all
+            records
+
+        Returns
+        -----------------------
+        tuple
+            (startDate, endDate, words), dates in ISO format,
+            `None` if unfiltered, words separated by single
+            spaces
+
+        Raises
+        -----------------------
+        - DatabaseError if invalid date range
+        """
+        if dates is None:
+            return None, None, " ".join(text.split())
+
+        if len(dates) != 2:
+            raise DatabaseError("Invalid date interval")
+
+        try:
+            start, end = (datetime.date.fromisoformat(d) for d in dates)
+        except (TypeError, ValueError) as err:
+            raise DatabaseError("Invalid date interval") from err
+
+        return start.isoformat(), end.isoformat(), " ".join(text.split())
+
+    def __cacheSummary(self, key: tuple, sums: list[tuple[str, float]]):
+        """Store a summary in the cache.
+
+        Parameters
+        -----------------------
+        key : tuple
+            Cache key, as returned by `__summaryKey()`
+        sums : list[tuple[str, float]]
+            (type, sum) tuples, ordered by type
+        """
+        self.__summaries[key] = tuple(sums)
+        self.__summaries.move_to_end(key)
+        if len(self.__summaries) > SUMMARY_CACHE_SIZE:
+            self.__summaries.popitem(last=False)
+
+    def __touchDates(self, dates: Iterable[str]):
+        """Discard the cached summaries and pivots including any of the dates.
+
+        Parameters
+        -----------------------
+        dates : Iterable[str]
+            Dates of added, removed or edited records
+        """
+        touched = sorted(set(dates))
+        if not touched:
+            return
+
+        for cache in (self.__summaries, self.__pivots):
+            for key in list(cache):
+                start, end, _ = key
+
+                # first touched date not before the start of the range
+                i = bisect.bisect_left(touched, start) if start else 0
+                if i < len(touched) and (end is None or touched[i] <= end):
+                    del cache[key]
+
+    def __recordEdit(self, old: list, new: list):
+        """Account for an in-cell edit in the index of the amounts.
+
+        Connected to `listModel.rowEdited`.
+
+        Parameters
+        -----------------------
+        old : list
+            Values of the record before the edit
+        new : list
+            Values of the record after the edit
+        """
+        self.__recordEdits([old], [new])
+
+    def __recordEdits(self, old: list[list], new: list[list]):
+        """Account for edited records in the index of the amounts.
+
+        The sum and pivot models are recomputed once.
+
+        Parameters
+        -----------------------
+        old : list[list]
+            Values of the records before the edits
+        new : list[list]
+            Values of the records after the edits
+        """
+        for _, date, type_, amount, _ in old:
+            self.__sums.add(date, type_, -amount, -1)
+
+        for _, date, type_, amount, _ in new:
+            self.__sums.add(date, type_, amount)
+
+        self.__touchDates(row[1] for row in old + new)
+        self.__updateSummary()
+
+    def __updateSummary(self):
+        """Recompute the sum and pivot models for the current filter."""
+        if self.sumModel is None:
+            return
+
+        self.sumModel.setSums(self.summary(self.__dates, self.__text))
+        self.__updatePivot()
+
+    def __updatePivot(self):
+        """Recompute the pivot model for the current filter.
+
+        Skipped while the pivot is not shown.
+        """
+        if self.pivotModel is None or self.__period is None:
+            return
+
+        self.pivotModel.setPivot(
+            self.pivot(self.__period, self.__dates, self.__text)
+        )
+
+    def __dailyPivot(self, dates: list[str], text: str) -> list[tuple]:
+        """Return statistics of the amounts by day and type.
+
+        One grouped pass, through the index on date, type and
+        amount unless searching the justifications.
+
+        Parameters
+        -----------------------
+        dates : list[str]
+            [startDate, endDate], both included, `None` for all
+            records
+        text : str
+            Words searched in the justifications, empty for all
+            records
+
+        Returns
+        -----------------------
+        list[tuple]
+            (date, type, sum, count, avg, min, max) tuples,
+            ordered by date and type
+
+        Raises
+        -----------------------
+        - DatabaseError if invalid date range
+        - DatabaseError if query errors
+        """
+        query = self.__datedQuery(
+            "SELECT date, type, SUM(amount), COUNT(*), MIN(amount), "
+            "MAX(amount) FROM expenses",
+            dates,
+            "GROUP BY date, type ORDER BY date, type",
+            text,
+        )
+        query.setForwardOnly(True)
+        if not self.tracer.exec(query):
+            err = query.lastError().text()
+            query.finish()
+            raise DatabaseError(err)
+
+        rows = []
+        while query.next():
+            total, count = query.value(2), query.value(3)
+            rows.append(
+                (
+                    query.value(0),
+                    query.value(1),
+                    total,
+                    count,
+                    total / count,
+                    query.value(4),
+                    query.value(5),
+                )
+            )
+        self.tracer.fetched(len(rows))
+        query.finish()
+
+        return rows
+
+    def __rollUp(self, rows: list[tuple], period: str) -> list[tuple]:
+        """Merge daily statistics into coarser periods.
+
+        Parameters
+        -----------------------
+        rows : list[tuple]
+            (date, type, sum, count, avg, min, max) tuples, as
+            returned by `__dailyPivot()`
+        period : str
+            'week', 'month' or 'year'
+
+        Returns
+        -----------------------
+        list[tuple]
+            (period, type, sum, count, avg, min, max) tuples,
+            ordered by period and type
+
+        Raises
+        -----------------------
+        - DatabaseError if invalid dates in the DB
+        """
+        labels = {}
+        cells = {}
+        for date, type_, total, count, _, low, high in rows:
+            if date not in labels:
+                try:
+                    day = datetime.date.fromisoformat(date)
+                except (TypeError, ValueError) as err:
+                    raise DatabaseError(f"Invalid date '{date}'") from err
+
+                if period == "week":
+                    year, week, _ = day.isocalendar()
+                    labels[date] = f"{year}-W{week:02}"
+                elif period == "month":
+                    labels[date] = f"{day.year}-{day.month:02}"
+                else:
+                    labels[date] = f"{day.year}"
+
+            key = (labels[date], type_)
+            if key not in cells:
+                cells[key] = [total, count, low, high]
+            else:
+                cell = cells[key]
+                cell[0] += total
+                cell[1] += count
+                cell[2] = min(cell[2], low)
+                cell[3] = max(cell[3], high)
+
+        return [
+            (label, type_, total, count, total / count, low, high)
+            for (label, type_), (total, count, low, high) in sorted(
+                cells.items()
+            )
+        ]
+
+    def __datedQuery(
+        self,
+        select: str,
+        dates: list[str],
+        suffix: str = "",
+        text: str = "",
+    ) -> QSqlQuery:
+        """Return a prepared query restricted to a date range.
+
+        Parameters
+        -----------------------
+        select : str
+            Statement to restrict, without WHERE clause
+        dates : list[str]
+            [startDate, endDate], both included, `None` if
+            unfiltered
+        suffix : str
+            Clauses following WHERE, if any
+        text : str
+            Words searched in the justifications, empty if
+            unfiltered
+
+        Returns
+        -----------------------
+        QSqlQuery
+            Cached query, with bound dates
+
+        Raises
+        -----------------------
+        - DatabaseError if invalid date range
+        """
+        conditions, values = [], []
+
+        if dates is not None:
+            if len(dates) != 2:
+                raise DatabaseError("Invalid date interval")
+
+            conditions.append("date BETWEEN ? AND ?")
+            values += list(dates)
+
+        if text.split():
+            condition, match = searchCondition(text)
+            conditions.append(condition)
+            values.append(match)
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        return self.__statements.query(f"{select} {where} {suffix} ;", values)
@@ -0,0 +1,1358 @@
+"""Paged table model.
+
+Classes
+-----------------------
+PagedTableModel
+    Editable table model of 'expenses', fetched in pages.
+
+Functions
+-----------------------
+searchCondition(str) -> tuple[str, str]
+    Return the condition selecting records by justification.
+"""
+
+# Copyright (c) 2022 Adriano Angelone
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the
+# Software.
+#
+# This file is part of sem-qt.
+#
+# This file may be used under the terms of the GNU General
+# Public License version 3.0 as published by the Free Software
+# Foundation and appearing in the file LICENSE included in the
+# packaging of this file.  Please review the following
+# information to ensure the GNU General Public License version
+# 3.0 requirements will be met:
+# http://www.gnu.org/copyleft/gpl.html.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY
+# KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE
+# WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR
+# PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+# OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+# SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+from collections import OrderedDict
+from collections.abc import Iterable
+import bisect
+import json
+
+from PyQt6.QtCore import (
+    Qt,
+    QAbstractTableModel,
+    QModelIndex,
+    QObject,
+    pyqtSignal,
+)
+from PyQt6.QtGui import QColor
+from PyQt6.QtSql import QSqlDatabase
+
+from modules.QueryCache import QueryCache
+from modules.QueryTracer import QueryTracer
+
+
+# number of rows fetched at once
+PAGE_SIZE = 256
+# maximum number of pages kept in memory
+CACHE_PAGES = 64
+# changed records above which the model is reset instead
+INCREMENTAL_LIMIT = 1000
+# records above which positions are computed in a single pass
+POSITION_COUNTS = 8
+# background of the cells with pending edits
+PENDING_COLOR = "#fff2b3"
+
+
+def searchCondition(text: str) -> tuple[str, str]:
+    """Return the condition selecting records by justification.
+
+    Each word of `text` must match the start of a word of the
+    justification, looked up in the 'expenses_fts' index.
+
+    Parameters
+    -----------------------
+    text : str
+        Searched words, at least one
+
+    Returns
+    -----------------------
+    tuple[str, str]
+        Condition on 'expenses' with a placeholder, and the FTS5
+        query to bind to it
+    """
+    # quoted as strings, FTS5 operators are not exposed
+    words = ['"' + word.replace('"', '""') + '"*' for word in text.split()]
+
+    return (
+        "id IN (SELECT rowid FROM expenses_fts WHERE expenses_fts MATCH ?)",
+        " ".join(words),
+    )
+
+
+class PagedTableModel(QAbstractTableModel):
+    """Editable table model of 'expenses', fetched in pages.
+
+    Only the total number of rows is computed upfront, rows are
+    fetched on demand in pages of `PAGE_SIZE`, and at most
+    `CACHE_PAGES` pages are kept in memory, least recently used
+    pages are discarded first.
+
+    Pages are fetched by keyset pagination: rows are ordered by
+    the sort column and then by id, and each page starts after
+    the (value, id) key of the last row of the previous one.
+    Only the keys of the last rows of fetched pages are kept,
+    jumps to pages whose previous key is unknown use an offset
+    from the closest known key.
+
+    Changes of known records are applied by `applyChanges()`,
+    signalling only the rows involved, so that views keep their
+    selection and scroll position.
+
+    In batched mode edits are held as pending, shown highlighted
+    and written only by `ModelWrapper.submitEdits()`; pending
+    edits are kept by record id, across pages and filters.
+
+    Private attributes
+    -----------------------
+    __conn : QSqlDatabase
+        Database connection
+    __tracer : QueryTracer
+        Timer of the operations and queries
+    __statements : QueryCache
+        Cache of prepared queries
+    __columns : list[str]
+        Names of the columns of 'expenses'
+    __dates : list[str]
+        [startDate, endDate] filter, `None` if unfiltered
+    __text : str
+        Words searched in the justifications, empty if unfiltered
+    __sortColumn : int
+        Index of the sort column
+    __sortOrder : Qt.SortOrder
+        Sort order
+    __count : int
+        Number of rows matching the filter
+    __pages : OrderedDict[int, list[list]]
+        Cached pages, least recently used first
+    __keys : dict[int, tuple]
+        Keys of the last rows of fetched pages
+    __batched : bool
+        Whether edits are held as pending
+    __pending : dict[int, dict[int, object]]
+        Pending values by record id and column index
+
+    Public methods
+    -----------------------
+    __init__(QObject, QSqlDatabase, QueryTracer, QueryCache)
+        Construct class instance.
+    setFilter(list[str], str)
+        Set the filter, applied on the next `select()`.
+    select()
+        Recount rows and discard all cached pages.
+    count() -> int
+        Return the number of rows matching the filter.
+    selectFrom(int, list[list])
+        Reset to a row count and first page fetched elsewhere.
+    firstPage() -> list[list]
+        Return the rows of the first page.
+    sorting() -> tuple[int, Qt.SortOrder]
+        Return the sort column and order.
+    sums() -> list[tuple[str, float]]
+        Return the sums of the amounts by type of the rows.
+    sample(int) -> list[list]
+        Return the first and last rows, for width estimates.
+    maxLengths() -> list[int]
+        Return the length of the longest value of each column.
+    queries() -> list[tuple[str, list]]
+        Return the queries issued for the current sort and filter.
+    rowId(int) -> int
+        Return the id of the record in the given row.
+    rowIds(list[int]) -> list[int]
+        Return the ids of the records in the given rows.
+    rowValues(int) -> list
+        Return the values of the record in the given row.
+    positions(Iterable[int]) -> dict[int, int]
+        Return the rows of the given records.
+    cachedRows(Iterable[int]) -> dict[int, int]
+        Return the rows of the given records among the cached pages.
+    reorders(Iterable[str]) -> bool
+        Return whether edits of the given columns may move rows.
+    applyChanges(dict[int, int], dict[int, int])
+        Move, insert and remove the rows of changed records.
+    rowCount(QModelIndex) -> int
+        Return the number of rows.
+    columnCount(QModelIndex) -> int
+        Return the number of columns.
+    data(QModelIndex, int) -> object
+        Return the data of the given cell.
+    setData(QModelIndex, object, int) -> bool
+        Write the value of the given cell to the DB.
+    flags(QModelIndex) -> Qt.ItemFlag
+        Return the flags of the given cell.
+    headerData(int, Qt.Orientation, int) -> object
+        Return the header of the given section.
+    sort(int, Qt.SortOrder)
+        Sort rows by the given column.
+    isBatched() -> bool
+        Return whether edits are held as pending.
+    setBatched(bool)
+        Switch between immediate and batched edits.
+    pendingEdits() -> dict[int, dict[str, object]]
+        Return the pending values by record id and column.
+    revertAll()
+        Discard all pending edits.
+
+    Private methods
+    -----------------------
+    __row(int) -> list
+        Return the cached row, fetching its page if needed.
+    __fetch(int) -> list[list]
+        Fetch the given page from the DB.
+    __select(str, int, int) -> list[list]
+        Select a contiguous range of rows from the DB.
+    __discard(int, int)
+        Discard a range of cached pages, with their keys.
+    __runs(Iterable[int]) -> list[tuple[int, int]]
+        Group rows into runs of contiguous rows.
+    __countQuery(tuple) -> tuple[str, list]
+        Return the query counting the rows matching the filter.
+    __pageQuery(str, tuple, int, int, bool) -> tuple[str, list]
+        Return the query selecting a range of rows.
+    __rows(str, list) -> list[list]
+        Execute a query, returning the selected rows.
+    __key(list) -> tuple
+        Return the keyset pagination key of a row.
+    __descending() -> bool
+        Return whether rows are sorted in descending order.
+    __ordering(bool) -> tuple[str, str]
+        Return the key columns and the ordering of the rows.
+    __after(tuple, bool, bool) -> tuple[str, list]
+        Return the condition selecting the rows after a key.
+    __filter() -> tuple[list[str], list]
+        Return conditions and values of the filter.
+
+    Signals
+    -----------------------
+    rowEdited[list, list]
+        Broadcast the values of an edited record.
+    pendingChanged[int]
+        Broadcast the number of records with pending edits.
+    """
+
+    def __init__(
+        self,
+        parent: QObject,
+        conn: QSqlDatabase,
+        tracer: QueryTracer = None,
+        statements: QueryCache = None,
+    ):
+        """Construct class instance.
+
+        Parameters
+        -----------------------
+        parent : QObject
+            Parent QObject
+        conn : QSqlDatabase
+            Database connection
+        tracer : QueryTracer
+            Timer of the operations and queries, a private one
+            if `None`
+        statements : QueryCache
+            Cache of prepared queries on `conn`, a private one
+            if `None`
+        """
+        super().__init__(parent)
+
+        self.__conn = conn
+        self.__tracer = tracer if tracer is not None else QueryTracer(self)
+        self.__statements = (
+            statements if statements is not None else QueryCache(conn)
+        )
+        self.__dates = None
+        self.__text = ""
+        # sorting by date (newest first)
+        self.__sortColumn = 1
+        self.__sortOrder = Qt.SortOrder.DescendingOrder
+        self.__count = 0
+        self.__pages = OrderedDict()
+        self.__keys = {}
+        self.__batched = False
+        self.__pending = {}
+
+        record = conn.record("expenses")
+        self.__columns = [record.fieldName(i) for i in range(record.count())]
+
+    rowEdited = pyqtSignal(list, list)
+    """Broadcast the values of an edited record.
+
+    Parameters
+    -----------------------
+    old : list
+        Values of the record before the edit
+    new : list
+        Values of the record after the edit
+    """
+
+    pendingChanged = pyqtSignal(int)
+    """Broadcast the number of records with pending edits.
+
+    Parameters
+    -----------------------
+    count : int
+        Number of records with pending edits, 0 once submitted
+        or reverted
+    """
+
+    def setFilter(self, dates: list[str], text: str = ""):
+        """Set the filter, applied on the next `select()`.
+
+        Parameters
+        -----------------------
+        dates : list[str]
+            [startDate, endDate], both included, `None` to
+            remove the date filter
+        text : str
+            Words searched in the justifications, see
+            `searchCondition()`, empty to remove the search
+        """
+        self.__dates = dates
+        self.__text = text
+
+    def select(self):
+        """Recount rows and discard all cached pages.
+
+        Raises
+        -----------------------
+        - DatabaseError if unsuccessful count, the model is left
+          unchanged
+        """
+        with self.__tracer.operation("select"):
+            count = self.count()
+
+            self.beginResetModel()
+
+            self.__count = count
+            self.__pages.clear()
+            self.__keys.clear()
+
+            self.endResetModel()
+
+    def count(self) -> int:
+        """Return the number of rows matching the filter.
+
+        The model is not affected.
+
+        Returns
+        -----------------------
+        int
+            Number of rows matching the filter
+
+        Raises
+        -----------------------
+        - DatabaseError if unsuccessful count
+        """
+        # imported here, ModelWrapper imports this module
+        # pylint: disable=import-outside-toplevel
+        from modules.ModelWrapper import DatabaseError
+
+        query = self.__statements.query(*self.__countQuery())
+        if not self.__tracer.exec(query) or not query.next():
+            err = query.lastError().text()
+            query.finish()
+            raise DatabaseError(err)
+        count = query.value(0)
+        self.__tracer.fetched(1)
+        query.finish()
+
+        return count
+
+    def selectFrom(self, count: int, rows: list[list]):
+        """Reset to a row count and first page fetched elsewhere.
+
+        Counterpart of `firstPage()` on a model with the same
+        filter and sorting, typically on another connection.
+
+        Parameters
+        -----------------------
+        count : int
+            Number of rows matching the filter
+        rows : list[list]
+            Rows of the first page
+        """
+        with self.__tracer.operation("select"):
+            self.beginResetModel()
+
+            self.__count = count
+            self.__pages.clear()
+            self.__keys.clear()
+
+            if rows:
+                self.__pages[0] = rows
+                self.__keys[0] = self.__key(rows[-1])
+
+            self.endResetModel()
+
+    def firstPage(self) -> list[list]:
+        """Return the rows of the first page.
+
+        Returns
+        -----------------------
+        list[list]
+            Rows of the first page, fetched if needed, empty if
+            no row matches the filter
+        """
+        if self.__count == 0:
+            return []
+
+        self.__row(0)
+        return [list(row) for row in self.__pages[0]]
+
+    def sorting(self) -> tuple[int, Qt.SortOrder]:
+        """Return the sort column and order.
+
+        Returns
+        -----------------------
+        tuple[int, Qt.SortOrder]
+            Index of the sort column, and sort order
+        """
+        return self.__sortColumn, self.__sortOrder
+
+    def sums(self) -> list[tuple[str, float]]:
+        """Return the sums of the amounts by type of the rows.
+
+        Aggregated in SQL over the rows matching the filter.
+
+        Returns
+        -----------------------
+        list[tuple[str, float]]
+            (type, sum) tuples, ordered by type
+        """
+        conditions, values = self.__filter()
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        with self.__tracer.operation("sums"):
+            rows = self.__rows(
+                f"SELECT type, SUM(amount) FROM expenses {where} "
+                "GROUP BY type ORDER BY type ;",
+                values,
+            )
+
+        return [tuple(row) for row in rows]
+
+    def sample(self, count: int) -> list[list]:
+        """Return the first and last rows, for width estimates.
+
+        Two bounded queries, the cached pages are not affected.
+
+        Parameters
+        -----------------------
+        count : int
+            Number of rows from each end
+
+        Returns
+        -----------------------
+        list[list]
+            Up to `2 * count` rows, some possibly repeated
+        """
+        with self.__tracer.operation("sample"):
+            rows = self.__rows(*self.__pageQuery("*", None, count, 0))
+            rows += self.__rows(*self.__pageQuery("*", None, count, 0, True))
+
+        return rows
+
+    def maxLengths(self) -> list[int]:
+        """Return the length of the longest value of each column.
+
+        Lengths of the values as text, over all records
+        regardless of the filter, 0 if there are none. Scans
+        the whole table.
+
+        Returns
+        -----------------------
+        list[int]
+            Maximum length, ordered as the columns
+        """
+        lengths = ", ".join(f"MAX(LENGTH({c}))" for c in self.__columns)
+
+        with self.__tracer.operation("maxLengths"):
+            row = self.__rows(f"SELECT {lengths} FROM expenses ;", [])[0]
+
+        return [length or 0 for length in row]
+
+    def queries(self) -> list[tuple[str, list]]:
+        """Return the queries issued for the current sort and filter.
+
+        The row count, the first page, a page following a known
+        key, and the count of the rows preceding it (with
+        placeholder values), for query plan checks.
+
+        Returns
+        -----------------------
+        list[tuple[str, list]]
+            Statements with placeholders, and the bound values
+        """
+        key = (0,) if self.__sortColumn == 0 else ("", 0)
+
+        return [
+            self.__countQuery(),
+            self.__pageQuery("*", None, PAGE_SIZE, 0),
+            self.__pageQuery("*", key, PAGE_SIZE, 0),
+            self.__countQuery(key),
+        ]
+
+    def rowId(self, row: int) -> int:
+        """Return the id of the record in the given row.
+
+        Parameters
+        -----------------------
+        row : int
+            Row in the model
+
+        Returns
+        -----------------------
+        int
+            Primary key of the record
+        """
+        return self.__row(row)[0]
+
+    def rowIds(self, rows: list[int]) -> list[int]:
+        """Return the ids of the records in the given rows.
+
+        Contiguous rows are looked up with a single query,
+        regardless of the cached pages.
+
+        Parameters
+        -----------------------
+        rows : list[int]
+            Rows in the model
+
+        Returns
+        -----------------------
+        list[int]
+            Primary keys of the records, ordered by row
+        """
+        rowids = []
+
+        for first, last in self.__runs(rows):
+            rowids += [
+                r[0] for r in self.__select("id", first, last - first + 1)
+            ]
+
+        return rowids
+
+    def rowValues(self, row: int) -> list:
+        """Return the values of the record in the given row.
+
+        Parameters
+        -----------------------
+        row : int
+            Row in the model
+
+        Returns
+        -----------------------
+        list
+            Values of the record, ordered as the columns
+        """
+        return list(self.__row(row))
+
+    def positions(self, rowids: Iterable[int]) -> dict[int, int]:
+        """Return the rows of the given records.
+
+        Rows under the current filter and sorting. A few records
+        are located by counting the rows preceding each of them,
+        more in a single numbered pass over the filtered rows
+        from the first to the last of them.
+
+        Parameters
+        -----------------------
+        rowids : Iterable[int]
+            Primary keys of the records
+
+        Returns
+        -----------------------
+        dict[int, int]
+            Rows by primary key, only for the records matching
+            the filter
+        """
+        rowids = json.dumps(list(rowids))
+        if rowids == "[]":
+            return {}
+
+        conditions, values = self.__filter()
+        conditions.append("id IN (SELECT value FROM json_each(?))")
+        values.append(rowids)
+        where = f"WHERE {' AND '.join(conditions)}"
+
+        with self.__tracer.operation("positions"):
+            rows = self.__rows(f"SELECT * FROM expenses {where} ;", values)
+
+            if len(rows) > POSITION_COUNTS:
+                descending = self.__descending()
+                keys = sorted(map(self.__key, rows), reverse=descending)
+
+                # numbered from the first to the last of the records
+                offset = self.__rows(*self.__countQuery(keys[0]))[0][0]
+
+                conditions, values = self.__filter()
+                for key, reverse in ((keys[0], False), (keys[-1], True)):
+                    condition, keyValues = self.__after(
+                        key, descending != reverse, True
+                    )
+                    conditions.append(condition)
+                    values += keyValues
+                _, order = self.__ordering(descending)
+
+                numbered = self.__rows(
+                    "SELECT id, row FROM ("
+                    f"SELECT id, ROW_NUMBER() OVER (ORDER BY {order}) - 1 "
+                    f"AS row FROM expenses WHERE {' AND '.join(conditions)}"
+                    ") WHERE id IN (SELECT value FROM json_each(?)) ;",
+                    values + [rowids],
+                )
+                return {rowid: offset + row for rowid, row in numbered}
+
+            positions = {}
+            for row in rows:
+                positions[row[0]] = self.__rows(
+                    *self.__countQuery(self.__key(row))
+                )[0][0]
+
+        return positions
+
+    def cachedRows(self, rowids: Iterable[int]) -> dict[int, int]:
+        """Return the rows of the given records among the cached pages.
+
+        Parameters
+        -----------------------
+        rowids : Iterable[int]
+            Primary keys of the records
+
+        Returns
+        -----------------------
+        dict[int, int]
+            Rows by primary key, only for the cached records
+        """
+        rowids = set(rowids)
+
+        return {
+            row[0]: page * PAGE_SIZE + i
+            for page, rows in self.__pages.items()
+            for i, row in enumerate(rows)
+            if row[0] in rowids
+        }
+
+    def reorders(self, columns: Iterable[str]) -> bool:
+        """Return whether edits of the given columns may move rows.
+
+        Edits of the sort column move rows, edits of filtered
+        columns may move them out of the filter.
+
+        Parameters
+        -----------------------
+        columns : Iterable[str]
+            Names of the edited columns
+
+        Returns
+        -----------------------
+        bool
+            `True` if the positions of edited records may change
+        """
+        columns = set(columns)
+
+        return (
+            self.__columns[self.__sortColumn] in columns
+            or ("date" in columns and self.__dates is not None)
+            or ("justification" in columns and bool(self.__text.split()))
+        )
+
+    def applyChanges(self, before: dict[int, int], after: dict[int, int]):
+        """Move, insert and remove the rows of changed records.
+
+        Records in both `before` and `after` have been edited,
+        records only in `before` removed or filtered out, records
+        only in `after` added. Rows are edited in place if no
+        record moved, reordered if no record was added or
+        removed, otherwise removed and inserted. The cached pages
+        from the first changed row are discarded. The model is
+        reset if more than `INCREMENTAL_LIMIT` records changed.
+
+        Parameters
+        -----------------------
+        before : dict[int, int]
+            Rows of the changed records before the change, by
+            primary key, see `positions()`
+        after : dict[int, int]
+            Rows of the changed records after the change, by
+            primary key
+        """
+        changed = before.keys() | after.keys()
+        if not changed:
+            return
+
+        if len(changed) > INCREMENTAL_LIMIT:
+            self.select()
+            return
+
+        with self.__tracer.operation("applyChanges"):
+            if before == after:
+                # no record moved, only their pages are stale
+                for first, last in self.__runs(after.values()):
+                    self.__discard(first // PAGE_SIZE, last // PAGE_SIZE + 1)
+                    self.dataChanged.emit(
+                        self.index(first, 0),
+                        self.index(last, len(self.__columns) - 1),
+                    )
+                return
+
+            first = min(list(before.values()) + list(after.values()))
+
+            if before.keys() == after.keys():
+                # only reordered, persistent indexes follow the rows
+                self.layoutAboutToBeChanged.emit()
+
+                moved = {before[rowid]: after[rowid] for rowid in before}
+                removed = sorted(before.values())
+                inserted = sorted(after.values())
+
+                indexes = self.persistentIndexList()
+                rows = []
+                for index in indexes:
+                    row = index.row()
+                    if row in moved:
+                        row = moved[row]
+                    else:
+                        row -= bisect.bisect_left(removed, row)
+                        for insertedRow in inserted:
+                            if insertedRow > row:
+                                break
+                            row += 1
+                    rows.append(self.index(row, index.column()))
+                self.changePersistentIndexList(indexes, rows)
+
+                self.__discard(first // PAGE_SIZE)
+                self.layoutChanged.emit()
+                return
+
+            # cached pages are discarded after each step, so that
+            # rows read while signalling precede it
+            # last runs first, earlier rows are not shifted
+            for start, end in reversed(self.__runs(before.values())):
+                self.beginRemoveRows(QModelIndex(), start, end)
+                self.__count -= end - start + 1
+                self.__discard(start // PAGE_SIZE)
+                self.endRemoveRows()
+
+            # first runs first, at their final rows
+            for start, end in self.__runs(after.values()):
+                self.beginInsertRows(QModelIndex(), start, end)
+                self.__count += end - start + 1
+                self.__discard(start // PAGE_SIZE)
+                self.endInsertRows()
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        """Return the number of rows.
+
+        Parameters
+        -----------------------
+        parent : QModelIndex
+            Parent index, invalid for table models
+
+        Returns
+        -----------------------
+        int
+            Number of records matching the filter
+        """
+        return 0 if parent.isValid() else self.__count
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        """Return the number of columns.
+
+        Parameters
+        -----------------------
+        parent : QModelIndex
+            Parent index, invalid for table models
+
+        Returns
+        -----------------------
+        int
+            Number of columns of 'expenses'
+        """
+        return 0 if parent.isValid() else len(self.__columns)
+
+    def data(
+        self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole
+    ) -> object:
+        """Return the data of the given cell.
+
+        Parameters
+        -----------------------
+        index : QModelIndex
+            Index of the cell
+        role : int
+            Requested data role
+
+        Returns
+        -----------------------
+        object
+            Value of the cell for the display and edit roles,
+            pending if any, highlight of pending edits for the
+            background role, `None` otherwise
+        """
+        if not index.isValid():
+            return None
+
+        if role in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.EditRole):
+            row = self.__row(index.row())
+            pending = self.__pending.get(row[0], {})
+            return pending.get(index.column(), row[index.column()])
+
+        if role == Qt.ItemDataRole.BackgroundRole and self.__pending:
+            pending = self.__pending.get(self.__row(index.row())[0], {})
+            if index.column() in pending:
+                return QColor(PENDING_COLOR)
+
+        return None
+
+    def setData(
+        self,
+        index: QModelIndex,
+        value: object,
+        role: int = Qt.ItemDataRole.EditRole,
+    ) -> bool:
+        """Write the value of the given cell to the DB.
+
+        In batched mode the value is held as pending instead,
+        and dropped if equal to the stored one.
+
+        Parameters
+        -----------------------
+        index : QModelIndex
+            Index of the cell
+        value : object
+            New value of the cell
+        role : int
+            Data role, only the edit role is supported
+
+        Returns
+        -----------------------
+        bool
+            `True` if the DB accepted the value, always `True`
+            in batched mode
+        """
+        if (
+            not index.isValid()
+            or role != Qt.ItemDataRole.EditRole
+            or index.column() == 0
+        ):
+            return False
+
+        if self.__batched:
+            row = self.__row(index.row())
+            pending = self.__pending.setdefault(row[0], {})
+
+            if value == row[index.column()]:
+                pending.pop(index.column(), None)
+            else:
+                pending[index.column()] = value
+
+            if not pending:
+                del self.__pending[row[0]]
+
+            self.dataChanged.emit(index, index)
+            self.pendingChanged.emit(len(self.__pending))
+            return True
+
+        with self.__tracer.operation("setData"):
+            old = self.__row(index.row())
+
+            # column names come from the table schema
+            query = self.__statements.query(
+                f"UPDATE expenses SET {self.__columns[index.column()]} = ? "
+                "WHERE id = ? ;",
+                [value, old[0]],
+            )
+            if not self.__tracer.exec(query):
+                return False
+
+            # reading back the value, converted by SQLite
+            query = self.__statements.query(
+                "SELECT * FROM expenses WHERE id = ? ;", [old[0]]
+            )
+            self.__tracer.exec(query)
+            query.next()
+            new = [query.value(i) for i in range(len(self.__columns))]
+            self.__tracer.fetched(1)
+            query.finish()
+
+            self.rowEdited.emit(list(old), new)
+
+            # the edited row may have moved, or left the filter
+            if self.reorders([self.__columns[index.column()]]):
+                self.applyChanges(
+                    {new[0]: index.row()}, self.positions([new[0]])
+                )
+                return True
+
+            old[:] = new
+            self.dataChanged.emit(index, index)
+
+            return True
+
+    def flags(self, index: QModelIndex) -> Qt.ItemFlag:
+        """Return the flags of the given cell.
+
+        Parameters
+        -----------------------
+        index : QModelIndex
+            Index of the cell
+
+        Returns
+        -----------------------
+        Qt.ItemFlag
+            Default flags, editable except for the primary key
+        """
+        flags = super().flags(index)
+        if index.isValid() and index.column() != 0:
+            flags |= Qt.ItemFlag.ItemIsEditable
+
+        return flags
+
+    def headerData(
+        self,
+        section: int,
+        orientation: Qt.Orientation,
+        role: int = Qt.ItemDataRole.DisplayRole,
+    ) -> object:
+        """Return the header of the given section.
+
+        Parameters
+        -----------------------
+        section : int
+            Row or column number
+        orientation : Qt.Orientation
+            Horizontal for column headers
+        role : int
+            Requested data role
+
+        Returns
+        -----------------------
+        object
+            Column names, default row headers
+        """
+        if (
+            orientation == Qt.Orientation.Horizontal
+            and role == Qt.ItemDataRole.DisplayRole
+        ):
+            return self.__columns[section]
+
+        return super().headerData(section, orientation, role)
+
+    def sort(
+        self,
+        column: int,
+        order: Qt.SortOrder = Qt.SortOrder.AscendingOrder,
+    ):
+        """Sort rows by the given column.
+
+        Parameters
+        -----------------------
+        column : int
+            Index of the sort column, negative for default
+            ordering (by date, newest first)
+        order : Qt.SortOrder
+            Sort order
+        """
+        if column < 0:
+            column, order = 1, Qt.SortOrder.DescendingOrder
+
+        self.__sortColumn = column
+        self.__sortOrder = order
+
+        self.select()
+
+    def isBatched(self) -> bool:
+        """Return whether edits are held as pending.
+
+        Returns
+        -----------------------
+        bool
+            `True` in batched mode
+        """
+        return self.__batched
+
+    def setBatched(self, batched: bool):
+        """Switch between immediate and batched edits.
+
+        Pending edits are discarded when leaving batched mode.
+
+        Parameters
+        -----------------------
+        batched : bool
+            `True` to hold edits as pending
+        """
+        if not batched:
+            self.revertAll()
+
+        self.__batched = batched
+
+    def pendingEdits(self) -> dict[int, dict[str, object]]:
+        """Return the pending values by record id and column.
+
+        Returns
+        -----------------------
+        dict[int, dict[str, object]]
+            Pending values by column name, by record id, in
+            order of first edit
+        """
+        return {
+            rowid: {self.__columns[c]: v for c, v in pending.items()}
+            for rowid, pending in self.__pending.items()
+        }
+
+    def revertAll(self):
+        """Discard all pending edits."""
+        if not self.__pending:
+            return
+
+        self.__pending.clear()
+
+        if self.__count > 0:
+            self.dataChanged.emit(
+                self.index(0, 0),
+                self.index(self.__count - 1, len(self.__columns) - 1),
+            )
+        self.pendingChanged.emit(0)
+
+    def __row(self, row: int) -> list:
+        """Return the cached row, fetching its page if needed.
+
+        Parameters
+        -----------------------
+        row : int
+            Row in the model
+
+        Returns
+        -----------------------
+        list
+            Values of the record, ordered as the columns
+        """
+        page = row // PAGE_SIZE
+
+        if page in self.__pages:
+            self.__pages.move_to_end(page)
+        else:
+            self.__pages[page] = self.__fetch(page)
+            if len(self.__pages) > CACHE_PAGES:
+                self.__pages.popitem(last=False)
+
+        return self.__pages[page][row % PAGE_SIZE]
+
+    def __fetch(self, page: int) -> list[list]:
+        """Fetch the given page from the DB.
+
+        Parameters
+        -----------------------
+        page : int
+            Index of the page
+
+        Returns
+        -----------------------
+        list[list]
+            Rows of the page
+        """
+        with self.__tracer.operation("fetch"):
+            rows = self.__select("*", page * PAGE_SIZE, PAGE_SIZE)
+
+        if rows:
+            self.__keys[page] = self.__key(rows[-1])
+
+        # rows may have been removed by other connections
+        ncols = len(self.__columns)
+        while len(rows) < min(PAGE_SIZE, self.__count - page * PAGE_SIZE):
+            rows.append([None] * ncols)
+
+        return rows
+
+    def __select(self, columns: str, first: int, count: int) -> list[list]:
+        """Select a contiguous range of rows from the DB.
+
+        The range starts after the closest known key of a page
+        ending before `first`, with an offset if needed.
+
+        Parameters
+        -----------------------
+        columns : str
+            Columns to select, "*" for all
+        first : int
+            First row of the range
+        count : int
+            Number of rows in the range
+
+        Returns
+        -----------------------
+        list[list]
+            Selected values, by row
+        """
+        # closest page ending before the range, with known last key
+        anchor = first // PAGE_SIZE - 1
+        while anchor >= 0 and anchor not in self.__keys:
+            anchor -= 1
+
+        key = self.__keys[anchor] if anchor >= 0 else None
+
+        return self.__rows(
+            *self.__pageQuery(
+                columns, key, count, first - (anchor + 1) * PAGE_SIZE
+            )
+        )
+
+    def __rows(self, statement: str, values: list) -> list[list]:
+        """Execute a query, returning the selected rows.
+
+        Parameters
+        -----------------------
+        statement : str
+            Statement with placeholders
+        values : list
+            Values of the placeholders
+
+        Returns
+        -----------------------
+        list[list]
+            Selected values, by row
+        """
+        query = self.__statements.query(statement, values)
+        query.setForwardOnly(True)
+        self.__tracer.exec(query)
+
+        ncols = query.record().count()
+        rows = []
+        while query.next():
+            rows.append([query.value(i) for i in range(ncols)])
+        self.__tracer.fetched(len(rows))
+        query.finish()
+
+        return rows
+
+    def __discard(self, first: int, last: int = None):
+        """Discard a range of cached pages, with their keys.
+
+        Parameters
+        -----------------------
+        first : int
+            First discarded page
+        last : int
+            Page after the last discarded one, `None` to discard
+            all pages from `first`
+        """
+        for cache in (self.__pages, self.__keys):
+            for page in [
+                p for p in cache if p >= first and (last is None or p < last)
+            ]:
+                del cache[page]
+
+    def __runs(self, rows: Iterable[int]) -> list[tuple[int, int]]:
+        """Group rows into runs of contiguous rows.
+
+        Parameters
+        -----------------------
+        rows : Iterable[int]
+            Rows in the model, possibly repeated
+
+        Returns
+        -----------------------
+        list[tuple[int, int]]
+            First and last row of each run, in increasing order
+        """
+        rows = sorted(set(rows))
+        runs = []
+
+        start = 0
+        for i in range(1, len(rows) + 1):
+            # end of a run of contiguous rows
+            if i == len(rows) or rows[i] != rows[i - 1] + 1:
+                runs.append((rows[start], rows[i - 1]))
+                start = i
+
+        return runs
+
+    def __countQuery(self, key: tuple = None) -> tuple[str, list]:
+        """Return the query counting the rows matching the filter.
+
+        Parameters
+        -----------------------
+        key : tuple
+            Key of a row, to count only the rows preceding it,
+            `None` to count all rows
+
+        Returns
+        -----------------------
+        tuple[str, list]
+            Statement with placeholders, and the bound values
+        """
+        conditions, values = self.__filter()
+
+        if key is not None:
+            # preceding rows come after the key in reverse order
+            condition, keyValues = self.__after(key, not self.__descending())
+            conditions.append(condition)
+            values += keyValues
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        return f"SELECT COUNT(*) FROM expenses {where} ;", values
+
+    def __pageQuery(
+        self,
+        columns: str,
+        key: tuple,
+        count: int,
+        offset: int,
+        reverse: bool = False,
+    ) -> tuple[str, list]:
+        """Return the query selecting a range of rows.
+
+        Parameters
+        -----------------------
+        columns : str
+            Columns to select, "*" for all
+        key : tuple
+            Key of the row preceding the range, `None` to start
+            from the first row
+        count : int
+            Number of rows in the range
+        offset : int
+            Number of rows to skip after `key`
+        reverse : bool
+            Whether to select from the last row backwards
+
+        Returns
+        -----------------------
+        tuple[str, list]
+            Statement with placeholders, and the bound values
+        """
+        conditions, values = self.__filter()
+
+        descending = self.__descending() != reverse
+        _, order = self.__ordering(descending)
+
+        if key is not None:
+            condition, keyValues = self.__after(key, descending)
+            conditions.append(condition)
+            values += keyValues
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        # bound limits, the statement depends only on the sort,
+        # on the filter and on whether a key is given
+        return (
+            f"SELECT {columns} FROM expenses {where} ORDER BY {order} "
+            "LIMIT ? OFFSET ? ;",
+            values + [count, offset],
+        )
+
+    def __key(self, row: list) -> tuple:
+        """Return the keyset pagination key of a row.
+
+        Parameters
+        -----------------------
+        row : list
+            Values of the record
+
+        Returns
+        -----------------------
+        tuple
+            (sort value, id), or (id,) if sorting by id
+        """
+        if self.__sortColumn == 0:
+            return (row[0],)
+
+        return (row[self.__sortColumn], row[0])
+
+    def __descending(self) -> bool:
+        """Return whether rows are sorted in descending order.
+
+        Returns
+        -----------------------
+        bool
+            `True` for descending order
+        """
+        return self.__sortOrder == Qt.SortOrder.DescendingOrder
+
+    def __ordering(self, descending: bool) -> tuple[str, str]:
+        """Return the key columns and the ordering of the rows.
+
+        Parameters
+        -----------------------
+        descending : bool
+            Whether to order rows in descending order
+
+        Returns
+        -----------------------
+        tuple[str, str]
+            Key columns, as a row value if more than one, and
+            ORDER BY clause
+        """
+        direction = "DESC" if descending else "ASC"
+
+        if self.__sortColumn == 0:
+            return "id", f"id {direction}"
+
+        sortName = self.__columns[self.__sortColumn]
+        return f"({sortName}, id)", f"{sortName} {direction}, id {direction}"
+
+    def __after(
+        self, key: tuple, descending: bool, inclusive: bool = False
+    ) -> tuple[str, list]:
+        """Return the condition selecting the rows after a key.
+
+        Parameters
+        -----------------------
+        key : tuple
+            Key of a row, see `__key()`
+        descending : bool
+            Whether rows are ordered in descending order
+        inclusive : bool
+            Whether to select the row of the key too
+
+        Returns
+        -----------------------
+        tuple[str, list]
+            Condition with placeholders, and their values
+        """
+        keyColumns, _ = self.__ordering(descending)
+
+        placeholders = ", ".join("?" * len(key))
+        if len(key) > 1:
+            placeholders = f"({placeholders})"
+
+        operator = "<" if descending else ">"
+        if inclusive:
+            operator += "="
+
+        return f"{keyColumns} {operator} {placeholders}", list(key)
+
+    def __filter(self) -> tuple[list[str], list]:
+        """Return conditions and values of the filter.
+
+        Returns
+        -----------------------
+        tuple[list[str], list]
+            Conditions with placeholders, and their values
+        """
+        conditions, values = [], []
+
+        if self.__dates is not None:
+            conditions.append("date BETWEEN ? AND ?")
+            values += list(self.__dates)
+
+        if self.__text.split():
+            condition, match = searchCondition(self.__text)
+            conditions.append(condition)
+            values.append(match)
+
+        return conditions, values
@@ -0,0 +1,232 @@
+"""Pivot model.
+
+Classes
+-----------------------
+PivotModel
+    Read-only table model of expense statistics by period and type.
+"""
+
+# Copyright (c) 2022 Adriano Angelone
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the
+# Software.
+#
+# This file is part of sem-qt.
+#
+# This file may be used under the terms of the GNU General
+# Public License version 3.0 as published by the Free Software
+# Foundation and appearing in the file LICENSE included in the
+# packaging of this file.  Please review the following
+# information to ensure the GNU General Public License version
+# 3.0 requirements will be met:
+# http://www.gnu.org/copyleft/gpl.html.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY
+# KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE
+# WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR
+# PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+# OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+# SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex, QObject
+
+# statistics of each pivot cell, in the order of the pivot rows
+PIVOT_STATISTICS = ["sum", "count", "avg", "min", "max"]
+
+
+class PivotModel(QAbstractTableModel):
+    """Read-only table model of expense statistics by period and type.
+
+    Periods are rows and types are columns, each cell shows one
+    of the statistics of the records of its period and type,
+    empty if there are none. Contents are computed elsewhere and
+    set in bulk.
+
+    Private attributes
+    -----------------------
+    __periods : list[str]
+        Periods of the pivot, in ascending order
+    __types : list[str]
+        Types of the pivot, in ascending order
+    __cells : dict[tuple[str, str], tuple]
+        Statistics of each (period, type) pair, ordered as in
+        `PIVOT_STATISTICS`
+    __statistic : int
+        Index of the shown statistic in `PIVOT_STATISTICS`
+
+    Public methods
+    -----------------------
+    __init__(QObject)
+        Construct class instance.
+    setPivot(list[tuple])
+        Replace the contents of the model.
+    statistic() -> str
+        Return the name of the shown statistic.
+    setStatistic(str)
+        Change the shown statistic.
+    rowCount(QModelIndex) -> int
+        Return the number of rows.
+    columnCount(QModelIndex) -> int
+        Return the number of columns.
+    data(QModelIndex, int) -> object
+        Return the data of the given cell.
+    headerData(int, Qt.Orientation, int) -> object
+        Return the header of the given section.
+    """
+
+    def __init__(self, parent: QObject = None):
+        """Construct class instance.
+
+        Parameters
+        -----------------------
+        parent : QObject
+            Parent QObject
+        """
+        super().__init__(parent)
+
+        self.__periods = []
+        self.__types = []
+        self.__cells = {}
+        self.__statistic = 0
+
+    def setPivot(self, rows: list[tuple]):
+        """Replace the contents of the model.
+
+        Parameters
+        -----------------------
+        rows : list[tuple]
+            (period, type, sum, count, avg, min, max) rows, as
+            returned by `ModelWrapper.pivot()`
+        """
+        self.beginResetModel()
+        self.__periods = sorted({row[0] for row in rows})
+        self.__types = sorted({row[1] for row in rows})
+        self.__cells = {(row[0], row[1]): row[2:] for row in rows}
+        self.endResetModel()
+
+    def statistic(self) -> str:
+        """Return the name of the shown statistic.
+
+        Returns
+        -----------------------
+        str
+            One of `PIVOT_STATISTICS`
+        """
+        return PIVOT_STATISTICS[self.__statistic]
+
+    def setStatistic(self, name: str):
+        """Change the shown statistic.
+
+        Parameters
+        -----------------------
+        name : str
+            One of `PIVOT_STATISTICS`
+
+        Raises
+        -----------------------
+        - ValueError if unknown statistic
+        """
+        self.__statistic = PIVOT_STATISTICS.index(name)
+
+        if self.__periods and self.__types:
+            self.dataChanged.emit(
+                self.index(0, 0),
+                self.index(len(self.__periods) - 1, len(self.__types) - 1),
+                [Qt.ItemDataRole.DisplayRole],
+            )
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        """Return the number of rows.
+
+        Parameters
+        -----------------------
+        parent : QModelIndex
+            Parent index, invalid for table models
+
+        Returns
+        -----------------------
+        int
+            Number of periods in the pivot
+        """
+        return 0 if parent.isValid() else len(self.__periods)
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        """Return the number of columns.
+
+        Parameters
+        -----------------------
+        parent : QModelIndex
+            Parent index, invalid for table models
+
+        Returns
+        -----------------------
+        int
+            Number of types in the pivot
+        """
+        return 0 if parent.isValid() else len(self.__types)
+
+    def data(
+        self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole
+    ) -> object:
+        """Return the data of the given cell.
+
+        Parameters
+        -----------------------
+        index : QModelIndex
+            Index of the cell
+        role : int
+            Requested data role
+
+        Returns
+        -----------------------
+        object
+            Shown statistic for the display role, averages
+            rounded to cents, `None` for other roles and for
+            empty cells
+        """
+        if not index.isValid() or role != Qt.ItemDataRole.DisplayRole:
+            return None
+
+        key = (self.__periods[index.row()], self.__types[index.column()])
+        if key not in self.__cells:
+            return None
+
+        value = self.__cells[key][self.__statistic]
+        if PIVOT_STATISTICS[self.__statistic] == "avg":
+            value = round(value, 2)
+
+        return value
+
+    def headerData(
+        self,
+        section: int,
+        orientation: Qt.Orientation,
+        role: int = Qt.ItemDataRole.DisplayRole,
+    ) -> object:
+        """Return the header of the given section.
+
+        Parameters
+        -----------------------
+        section : int
+            Row or column number
+        orientation : Qt.Orientation
+            Horizontal for column headers
+        role : int
+            Requested data role
+
+        Returns
+        -----------------------
+        object
+            Types as column headers, periods as row headers
+        """
+        if role != Qt.ItemDataRole.DisplayRole:
+            return super().headerData(section, orientation, role)
+
+        if orientation == Qt.Orientation.Horizontal:
+            return self.__types[section]
+
+        return self.__periods[section]
@@ -0,0 +1,284 @@
+"""Prefix-sum index.
+
+Classes
+-----------------------
+PrefixSums
+    Per-type cumulative sums of expenses, indexed by date.
+"""
+
+# Copyright (c) 2022 Adriano Angelone
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the
+# Software.
+#
+# This file is part of sem-qt.
+#
+# This file may be used under the terms of the GNU General
+# Public License version 3.0 as published by the Free Software
+# Foundation and appearing in the file LICENSE included in the
+# packaging of this file.  Please review the following
+# information to ensure the GNU General Public License version
+# 3.0 requirements will be met:
+# http://www.gnu.org/copyleft/gpl.html.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY
+# KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE
+# WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR
+# PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+# OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+# SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+from collections.abc import Iterable
+import datetime
+
+
+# days added on both sides of the indexed range when growing it
+RANGE_MARGIN = 366
+
+
+class PrefixSums:
+    """Per-type cumulative sums of expenses, indexed by date.
+
+    For each expense type, amounts and counts are stored in
+    Fenwick trees over the days of a contiguous date range:
+    the sum over any [startDate, endDate] interval takes two
+    O(log n) prefix queries per type, and so does adding or
+    removing an expense. The range grows as needed, by
+    `RANGE_MARGIN` days at a time.
+
+    Private attributes
+    -----------------------
+    __base : dict[str, int]
+        Ordinal of the first day in the range, by type
+    __points : dict[str, list[list[float]]]
+        [amounts, counts] of each day in the range, by type
+    __trees : dict[str, list[list[float]]]
+        Fenwick trees of [amounts, counts], by type
+
+    Public methods
+    -----------------------
+    __init__()
+        Construct class instance.
+    build(Iterable[tuple[str, str, float, int]])
+        Replace the contents with the given daily totals.
+    add(str, str, float, int)
+        Add amount and count to the given date and type.
+    sums(list[str]) -> list[tuple[str, float]]
+        Return the sums of the amounts by type in a date range.
+
+    Private methods
+    -----------------------
+    __grow(str, int)
+        Extend the range of a type to include the given day.
+    __prefix(str, int, int) -> float
+        Return the prefix sum of a tree up to the given day.
+    __tree(list) -> list
+        Build a 1-based Fenwick tree in O(n).
+    """
+
+    def __init__(self):
+        """Construct class instance."""
+        self.__base = {}
+        self.__points = {}
+        self.__trees = {}
+
+    def build(self, totals: Iterable[tuple[str, str, float, int]]):
+        """Replace the contents with the given daily totals.
+
+        Parameters
+        -----------------------
+        totals : Iterable[tuple[str, str, float, int]]
+            (date, type, total, count) tuples, at most one for
+            each date and type
+        """
+        self.__base = {}
+        self.__points = {}
+        self.__trees = {}
+
+        days = {}
+        for date, type_, total, count in totals:
+            ordinal = datetime.date.fromisoformat(date).toordinal()
+            days.setdefault(type_, []).append((ordinal, total, count))
+
+        for type_, entries in days.items():
+            first = min(e[0] for e in entries) - RANGE_MARGIN
+            last = max(e[0] for e in entries) + RANGE_MARGIN
+
+            amounts = [0.0] * (last - first + 1)
+            counts = [0] * (last - first + 1)
+            for ordinal, total, count in entries:
+                amounts[ordinal - first] += total
+                counts[ordinal - first] += count
+
+            self.__base[type_] = first
+            self.__points[type_] = [amounts, counts]
+            self.__trees[type_] = [self.__tree(amounts), self.__tree(counts)]
+
+    def add(self, date: str, type_: str, amount: float, count: int = 1):
+        """Add amount and count to the given date and type.
+
+        Removals are performed with opposite amount and count.
+
+        Parameters
+        -----------------------
+        date : str
+            Date of the expense, 'yyyy-mm-dd'
+        type_ : str
+            Type of the expense
+        amount : float
+            Amount to add
+        count : int
+            Number of expenses to add
+        """
+        ordinal = datetime.date.fromisoformat(date).toordinal()
+        self.__grow(type_, ordinal)
+
+        points = self.__points[type_]
+        trees = self.__trees[type_]
+        i = ordinal - self.__base[type_]
+
+        points[0][i] += amount
+        points[1][i] += count
+
+        # 1-based Fenwick update
+        size = len(points[0])
+        i += 1
+        while i <= size:
+            trees[0][i] += amount
+            trees[1][i] += count
+            i += i & -i
+
+    def sums(self, dates: list[str]) -> list[tuple[str, float]]:
+        """Return the sums of the amounts by type in a date range.
+
+        Parameters
+        -----------------------
+        dates : list[str]
+            [startDate, endDate], both included, `None` for
+            all dates
+
+        Returns
+        -----------------------
+        list[tuple[str, float]]
+            (type, sum) tuples, ordered by type, for the types
+            with expenses in the range
+
+        Raises
+        -----------------------
+        - ValueError if invalid dates
+        """
+        start, end = None, None
+        if dates is not None:
+            start = datetime.date.fromisoformat(dates[0]).toordinal()
+            end = datetime.date.fromisoformat(dates[1]).toordinal()
+
+        result = []
+        for type_ in sorted(self.__base):
+            first = self.__base[type_]
+            last = first + len(self.__points[type_][0]) - 1
+
+            lo = first if start is None else max(start, first)
+            hi = last if end is None else min(end, last)
+            if lo > hi:
+                continue
+
+            count = self.__prefix(type_, 1, hi) - self.__prefix(
+                type_, 1, lo - 1
+            )
+            if count <= 0:
+                continue
+
+            amount = self.__prefix(type_, 0, hi) - self.__prefix(
+                type_, 0, lo - 1
+            )
+            result.append((type_, amount))
+
+        return result
+
+    def __grow(self, type_: str, ordinal: int):
+        """Extend the range of a type to include the given day.
+
+        Parameters
+        -----------------------
+        type_ : str
+            Type of the expense
+        ordinal : int
+            Ordinal of the day to include
+        """
+        if type_ in self.__base:
+            first = self.__base[type_]
+            amounts, counts = self.__points[type_]
+            last = first + len(amounts) - 1
+
+            if first <= ordinal <= last:
+                return
+        else:
+            # empty range
+            first, last = ordinal, ordinal - 1
+            amounts, counts = [], []
+
+        before = first - min(first, ordinal - RANGE_MARGIN)
+        after = max(last, ordinal + RANGE_MARGIN) - last
+
+        # padding the point values, trees are rebuilt in O(n)
+        amounts = [0.0] * before + amounts + [0.0] * after
+        counts = [0] * before + counts + [0] * after
+
+        self.__base[type_] = first - before
+        self.__points[type_] = [amounts, counts]
+        self.__trees[type_] = [self.__tree(amounts), self.__tree(counts)]
+
+    def __prefix(self, type_: str, tree: int, ordinal: int) -> float:
+        """Return the prefix sum of a tree up to the given day.
+
+        Parameters
+        -----------------------
+        type_ : str
+            Type of the expense
+        tree : int
+            0 for amounts, 1 for counts
+        ordinal : int
+            Ordinal of the last day included
+
+        Returns
+        -----------------------
+        float
+            Sum of the values up to the given day, included
+        """
+        values = self.__trees[type_][tree]
+
+        # 1-based Fenwick query
+        i = ordinal - self.__base[type_] + 1
+        result = 0
+        while i > 0:
+            result += values[i]
+            i -= i & -i
+
+        return result
+
+    @staticmethod
+    def __tree(points: list) -> list:
+        """Build a 1-based Fenwick tree in O(n).
+
+        Parameters
+        -----------------------
+        points : list
+            Point values
+
+        Returns
+        -----------------------
+        list
+            The Fenwick tree, with an unused leading element
+        """
+        tree = [0] + points
+        size = len(points)
+
+        for i in range(1, size + 1):
+            j = i + (i & -i)
+            if j <= size:
+                tree[j] += tree[i]
+
+        return tree
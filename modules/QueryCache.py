@@ -0,0 +1,148 @@
+"""Prepared query cache.
+
+Classes
+-----------------------
+QueryCache
+    Cache of prepared queries on a connection.
+"""
+
+# Copyright (c) 2022 Adriano Angelone
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the
+# Software.
+#
+# This file is part of sem-qt.
+#
+# This file may be used under the terms of the GNU General
+# Public License version 3.0 as published by the Free Software
+# Foundation and appearing in the file LICENSE included in the
+# packaging of this file.  Please review the following
+# information to ensure the GNU General Public License version
+# 3.0 requirements will be met:
+# http://www.gnu.org/copyleft/gpl.html.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY
+# KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE
+# WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR
+# PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+# OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+# SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+from collections import OrderedDict
+
+from PyQt6.QtSql import QSqlDatabase, QSqlQuery
+
+# number of prepared queries kept per connection
+STATEMENT_CACHE_SIZE = 32
+
+
+class QueryCache:
+    """Cache of prepared queries on a connection.
+
+    Queries are prepared (parsed and planned by SQLite) once
+    per statement text, and reused with new bound values, at
+    most `size` queries are kept, least recently used queries
+    are discarded first.
+
+    Reused queries keep the values bound by previous users,
+    all placeholders must be bound again by position.
+
+    Private attributes
+    -----------------------
+    __conn : QSqlDatabase
+        Database connection
+    __size : int
+        Maximum number of cached queries, 0 disables caching
+    __queries : OrderedDict[str, QSqlQuery]
+        Cached queries by statement, least recently used first
+    __hits : int
+        Number of lookups served from the cache
+    __misses : int
+        Number of lookups requiring a new query
+
+    Public methods
+    -----------------------
+    __init__(QSqlDatabase, int)
+        Construct class instance.
+    query(str, list) -> QSqlQuery
+        Return the prepared query of a statement, with bound values.
+    stats() -> tuple[int, int]
+        Return the number of cache hits and misses.
+    clear()
+        Discard all cached queries.
+    """
+
+    def __init__(self, conn: QSqlDatabase, size: int = STATEMENT_CACHE_SIZE):
+        """Construct class instance.
+
+        Parameters
+        -----------------------
+        conn : QSqlDatabase
+            Database connection
+        size : int
+            Maximum number of cached queries, 0 disables caching
+        """
+        self.__conn = conn
+        self.__size = size
+        self.__queries = OrderedDict()
+        self.__hits = 0
+        self.__misses = 0
+
+    def query(self, statement: str, values: list = None) -> QSqlQuery:
+        """Return the prepared query of a statement, with bound values.
+
+        Parameters
+        -----------------------
+        statement : str
+            Statement with positional placeholders
+        values : list
+            Values of the placeholders, in order, may be `None`
+
+        Returns
+        -----------------------
+        QSqlQuery
+            Prepared query, ready to be executed, to be finished
+            before the next lookup of the same statement
+        """
+        query = self.__queries.get(statement)
+
+        if query is not None:
+            self.__hits += 1
+            self.__queries.move_to_end(statement)
+        else:
+            self.__misses += 1
+            query = QSqlQuery(self.__conn)
+            query.prepare(statement)
+
+            if self.__size > 0:
+                self.__queries[statement] = query
+                if len(self.__queries) > self.__size:
+                    self.__queries.popitem(last=False)
+
+        for i, value in enumerate(values or []):
+            query.bindValue(i, value)
+
+        return query
+
+    def stats(self) -> tuple[int, int]:
+        """Return the number of cache hits and misses.
+
+        Returns
+        -----------------------
+        tuple[int, int]
+            Lookups served from the cache, and requiring a new
+            query
+        """
+        return self.__hits, self.__misses
+
+    def clear(self):
+        """Discard all cached queries.
+
+        Required before closing the connection.
+        """
+        for query in self.__queries.values():
+            query.finish()
+        self.__queries.clear()
@@ -0,0 +1,339 @@
+"""Query tracer.
+
+Classes
+-----------------------
+QueryTracer
+    Timer of operations and, optionally, of the executed queries.
+
+Functions
+-----------------------
+traced(Callable) -> Callable
+    Decorate a method as an operation of `self.tracer`.
+"""
+
+# Copyright (c) 2022 Adriano Angelone
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the
+# Software.
+#
+# This file is part of sem-qt.
+#
+# This file may be used under the terms of the GNU General
+# Public License version 3.0 as published by the Free Software
+# Foundation and appearing in the file LICENSE included in the
+# packaging of this file.  Please review the following
+# information to ensure the GNU General Public License version
+# 3.0 requirements will be met:
+# http://www.gnu.org/copyleft/gpl.html.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY
+# KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE
+# WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR
+# PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+# OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+# SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+from collections import deque
+from collections.abc import Callable, Iterator
+import bisect
+import contextlib
+import functools
+import json
+import time
+
+from PyQt6.QtCore import QObject, pyqtSignal
+from PyQt6.QtSql import QSqlQuery
+
+# number of traced statements kept in memory
+TRACE_SIZE = 10000
+# upper bounds of the histogram bins, in milliseconds
+# (the last bin collects slower operations)
+HISTOGRAM_BINS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000]
+
+
+class QueryTracer(QObject):
+    """Timer of operations and, optionally, of the executed queries.
+
+    Operations (e.g. applying a filter) are always timed, and
+    their timings collected in per-operation histograms.
+    Nested operations are named after their enclosing ones,
+    as in "filter/select".
+
+    When enabled, each executed query is also recorded, with
+    statement, bound values, wall time (including the fetching
+    of the rows, if reported) and number of rows, in a ring
+    buffer of the last `TRACE_SIZE` queries.
+
+    Private attributes
+    -----------------------
+    __enabled : bool
+        Whether queries are recorded
+    __entries : deque[dict]
+        Recorded queries, oldest first
+    __pending : dict
+        Last recorded query, until its rows are reported
+    __stack : list[str]
+        Names of the running operations, outermost first
+    __histograms : dict[str, list[int]]
+        Number of timings in each bin, by operation
+
+    Public methods
+    -----------------------
+    __init__(QObject, int)
+        Construct class instance.
+    isEnabled() -> bool
+        Return whether queries are recorded.
+    setEnabled(bool)
+        Enable or disable the recording of queries.
+    exec(QSqlQuery, str) -> bool
+        Execute a query, recording it if enabled.
+    fetched(int)
+        Report the number of rows fetched by the last query.
+    operation(str) -> Iterator[None]
+        Time an operation, as a context manager.
+    entries() -> list[dict]
+        Return the recorded queries, oldest first.
+    histograms() -> dict[str, list[int]]
+        Return the histograms of the operation timings.
+    dump(str)
+        Write the recorded queries to a JSON-lines file.
+    clear()
+        Discard recorded queries and timings.
+
+    Private methods
+    -----------------------
+    __record(QSqlQuery, float, bool)
+        Record an executed query.
+
+    Signals
+    -----------------------
+    operationTimed[str, float]
+        Broadcast the name and duration (ms) of an outermost
+        operation.
+    """
+
+    def __init__(self, parent: QObject = None, size: int = TRACE_SIZE):
+        """Construct class instance.
+
+        Parameters
+        -----------------------
+        parent : QObject
+            Parent QObject
+        size : int
+            Maximum number of recorded queries
+        """
+        super().__init__(parent)
+
+        self.__enabled = False
+        self.__entries = deque(maxlen=size)
+        self.__pending = None
+        self.__stack = []
+        self.__histograms = {}
+
+    operationTimed = pyqtSignal(str, float)
+    """Broadcast the duration of an outermost operation.
+
+    Parameters
+    -----------------------
+    name : str
+        Name of the operation
+    ms : float
+        Duration of the operation, in milliseconds
+    """
+
+    def isEnabled(self) -> bool:
+        """Return whether queries are recorded.
+
+        Returns
+        -----------------------
+        bool
+            `True` if queries are recorded
+        """
+        return self.__enabled
+
+    def setEnabled(self, enabled: bool):
+        """Enable or disable the recording of queries.
+
+        Parameters
+        -----------------------
+        enabled : bool
+            `True` to record queries
+        """
+        self.__enabled = enabled
+        self.__pending = None
+
+    def exec(self, query: QSqlQuery, statement: str = None) -> bool:
+        """Execute a query, recording it if enabled.
+
+        Parameters
+        -----------------------
+        query : QSqlQuery
+            Query to execute, prepared if `statement` is `None`
+        statement : str
+            Statement to execute, `None` for the prepared one
+
+        Returns
+        -----------------------
+        bool
+            `True` if successful, as `QSqlQuery.exec()`
+        """
+        if not self.__enabled:
+            return query.exec() if statement is None else query.exec(statement)
+
+        start = time.perf_counter()
+        chk = query.exec() if statement is None else query.exec(statement)
+        self.__record(query, start, chk)
+
+        return chk
+
+    def fetched(self, rows: int):
+        """Report the number of rows fetched by the last query.
+
+        The fetching time is added to the wall time of the query.
+
+        Parameters
+        -----------------------
+        rows : int
+            Number of fetched rows
+        """
+        if self.__pending is None:
+            return
+
+        entry = self.__pending
+        entry["rows"] = rows
+        entry["ms"] = (time.perf_counter() - entry.pop("start")) * 1000.0
+        self.__pending = None
+
+    @contextlib.contextmanager
+    def operation(self, name: str) -> Iterator[None]:
+        """Time an operation, as a context manager.
+
+        Parameters
+        -----------------------
+        name : str
+            Name of the operation
+
+        Yields
+        -----------------------
+        None
+        """
+        self.__stack.append(name)
+        path = "/".join(self.__stack)
+        start = time.perf_counter()
+
+        try:
+            yield
+        finally:
+            elapsed = (time.perf_counter() - start) * 1000.0
+            self.__stack.pop()
+
+            bins = self.__histograms.setdefault(
+                path, [0] * (len(HISTOGRAM_BINS) + 1)
+            )
+            bins[bisect.bisect_left(HISTOGRAM_BINS, elapsed)] += 1
+
+            if not self.__stack:
+                self.operationTimed.emit(path, elapsed)
+
+    def entries(self) -> list[dict]:
+        """Return the recorded queries, oldest first.
+
+        Returns
+        -----------------------
+        list[dict]
+            Recorded queries, with keys "op", "statement",
+            "values", "ms", "rows" and "ok"
+        """
+        return [
+            {key: value for key, value in entry.items() if key != "start"}
+            for entry in self.__entries
+        ]
+
+    def histograms(self) -> dict[str, list[int]]:
+        """Return the histograms of the operation timings.
+
+        Returns
+        -----------------------
+        dict[str, list[int]]
+            Number of timings in each bin of `HISTOGRAM_BINS`
+            (plus one for slower timings), by operation
+        """
+        return {name: list(bins) for name, bins in self.__histograms.items()}
+
+    def dump(self, filename: str):
+        """Write the recorded queries to a JSON-lines file.
+
+        Parameters
+        -----------------------
+        filename : str
+            Path of the output file
+
+        Raises
+        -----------------------
+        - OSError if the file cannot be written
+        """
+        with open(filename, "w", encoding="utf-8") as trace:
+            for entry in self.entries():
+                trace.write(json.dumps(entry, default=str))
+                trace.write("\n")
+
+    def clear(self):
+        """Discard recorded queries and timings."""
+        self.__entries.clear()
+        self.__pending = None
+        self.__histograms.clear()
+
+    def __record(self, query: QSqlQuery, start: float, chk: bool):
+        """Record an executed query.
+
+        Parameters
+        -----------------------
+        query : QSqlQuery
+            Executed query
+        start : float
+            `time.perf_counter()` before the execution
+        chk : bool
+            Whether the execution was successful
+        """
+        entry = {
+            "op": "/".join(self.__stack),
+            "statement": " ".join(query.lastQuery().split()),
+            "values": query.boundValues(),
+            "ms": (time.perf_counter() - start) * 1000.0,
+            "rows": None if query.isSelect() else query.numRowsAffected(),
+            "ok": chk,
+        }
+        self.__entries.append(entry)
+
+        # selects are completed when their rows are reported
+        self.__pending = None
+        if query.isSelect():
+            entry["start"] = start
+            self.__pending = entry
+
+
+def traced(method: Callable) -> Callable:
+    """Decorate a method as an operation of `self.tracer`.
+
+    The operation is named after the method.
+
+    Parameters
+    -----------------------
+    method : Callable
+        Method of a class with a `tracer` attribute
+
+    Returns
+    -----------------------
+    Callable
+        Method timed by `self.tracer.operation()`
+    """
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.tracer.operation(method.__name__):
+            return method(self, *args, **kwargs)
+
+    return wrapper
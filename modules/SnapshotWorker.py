@@ -0,0 +1,133 @@
+"""Background snapshot worker.
+
+Classes
+-----------------------
+SnapshotWorker
+    Worker saving snapshots of the database off the GUI thread.
+"""
+
+# Copyright (c) 2022 Adriano Angelone
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the
+# Software.
+#
+# This file is part of sem-qt.
+#
+# This file may be used under the terms of the GNU General
+# Public License version 3.0 as published by the Free Software
+# Foundation and appearing in the file LICENSE included in the
+# packaging of this file.  Please review the following
+# information to ensure the GNU General Public License version
+# 3.0 requirements will be met:
+# http://www.gnu.org/copyleft/gpl.html.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY
+# KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE
+# WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR
+# PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+# OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+# SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+from PyQt6 import QtCore
+from PyQt6.QtCore import QObject, pyqtSignal
+from PyQt6.QtSql import QSqlDatabase
+
+from modules.ModelWrapper import SNAPSHOT_RETENTION, DatabaseError, ModelWrapper
+
+
+class SnapshotWorker(QObject):
+    """Worker saving snapshots of the database off the GUI thread.
+
+    Meant to be moved to a QThread, whose `started` signal
+    should be connected to `run()`. A dedicated named
+    connection to the database is opened in the worker
+    thread, and removed before `finished` is emitted. The
+    snapshot cannot be cancelled once started.
+
+    Private attributes
+    -----------------------
+    __database : str
+        Filename of the database
+    __keep : int
+        Number of snapshots kept, `None` to keep all of them
+
+    Public methods
+    -----------------------
+    __init__(str, int)
+        Construct class instance.
+
+    Signals
+    -----------------------
+    succeeded[str]
+        Broadcast the filename of the saved snapshot.
+    failed[str]
+        Broadcast error message.
+    finished[]
+        Broadcast end of the snapshot, in any case.
+
+    Public slots
+    -----------------------
+    run()
+        Save the snapshot.
+    """
+
+    def __init__(self, database: str, keep: int = SNAPSHOT_RETENTION):
+        """Construct class instance.
+
+        Parameters
+        -----------------------
+        database : str
+            Filename of the database
+        keep : int
+            Number of snapshots kept, older ones are removed,
+            `None` to keep all of them
+        """
+        super().__init__()
+
+        self.__database = database
+        self.__keep = keep
+
+    succeeded = pyqtSignal(str)
+    """Broadcast the filename of the saved snapshot.
+
+    Parameters
+    -----------------------
+    filename : str
+        Filename of the snapshot
+    """
+
+    failed = pyqtSignal(str)
+    """Broadcast error message.
+
+    Parameters
+    -----------------------
+    message : str
+        Description of the error
+    """
+
+    finished = pyqtSignal()
+    """Broadcast end of the snapshot, in any case."""
+
+    @QtCore.pyqtSlot()
+    def run(self):
+        """Save the snapshot."""
+        connName = f"snapshot-{id(self)}"
+
+        models = ModelWrapper(None, connName)
+        try:
+            models.openDB(self.__database)
+            filename = models.snapshot(keep=self.__keep)
+            models.closeDB()
+        except DatabaseError as err:
+            self.failed.emit(f"{err}")
+        else:
+            self.succeeded.emit(filename)
+
+        # connection can only be removed once unreferenced
+        del models
+        QSqlDatabase.removeDatabase(connName)
+
+        self.finished.emit()
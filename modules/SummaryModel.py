@@ -0,0 +1,167 @@
+"""Summary model.
+
+Classes
+-----------------------
+SummaryModel
+    Read-only table model of expense amounts aggregated by type.
+"""
+
+# Copyright (c) 2022 Adriano Angelone
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the
+# Software.
+#
+# This file is part of sem-qt.
+#
+# This file may be used under the terms of the GNU General
+# Public License version 3.0 as published by the Free Software
+# Foundation and appearing in the file LICENSE included in the
+# packaging of this file.  Please review the following
+# information to ensure the GNU General Public License version
+# 3.0 requirements will be met:
+# http://www.gnu.org/copyleft/gpl.html.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY
+# KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE
+# WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR
+# PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+# OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+# SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex, QObject
+
+
+class SummaryModel(QAbstractTableModel):
+    """Read-only table model of expense amounts aggregated by type.
+
+    Contents are computed elsewhere and set in bulk.
+
+    Private attributes
+    -----------------------
+    __rows : list[tuple[str, float]]
+        (type, sum) rows of the model
+
+    Public methods
+    -----------------------
+    __init__(QObject)
+        Construct class instance.
+    setSums(list[tuple[str, float]])
+        Replace the contents of the model.
+    rowCount(QModelIndex) -> int
+        Return the number of rows.
+    columnCount(QModelIndex) -> int
+        Return the number of columns.
+    data(QModelIndex, int) -> object
+        Return the data of the given cell.
+    headerData(int, Qt.Orientation, int) -> object
+        Return the header of the given section.
+    """
+
+    def __init__(self, parent: QObject = None):
+        """Construct class instance.
+
+        Parameters
+        -----------------------
+        parent : QObject
+            Parent QObject
+        """
+        super().__init__(parent)
+
+        self.__rows = []
+
+    def setSums(self, rows: list[tuple[str, float]]):
+        """Replace the contents of the model.
+
+        Parameters
+        -----------------------
+        rows : list[tuple[str, float]]
+            (type, sum) rows of the model
+        """
+        self.beginResetModel()
+        self.__rows = rows
+        self.endResetModel()
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        """Return the number of rows.
+
+        Parameters
+        -----------------------
+        parent : QModelIndex
+            Parent index, invalid for table models
+
+        Returns
+        -----------------------
+        int
+            Number of types in the summary
+        """
+        return 0 if parent.isValid() else len(self.__rows)
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        """Return the number of columns.
+
+        Parameters
+        -----------------------
+        parent : QModelIndex
+            Parent index, invalid for table models
+
+        Returns
+        -----------------------
+        int
+            2, type and sum
+        """
+        return 0 if parent.isValid() else 2
+
+    def data(
+        self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole
+    ) -> object:
+        """Return the data of the given cell.
+
+        Parameters
+        -----------------------
+        index : QModelIndex
+            Index of the cell
+        role : int
+            Requested data role
+
+        Returns
+        -----------------------
+        object
+            Type or sum for the display role, `None` otherwise
+        """
+        if not index.isValid() or role != Qt.ItemDataRole.DisplayRole:
+            return None
+
+        return self.__rows[index.row()][index.column()]
+
+    def headerData(
+        self,
+        section: int,
+        orientation: Qt.Orientation,
+        role: int = Qt.ItemDataRole.DisplayRole,
+    ) -> object:
+        """Return the header of the given section.
+
+        Parameters
+        -----------------------
+        section : int
+            Row or column number
+        orientation : Qt.Orientation
+            Horizontal for column headers
+        role : int
+            Requested data role
+
+        Returns
+        -----------------------
+        object
+            Column names, default row headers
+        """
+        if (
+            orientation == Qt.Orientation.Horizontal
+            and role == Qt.ItemDataRole.DisplayRole
+        ):
+            return ["type", "sum"][section]
+
+        return super().headerData(section, orientation, role)
@@ -0,0 +1,149 @@
+"""Timing dialog.
+
+Classes
+-----------------------
+TimingDialog
+    Dialog showing histograms of the operation timings.
+"""
+
+# Copyright (c) 2022 Adriano Angelone
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the
+# Software.
+#
+# This file is part of sem-qt.
+#
+# This file may be used under the terms of the GNU General
+# Public License version 3.0 as published by the Free Software
+# Foundation and appearing in the file LICENSE included in the
+# packaging of this file.  Please review the following
+# information to ensure the GNU General Public License version
+# 3.0 requirements will be met:
+# http://www.gnu.org/copyleft/gpl.html.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY
+# KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE
+# WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR
+# PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+# OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+# SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+from PyQt6 import QtCore
+from PyQt6.QtWidgets import (
+    QDialog,
+    QHBoxLayout,
+    QPushButton,
+    QTableWidget,
+    QTableWidgetItem,
+    QVBoxLayout,
+    QWidget,
+)
+
+from modules.QueryTracer import HISTOGRAM_BINS, QueryTracer
+
+TIMING_DIALOG_WIDTH = 1000
+TIMING_DIALOG_HEIGHT = 400
+
+
+class TimingDialog(QDialog):
+    """Dialog showing histograms of the operation timings.
+
+    One row per operation, with the number of timings in each
+    bin of `HISTOGRAM_BINS`.
+
+    Private attributes
+    -----------------------
+    __tracer : QueryTracer
+        Source of the timings
+    __tabTimings : QTableWidget
+        Table of the histograms
+    __butRefresh : QPushButton
+        Button to reload the histograms
+    __butClear : QPushButton
+        Button to discard the timings
+
+    Public methods
+    -----------------------
+    __init__(QWidget, QueryTracer)
+        Construct class instance.
+
+    Private slots
+    -----------------------
+    __refresh()
+        Reload the histograms from the tracer.
+    __clear()
+        Discard the timings and traced queries.
+    """
+
+    def __init__(self, parent: QWidget, tracer: QueryTracer):
+        """Construct class instance.
+
+        Parameters
+        -----------------------
+        parent : QWidget
+            Parent QWidget
+        tracer : QueryTracer
+            Source of the timings
+        """
+        super().__init__(parent)
+
+        self.__tracer = tracer
+
+        self.setWindowTitle("Operation timings")
+        self.resize(TIMING_DIALOG_WIDTH, TIMING_DIALOG_HEIGHT)
+
+        self.__tabTimings = QTableWidget(self)
+        self.__tabTimings.setEditTriggers(
+            QTableWidget.EditTrigger.NoEditTriggers
+        )
+        self.__tabTimings.setColumnCount(len(HISTOGRAM_BINS) + 2)
+        self.__tabTimings.setHorizontalHeaderLabels(
+            ["count"]
+            + [f"<= {ms} ms" for ms in HISTOGRAM_BINS]
+            + [f"> {HISTOGRAM_BINS[-1]} ms"]
+        )
+
+        self.__butRefresh = QPushButton("Refresh", self)
+        self.__butClear = QPushButton("Clear", self)
+
+        buttons = QHBoxLayout()
+        buttons.addStretch()
+        buttons.addWidget(self.__butRefresh)
+        buttons.addWidget(self.__butClear)
+
+        layout = QVBoxLayout(self)
+        layout.addWidget(self.__tabTimings)
+        layout.addLayout(buttons)
+
+        self.__butRefresh.clicked.connect(self.__refresh)
+        self.__butClear.clicked.connect(self.__clear)
+
+        self.__refresh()
+
+    @QtCore.pyqtSlot()
+    def __refresh(self):
+        """Reload the histograms from the tracer."""
+        histograms = self.__tracer.histograms()
+        names = sorted(histograms)
+
+        self.__tabTimings.setRowCount(len(names))
+        self.__tabTimings.setVerticalHeaderLabels(names)
+
+        for row, name in enumerate(names):
+            bins = histograms[name]
+            values = [sum(bins)] + bins
+            for column, value in enumerate(values):
+                self.__tabTimings.setItem(
+                    row, column, QTableWidgetItem(str(value) if value else "")
+                )
+
+        self.__tabTimings.resizeColumnsToContents()
+
+    @QtCore.pyqtSlot()
+    def __clear(self):
+        """Discard the timings and traced queries."""
+        self.__tracer.clear()
+        self.__refresh()
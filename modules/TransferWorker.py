@@ -0,0 +1,332 @@
+"""Background transfer worker.
+
+Classes
+-----------------------
+TransferWorker
+    Worker performing CSV imports and exports off the GUI thread.
+"""
+
+# Copyright (c) 2022 Adriano Angelone
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the
+# Software.
+#
+# This file is part of sem-qt.
+#
+# This file may be used under the terms of the GNU General
+# Public License version 3.0 as published by the Free Software
+# Foundation and appearing in the file LICENSE included in the
+# packaging of this file.  Please review the following
+# information to ensure the GNU General Public License version
+# 3.0 requirements will be met:
+# http://www.gnu.org/copyleft/gpl.html.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY
+# KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE
+# WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR
+# PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+# OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+# SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+from PyQt6 import QtCore
+from PyQt6.QtCore import QObject, pyqtSignal
+from PyQt6.QtSql import QSqlDatabase
+
+from modules.ModelWrapper import (
+    DatabaseError,
+    InvalidRows,
+    OperationCancelled,
+    ModelWrapper,
+)
+
+
+class TransferWorker(QObject):
+    """Worker performing CSV imports and exports off the GUI thread.
+
+    Meant to be moved to a QThread, whose `started` signal
+    should be connected to `run()`. A dedicated named
+    connection to the database is opened in the worker
+    thread, and removed before `finished` is emitted.
+
+    Private attributes
+    -----------------------
+    __database : str
+        Filename of the database
+    __filenames : list[str]
+        Filenames of the CSV files, a single one for exports
+    __export : bool
+        `True` for exports, `False` for imports
+    __dates : list[str]
+        Date range of exported records, `None` for all records
+    __rejects : str
+        Filename receiving the invalid rows of imports, which
+        are skipped, `None` to reject the whole import instead
+    __duplicates : str
+        Handling of the imported rows duplicating records, one
+        of `DUPLICATE_MODES`, `None` to import them unchecked
+    __cancelled : bool
+        Whether cancellation has been requested
+
+    Public methods
+    -----------------------
+    __init__(str, list[str], bool, list[str], str, str)
+        Construct class instance.
+    isExport() -> bool
+        Return whether the transfer is an export.
+    filenames() -> list[str]
+        Return the filenames of the CSV files.
+    rejects() -> str
+        Return the filename receiving the invalid rows.
+    duplicates() -> str
+        Return the handling of the duplicated rows.
+    cancel()
+        Request cancellation of the transfer.
+
+    Private methods
+    -----------------------
+    __report(int, int) -> bool
+        Broadcast progress, return whether to continue.
+
+    Signals
+    -----------------------
+    progress[int, int]
+        Broadcast number of rows and bytes transferred.
+    succeeded[]
+        Broadcast successful completion.
+    cancelled[]
+        Broadcast completed cancellation.
+    failed[str]
+        Broadcast error message.
+    invalid[list]
+        Broadcast the errors of invalid imported rows.
+    duplicated[list]
+        Broadcast the imported rows duplicating records.
+    finished[]
+        Broadcast end of the transfer, in any case.
+
+    Public slots
+    -----------------------
+    run()
+        Perform the transfer.
+    """
+
+    def __init__(
+        self,
+        database: str,
+        filenames: list[str],
+        export: bool,
+        dates: list[str] = None,
+        rejects: str = None,
+        duplicates: str = None,
+    ):
+        """Construct class instance.
+
+        Parameters
+        -----------------------
+        database : str
+            Filename of the database
+        filenames : list[str]
+            Filenames of the CSV files, a single one for
+            exports, imported in parallel if several
+        export : bool
+            `True` to dump the database, `False` to import
+        dates : list[str]
+            [startDate, endDate], restricts exports to the
+            records in this range, `None` for all records
+        rejects : str
+            Filename receiving the invalid rows of imports,
+            which are skipped, `None` to reject the whole import
+            instead
+        duplicates : str
+            Handling of the imported rows duplicating records,
+            one of `DUPLICATE_MODES`, `None` to import them
+            unchecked
+        """
+        super().__init__()
+
+        self.__database = database
+        self.__filenames = filenames
+        self.__export = export
+        self.__dates = dates
+        self.__rejects = rejects
+        self.__duplicates = duplicates
+        self.__cancelled = False
+
+    def isExport(self) -> bool:
+        """Return whether the transfer is an export.
+
+        Returns
+        -----------------------
+        bool
+            `True` for exports, `False` for imports
+        """
+        return self.__export
+
+    def filenames(self) -> list[str]:
+        """Return the filenames of the CSV files.
+
+        Returns
+        -----------------------
+        list[str]
+            Filenames of the CSV files, a single one for exports
+        """
+        return self.__filenames
+
+    def rejects(self) -> str:
+        """Return the filename receiving the invalid rows.
+
+        Returns
+        -----------------------
+        str
+            Filename of the rejected rows of imports, `None` if
+            invalid rows reject the whole import
+        """
+        return self.__rejects
+
+    def duplicates(self) -> str:
+        """Return the handling of the duplicated rows.
+
+        Returns
+        -----------------------
+        str
+            One of `DUPLICATE_MODES`, `None` if imported rows
+            are not checked
+        """
+        return self.__duplicates
+
+    def cancel(self):
+        """Request cancellation of the transfer.
+
+        Thread-safe, checked between batches. Imports are
+        rolled back, partial exports removed.
+        """
+        self.__cancelled = True
+
+    progress = pyqtSignal(int, int)
+    """Broadcast number of rows and bytes transferred.
+
+    Parameters
+    -----------------------
+    rows : int
+        Number of rows transferred so far
+    nbytes : int
+        Number of bytes read or written so far
+    """
+
+    succeeded = pyqtSignal()
+    """Broadcast successful completion."""
+
+    cancelled = pyqtSignal()
+    """Broadcast completed cancellation."""
+
+    failed = pyqtSignal(str)
+    """Broadcast error message.
+
+    Parameters
+    -----------------------
+    message : str
+        Description of the error
+    """
+
+    invalid = pyqtSignal(list)
+    """Broadcast the errors of invalid imported rows.
+
+    Emitted instead of `failed` if the import is rejected, or
+    before `succeeded` if the rows were skipped.
+
+    Parameters
+    -----------------------
+    errors : list[tuple[str, int, str, str]]
+        (filename, line, column, reason) of each error
+    """
+
+    duplicated = pyqtSignal(list)
+    """Broadcast the imported rows duplicating records.
+
+    Emitted before `succeeded` if the rows were checked, even
+    if none is a duplicate.
+
+    Parameters
+    -----------------------
+    rows : list[tuple[str, int]]
+        (filename, line) of each row, skipped or flagged
+    """
+
+    finished = pyqtSignal()
+    """Broadcast end of the transfer, in any case."""
+
+    @QtCore.pyqtSlot()
+    def run(self):
+        """Perform the transfer."""
+        connName = f"transfer-{id(self)}"
+
+        models = ModelWrapper(None, connName)
+        try:
+            models.openDB(self.__database)
+
+            # (filename, line, column, reason) of skipped rows,
+            # and (filename, line) of duplicated ones
+            errors, duplicated = [], []
+            if self.__export:
+                models.saveCSV(self.__filenames[0], self.__report, self.__dates)
+            elif len(self.__filenames) == 1:
+                errors = models.importCSV(
+                    self.__filenames[0],
+                    self.__report,
+                    self.__rejects,
+                    self.__duplicates,
+                    duplicated,
+                )
+            else:
+                errors = models.importCSVs(
+                    self.__filenames,
+                    self.__report,
+                    rejects=self.__rejects,
+                    duplicates=self.__duplicates,
+                    duplicated=duplicated,
+                )
+        except OperationCancelled:
+            self.cancelled.emit()
+        except InvalidRows as err:
+            self.invalid.emit(err.errors)
+        except DatabaseError as err:
+            self.failed.emit(f"{err}")
+        else:
+            if errors:
+                self.invalid.emit(errors)
+            if not self.__export and self.__duplicates is not None:
+                self.duplicated.emit(duplicated)
+            self.succeeded.emit()
+        finally:
+            # closing on every path, unless never opened
+            try:
+                models.closeDB()
+            except DatabaseError:
+                pass
+
+        # connection can only be removed once unreferenced
+        del models
+        QSqlDatabase.removeDatabase(connName)
+
+        self.finished.emit()
+
+    def __report(self, rows: int, nbytes: int) -> bool:
+        """Broadcast progress, return whether to continue.
+
+        Parameters
+        -----------------------
+        rows : int
+            Number of rows transferred so far
+        nbytes : int
+            Number of bytes read or written so far
+
+        Returns
+        -----------------------
+        bool
+            `False` if cancellation has been requested
+        """
+        self.progress.emit(rows, nbytes)
+        return not self.__cancelled
@@ -0,0 +1,242 @@
+"""Validation of CSV expense files.
+
+Parses and validates CSV files of expenses against the CHECK
+constraints of the 'expenses' table, without Qt dependencies,
+so that files can be validated in worker processes.
+
+Classes
+-----------------------
+ValidationError
+    Subclassed exception for invalid CSV content.
+
+Functions
+-----------------------
+isDate(str) -> bool
+    Return whether a string is a valid 'yyyy-mm-dd' date.
+checkRow(list[str]) -> tuple[tuple, list[tuple[str, str]]]
+    Convert a CSV row to validated values, or list its errors.
+parseFile(str, int) -> tuple[list, list[str], list]
+    Parse and validate a CSV file into JSON batches of rows.
+"""
+
+# Copyright (c) 2022 Adriano Angelone
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the
+# Software.
+#
+# This file is part of sem-qt.
+#
+# This file may be used under the terms of the GNU General
+# Public License version 3.0 as published by the Free Software
+# Foundation and appearing in the file LICENSE included in the
+# packaging of this file.  Please review the following
+# information to ensure the GNU General Public License version
+# 3.0 requirements will be met:
+# http://www.gnu.org/copyleft/gpl.html.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY
+# KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE
+# WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR
+# PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+# OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+# SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+import csv
+import datetime
+import functools
+import json
+import math
+import re
+
+# fields of a CSV row, as the columns of the 'expenses' table
+COLUMNS = ["id", "date", "type", "amount", "justification"]
+
+# maximum length of the justifications, as in the 'expenses' table
+JUSTIFICATION_LENGTH = 100
+
+# dates accepted by SQLite's DATE(), which returns them unchanged
+DATE_PATTERN = re.compile(r"\d{4}-\d{2}-\d{2}")
+# number of distinct dates whose validity is remembered
+DATE_CACHE_SIZE = 1 << 16
+# ids, without the signs and separators accepted by int()
+ID_PATTERN = re.compile(r"\d+")
+
+
+class ValidationError(Exception):
+    """Subclassed exception for invalid CSV content."""
+
+
+@functools.lru_cache(maxsize=DATE_CACHE_SIZE)
+def isDate(text: str) -> bool:
+    """Return whether a string is a valid 'yyyy-mm-dd' date.
+
+    Cached, as the rows of a file share few dates.
+
+    Parameters
+    -----------------------
+    text : str
+        String to check
+
+    Returns
+    -----------------------
+    bool
+        `True` if SQLite's DATE() would return it unchanged
+    """
+    if not DATE_PATTERN.fullmatch(text):
+        return False
+
+    try:
+        datetime.date.fromisoformat(text)
+    except ValueError:
+        return False
+
+    return True
+
+
+def checkRow(row: list[str]) -> tuple[tuple, list[tuple[str, str]]]:
+    """Convert a CSV row to validated values, or list its errors.
+
+    Checks the same constraints as the 'expenses' table: valid
+    'yyyy-mm-dd' date, single-character type, finite numeric
+    amount and justification of at most `JUSTIFICATION_LENGTH`
+    characters. All fields are checked, not only up to the
+    first error.
+
+    Parameters
+    -----------------------
+    row : list[str]
+        Fields of the row, `id` may be empty or omitted
+
+    Returns
+    -----------------------
+    tuple[tuple, list[tuple[str, str]]]
+        (id, date, type, amount, justification), `id` is
+        `None` if it should be auto-assigned, `amount` is a
+        float, `None` if invalid, and the (column, reason)
+        errors of the row, the column is empty if the number
+        of fields is wrong
+    """
+    # if 1st field is left unspecified, auto-assign
+    if len(row) == 4:
+        row = ["", *row]
+
+    if len(row) != 5:
+        return None, [("", f"expected 4 or 5 fields, found {len(row)}")]
+
+    id_, date, type_, amount, justification = row
+    errors = []
+
+    if id_ == "":
+        id_ = None
+    elif ID_PATTERN.fullmatch(id_):
+        id_ = int(id_)
+    else:
+        errors.append(("id", f"'{id_}' is not a positive integer"))
+
+    if not isDate(date):
+        errors.append(("date", f"'{date}' is not a valid yyyy-mm-dd date"))
+
+    if len(type_) != 1:
+        errors.append(("type", f"'{type_}' is not a single character"))
+
+    # float() also accepts digit separators, SQLite does not
+    try:
+        if "_" in amount:
+            raise ValueError(amount)
+        amount = float(amount)
+        if not math.isfinite(amount):
+            raise ValueError(amount)
+    except ValueError:
+        errors.append(("amount", f"'{amount}' is not a finite number"))
+
+    if len(justification) > JUSTIFICATION_LENGTH:
+        errors.append(
+            (
+                "justification",
+                f"longer than {JUSTIFICATION_LENGTH} characters",
+            )
+        )
+
+    if errors:
+        return None, errors
+
+    return (id_, date, type_, amount, justification), errors
+
+
+def parseFile(
+    filename: str, batchSize: int
+) -> tuple[
+    list[tuple[str, list[int]]],
+    list[str],
+    list[tuple[int, list[str], list[tuple[str, str]]]],
+]:
+    """Parse and validate a CSV file into JSON batches of rows.
+
+    Meant to run in worker processes: the whole file is read
+    and validated, and its valid rows serialized, before any of
+    them reaches the database. Invalid rows are set aside, with
+    all their errors.
+
+    Parameters
+    -----------------------
+    filename : str
+        Filename of the input CSV file
+    batchSize : int
+        Number of rows of each batch
+
+    Returns
+    -----------------------
+    tuple[list, list[str], list]
+        - Batches of the valid rows, each as a JSON array of
+          the tuples returned by `checkRow()` with the line
+          numbers of the rows
+        - Distinct dates of the valid rows, sorted
+        - (line, fields, errors) of each invalid row, errors
+          as returned by `checkRow()`
+
+    Raises
+    -----------------------
+    - OSError if the file cannot be read
+    - ValidationError if the file is not valid CSV, reported
+      with the filename
+    """
+    batches = []
+    dates = set()
+    rejects = []
+
+    with open(filename, "r", newline="", encoding="utf-8") as csvfile:
+        reader = csv.reader(csvfile, quotechar='"')
+
+        rows, lines = [], []
+        try:
+            for row in reader:
+                values, errors = checkRow(row)
+                if errors:
+                    rejects.append((reader.line_num, row, errors))
+                    continue
+
+                rows.append(values)
+                lines.append(reader.line_num)
+
+                if len(rows) == batchSize:
+                    batches.append((json.dumps(rows), lines))
+                    dates.update(r[1] for r in rows)
+                    rows, lines = [], []
+        except csv.Error as err:
+            raise ValidationError(
+                f"{filename} :: CSV file error :: line {reader.line_num} "
+                f":: {err}"
+            ) from err
+        except UnicodeDecodeError as err:
+            raise ValidationError(
+                f"{filename} :: Invalid encoding after line {reader.line_num}"
+            ) from err
+
+    if rows:
+        batches.append((json.dumps(rows), lines))
+        dates.update(r[1] for r in rows)
+
+    return batches, sorted(dates), rejects
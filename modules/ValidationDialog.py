@@ -0,0 +1,148 @@
+"""Validation dialog.
+
+Classes
+-----------------------
+ValidationDialog
+    Dialog listing the errors of invalid imported rows.
+"""
+
+# Copyright (c) 2022 Adriano Angelone
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the
+# Software.
+#
+# This file is part of sem-qt.
+#
+# This file may be used under the terms of the GNU General
+# Public License version 3.0 as published by the Free Software
+# Foundation and appearing in the file LICENSE included in the
+# packaging of this file.  Please review the following
+# information to ensure the GNU General Public License version
+# 3.0 requirements will be met:
+# http://www.gnu.org/copyleft/gpl.html.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY
+# KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE
+# WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR
+# PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+# OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+# SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+import os
+
+from PyQt6.QtWidgets import (
+    QDialog,
+    QDialogButtonBox,
+    QLabel,
+    QTableWidget,
+    QTableWidgetItem,
+    QVBoxLayout,
+    QWidget,
+)
+
+VALIDATION_DIALOG_WIDTH = 800
+VALIDATION_DIALOG_HEIGHT = 400
+
+# maximum number of listed errors
+REPORT_ROWS = 1000
+
+
+class ValidationDialog(QDialog):
+    """Dialog listing the errors of invalid imported rows.
+
+    One row per error, with file, line, column and reason. If
+    the import was rejected, accepting the dialog requests to
+    import again skipping the invalid rows.
+
+    Private attributes
+    -----------------------
+    __labSummary : QLabel
+        Number of errors and outcome of the import
+    __tabErrors : QTableWidget
+        Table of the first `REPORT_ROWS` errors
+    __buttons : QDialogButtonBox
+        Buttons to close the dialog, or to skip invalid rows
+
+    Public methods
+    -----------------------
+    __init__(QWidget, list[tuple[str, int, str, str]], str)
+        Construct class instance.
+    """
+
+    def __init__(
+        self,
+        parent: QWidget,
+        errors: list[tuple[str, int, str, str]],
+        rejects: str = None,
+    ):
+        """Construct class instance.
+
+        Parameters
+        -----------------------
+        parent : QWidget
+            Parent QWidget
+        errors : list[tuple[str, int, str, str]]
+            (filename, line, column, reason) of each error
+        rejects : str
+            Filename the skipped rows were written to, `None` if
+            the import was rejected
+        """
+        super().__init__(parent)
+
+        self.setWindowTitle("Invalid rows")
+        self.resize(VALIDATION_DIALOG_WIDTH, VALIDATION_DIALOG_HEIGHT)
+
+        rows = len({(filename, line) for filename, line, _, _ in errors})
+        if rejects is None:
+            summary = (
+                f"{len(errors)} errors in {rows} rows, nothing was imported."
+            )
+        else:
+            summary = (
+                f"{len(errors)} errors in {rows} rows, skipped and "
+                f"written to {rejects}."
+            )
+        if len(errors) > REPORT_ROWS:
+            summary += f" First {REPORT_ROWS} errors:"
+
+        self.__labSummary = QLabel(summary, self)
+        self.__labSummary.setWordWrap(True)
+
+        self.__tabErrors = QTableWidget(self)
+        self.__tabErrors.setEditTriggers(
+            QTableWidget.EditTrigger.NoEditTriggers
+        )
+        self.__tabErrors.setColumnCount(4)
+        self.__tabErrors.setHorizontalHeaderLabels(
+            ["file", "line", "column", "reason"]
+        )
+        self.__tabErrors.verticalHeader().setVisible(False)
+        self.__tabErrors.horizontalHeader().setStretchLastSection(True)
+
+        shown = errors[:REPORT_ROWS]
+        self.__tabErrors.setRowCount(len(shown))
+        for row, (filename, line, column, reason) in enumerate(shown):
+            values = [os.path.basename(filename), str(line), column, reason]
+            for col, value in enumerate(values):
+                self.__tabErrors.setItem(row, col, QTableWidgetItem(value))
+        self.__tabErrors.resizeColumnsToContents()
+
+        self.__buttons = QDialogButtonBox(
+            QDialogButtonBox.StandardButton.Close, self
+        )
+        if rejects is None:
+            self.__buttons.addButton(
+                "Import valid rows only",
+                QDialogButtonBox.ButtonRole.AcceptRole,
+            )
+
+        layout = QVBoxLayout(self)
+        layout.addWidget(self.__labSummary)
+        layout.addWidget(self.__tabErrors)
+        layout.addWidget(self.__buttons)
+
+        self.__buttons.accepted.connect(self.accept)
+        self.__buttons.rejected.connect(self.reject)
@@ -0,0 +1,601 @@
+"""Command-line interface of sem-qt.
+
+Imports, exports and summaries without starting the GUI: only
+QtCore and QtSql are loaded, so the interface also runs on
+headless machines. Results are written to stdout as CSV.
+
+    $ sem-qt-cli create expenses.db
+    $ sem-qt-cli import expenses.db day1.csv day2.csv
+    $ sem-qt-cli import --create new.db day*.csv
+    $ sem-qt-cli import --jobs 4 expenses.db day*.csv
+    $ sem-qt-cli import --rejects bad.csv expenses.db day*.csv
+    $ sem-qt-cli import --duplicates skip expenses.db statement.csv
+    $ sem-qt-cli export expenses.db --from 2023-01-01 --to 2023-12-31
+    $ sem-qt-cli export expenses.db --since nightly -o delta.csv
+    $ sem-qt-cli checkpoints expenses.db
+    $ sem-qt-cli summary expenses.db --from 2023-01-01 --to 2023-12-31
+    $ sem-qt-cli stats expenses.db
+    $ sem-qt-cli snapshot --keep 5 expenses.db
+    $ sem-qt-cli restore expenses.db
+    $ sem-qt-cli --trace trace.jsonl summary expenses.db
+
+Functions
+-----------------------
+main()
+    Run the command-line interface.
+"""
+
+# Copyright (c) 2022 Adriano Angelone
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the
+# Software.
+#
+# This file is part of sem-qt.
+#
+# This file may be used under the terms of the GNU General
+# Public License version 3.0 as published by the Free Software
+# Foundation and appearing in the file LICENSE included in the
+# packaging of this file.  Please review the following
+# information to ensure the GNU General Public License version
+# 3.0 requirements will be met:
+# http://www.gnu.org/copyleft/gpl.html.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY
+# KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE
+# WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR
+# PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+# OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+# SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+import argparse
+import csv
+import datetime
+import os
+import sys
+
+from PyQt6.QtCore import QCoreApplication
+
+from modules.ModelWrapper import (
+    DUPLICATE_MODES,
+    EXPENSE_COLUMNS,
+    SNAPSHOT_RETENTION,
+    DatabaseError,
+    InvalidRows,
+    ModelWrapper,
+)
+
+
+def isoDate(text: str) -> str:
+    """Validate a date argument.
+
+    Parameters
+    -----------------------
+    text : str
+        Date in YYYY-MM-DD format
+
+    Returns
+    -----------------------
+    str
+        The validated date
+
+    Raises
+    -----------------------
+    - argparse.ArgumentTypeError if invalid date
+    """
+    try:
+        return datetime.date.fromisoformat(text).isoformat()
+    except ValueError as err:
+        raise argparse.ArgumentTypeError(f"invalid date '{text}'") from err
+
+
+def columnList(text: str) -> list[str]:
+    """Validate a comma-separated list of columns.
+
+    Parameters
+    -----------------------
+    text : str
+        Comma-separated subset of `EXPENSE_COLUMNS`
+
+    Returns
+    -----------------------
+    list[str]
+        The validated columns
+
+    Raises
+    -----------------------
+    - argparse.ArgumentTypeError if unknown column
+    """
+    columns = text.split(",")
+
+    for column in columns:
+        if column not in EXPENSE_COLUMNS:
+            raise argparse.ArgumentTypeError(f"unknown column '{column}'")
+
+    return columns
+
+
+def dateRange(args: argparse.Namespace) -> list[str]:
+    """Return the date range of the parsed arguments.
+
+    Parameters
+    -----------------------
+    args : argparse.Namespace
+        Parsed arguments, with `start` and `end` attributes
+
+    Returns
+    -----------------------
+    list[str]
+        [startDate, endDate], `None` if neither is given,
+        missing ends are left open
+    """
+    if args.start is None and args.end is None:
+        return None
+
+    return [
+        args.start if args.start is not None else datetime.date.min.isoformat(),
+        args.end if args.end is not None else datetime.date.max.isoformat(),
+    ]
+
+
+def printErrors(errors: list[tuple[str, int, str, str]]):
+    """Print the errors of invalid rows on stderr.
+
+    Parameters
+    -----------------------
+    errors : list[tuple[str, int, str, str]]
+        (filename, line, column, reason) of each error
+    """
+    for filename, line, column, reason in errors:
+        field = f" {column}:" if column else ""
+        print(f"{filename}:{line}:{field} {reason}", file=sys.stderr)
+
+
+def printDuplicates(duplicated: list[tuple[str, int]], mode: str):
+    """Print the number of duplicated rows on stderr.
+
+    Flagged rows are also listed, one per line.
+
+    Parameters
+    -----------------------
+    duplicated : list[tuple[str, int]]
+        (filename, line) of each row duplicating a record
+    mode : str
+        One of `DUPLICATE_MODES`
+    """
+    if mode == "flag":
+        for filename, line in duplicated:
+            print(f"{filename}:{line}: duplicate of a record", file=sys.stderr)
+
+    action = "skipped" if mode == "skip" else "imported, flagged"
+    print(f"{len(duplicated)} duplicate rows {action}", file=sys.stderr)
+
+
+def reportCreated(models: ModelWrapper, args: argparse.Namespace):
+    """Report the creation of the DB on stderr.
+
+    The DB is created when connecting, see `main()`.
+
+    Parameters
+    -----------------------
+    models : ModelWrapper
+        Wrapper connected to the new DB
+    args : argparse.Namespace
+        Parsed arguments
+    """
+    print(f"{models.databaseName()}: created", file=sys.stderr)
+
+
+def importFiles(models: ModelWrapper, args: argparse.Namespace):
+    """Import CSV files, reporting the added records on stderr.
+
+    Each file is imported in its own transaction, unless parsing
+    in parallel (`--jobs`) or skipping invalid rows (`--rejects`),
+    which import all files in a single transaction. All invalid
+    rows are reported, and with `--duplicates` the number of
+    rows duplicating records.
+
+    Parameters
+    -----------------------
+    models : ModelWrapper
+        Wrapper connected to the DB
+    args : argparse.Namespace
+        Parsed arguments
+
+    Raises
+    -----------------------
+    - InvalidRows if invalid rows, without `--rejects`
+    """
+    try:
+        if args.jobs is not None or args.rejects is not None:
+            importAll(models, args)
+        else:
+            for filename in args.files:
+                duplicated = []
+                before = models.countRecords()
+                models.importCSV(
+                    filename,
+                    duplicates=args.duplicates,
+                    duplicated=duplicated,
+                )
+                added = models.countRecords() - before
+
+                print(f"{filename}: {added} records imported", file=sys.stderr)
+                if args.duplicates is not None:
+                    printDuplicates(duplicated, args.duplicates)
+    except InvalidRows as err:
+        printErrors(err.errors)
+        raise
+
+
+def importAll(models: ModelWrapper, args: argparse.Namespace):
+    """Import CSV files in a single transaction.
+
+    Parameters
+    -----------------------
+    models : ModelWrapper
+        Wrapper connected to the DB
+    args : argparse.Namespace
+        Parsed arguments
+    """
+    duplicated = []
+    before = models.countRecords()
+    errors = models.importCSVs(
+        args.files,
+        workers=args.jobs,
+        rejects=args.rejects,
+        duplicates=args.duplicates,
+        duplicated=duplicated,
+    )
+    added = models.countRecords() - before
+
+    printErrors(errors)
+    if errors:
+        print(f"invalid rows written to {args.rejects}", file=sys.stderr)
+
+    print(f"{len(args.files)} files: {added} records imported", file=sys.stderr)
+    if args.duplicates is not None:
+        printDuplicates(duplicated, args.duplicates)
+
+
+def exportRecords(models: ModelWrapper, args: argparse.Namespace):
+    """Export records to a CSV file, or stream them to stdout.
+
+    With `--since`, export the changes since the checkpoint
+    instead, as rows starting with an operation marker.
+
+    Parameters
+    -----------------------
+    models : ModelWrapper
+        Wrapper connected to the DB
+    args : argparse.Namespace
+        Parsed arguments
+
+    Raises
+    -----------------------
+    - DatabaseError if `--since` is combined with a date range
+      or columns
+    """
+    if args.since is not None:
+        if dateRange(args) is not None or args.columns is not None:
+            raise DatabaseError("Delta exports include all dates and columns")
+
+        if args.output != "-":
+            models.saveDelta(args.output, args.since, None, args.advance)
+        else:
+            models.writeDelta(sys.stdout, args.since, None, args.advance)
+        return
+
+    if args.output != "-":
+        models.saveCSV(args.output, None, dateRange(args), args.columns)
+        return
+
+    models.writeCSV(sys.stdout, None, dateRange(args), args.columns)
+
+
+def printSummary(models: ModelWrapper, args: argparse.Namespace):
+    """Print the sums by type as CSV.
+
+    Parameters
+    -----------------------
+    models : ModelWrapper
+        Wrapper connected to the DB
+    args : argparse.Namespace
+        Parsed arguments
+    """
+    writer = csv.writer(sys.stdout, quoting=csv.QUOTE_NONNUMERIC)
+    writer.writerow(["type", "sum"])
+    writer.writerows(models.summary(dateRange(args)))
+
+
+def printStats(models: ModelWrapper, args: argparse.Namespace):
+    """Print statistics of the DB, one `key: value` per line.
+
+    With `--check-plans`, also print the queries falling back
+    to a full table scan, exiting with status 1 if any.
+
+    Parameters
+    -----------------------
+    models : ModelWrapper
+        Wrapper connected to the DB
+    args : argparse.Namespace
+        Parsed arguments
+    """
+    dates = models.dateRange()
+
+    stats = {
+        "database": models.databaseName(),
+        "size [bytes]": os.path.getsize(models.databaseName()),
+        "profile": models.profile(),
+        "records": models.countRecords(),
+        "types": len(models.summary(None)),
+        "first date": dates[0] if dates is not None else "-",
+        "last date": dates[1] if dates is not None else "-",
+    }
+
+    for key, value in stats.items():
+        print(f"{key}: {value}")
+
+    if not args.check_plans:
+        return
+
+    scans = models.checkQueryPlans()
+    print(f"full scans: {len(scans)}")
+    for scan in scans:
+        print(f"  {scan}")
+
+    if scans:
+        sys.exit(1)
+
+
+def listCheckpoints(models: ModelWrapper, args: argparse.Namespace):
+    """Print the checkpoints of the delta exports as CSV.
+
+    With `--remove`, remove a checkpoint instead.
+
+    Parameters
+    -----------------------
+    models : ModelWrapper
+        Wrapper connected to the DB
+    args : argparse.Namespace
+        Parsed arguments
+    """
+    if args.remove is not None:
+        models.removeCheckpoint(args.remove)
+        return
+
+    writer = csv.writer(sys.stdout, quoting=csv.QUOTE_NONNUMERIC)
+    writer.writerow(["name", "last id", "time"])
+    writer.writerows(models.checkpoints())
+
+
+def takeSnapshot(models: ModelWrapper, args: argparse.Namespace):
+    """Save a snapshot of the DB, printing its filename.
+
+    With `--list`, print the existing snapshots instead, newest
+    first.
+
+    Parameters
+    -----------------------
+    models : ModelWrapper
+        Wrapper connected to the DB
+    args : argparse.Namespace
+        Parsed arguments
+    """
+    if args.list:
+        for filename in models.snapshots(args.dir):
+            print(filename)
+        return
+
+    keep = args.keep if args.keep > 0 else None
+    print(models.snapshot(args.dir, keep))
+
+
+def restoreSnapshot(models: ModelWrapper, args: argparse.Namespace):
+    """Replace the DB with a snapshot, the newest by default.
+
+    Parameters
+    -----------------------
+    models : ModelWrapper
+        Wrapper connected to the DB
+    args : argparse.Namespace
+        Parsed arguments
+
+    Raises
+    -----------------------
+    - DatabaseError if no snapshot is found
+    """
+    filename = args.snapshot
+    if filename is None:
+        snapshots = models.snapshots(args.dir)
+        if not snapshots:
+            raise DatabaseError("No snapshot found")
+        filename = snapshots[0]
+
+    models.restoreSnapshot(filename)
+    print(f"{args.database}: restored from {filename}", file=sys.stderr)
+
+
+def parser() -> argparse.ArgumentParser:
+    """Build the parser of the command line.
+
+    Returns
+    -----------------------
+    argparse.ArgumentParser
+        Parser, the `command` attribute of the parsed arguments
+        is the function running the subcommand
+    """
+    main_ = argparse.ArgumentParser(
+        prog="sem-qt-cli", description=__doc__.splitlines()[0]
+    )
+    main_.add_argument(
+        "--trace", metavar="FILE", help="write the executed queries to FILE"
+    )
+    sub = main_.add_subparsers(required=True, metavar="command")
+
+    # options shared by the subcommands
+    database = argparse.ArgumentParser(add_help=False)
+    database.add_argument("database", help="path of the database")
+    dated = argparse.ArgumentParser(add_help=False)
+    dated.add_argument("--from", dest="start", type=isoDate, help="first date")
+    dated.add_argument("--to", dest="end", type=isoDate, help="last date")
+
+    cmd = sub.add_parser(
+        "create", parents=[database], help="create an empty database"
+    )
+    cmd.set_defaults(command=reportCreated)
+
+    cmd = sub.add_parser("import", parents=[database], help="import CSV files")
+    cmd.add_argument("files", nargs="+", help="CSV files to import")
+    cmd.add_argument(
+        "--create", action="store_true", help="create the database if missing"
+    )
+    cmd.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        help="parse the files in JOBS processes, in a single transaction",
+    )
+    cmd.add_argument(
+        "--rejects",
+        metavar="FILE",
+        help="skip invalid rows, writing them to FILE, in a single "
+        "transaction",
+    )
+    cmd.add_argument(
+        "--duplicates",
+        choices=DUPLICATE_MODES,
+        help="skip or flag the rows repeating the date, type, amount and "
+        "justification of records",
+    )
+    cmd.set_defaults(command=importFiles)
+
+    cmd = sub.add_parser(
+        "export", parents=[database, dated], help="export records as CSV"
+    )
+    cmd.add_argument(
+        "-o", "--output", default="-", help="output file, stdout by default"
+    )
+    cmd.add_argument(
+        "--columns", type=columnList, help="comma-separated columns"
+    )
+    cmd.add_argument(
+        "--since",
+        metavar="CHECKPOINT",
+        help="export the changes since CHECKPOINT, all records if new, "
+        "and move it",
+    )
+    cmd.add_argument(
+        "--no-advance",
+        dest="advance",
+        action="store_false",
+        help="with --since, leave the checkpoint unchanged",
+    )
+    cmd.set_defaults(command=exportRecords)
+
+    cmd = sub.add_parser(
+        "summary", parents=[database, dated], help="print sums by type"
+    )
+    cmd.set_defaults(command=printSummary)
+
+    cmd = sub.add_parser(
+        "stats", parents=[database], help="print database statistics"
+    )
+    cmd.add_argument(
+        "--check-plans",
+        action="store_true",
+        help="check the query plans for full table scans",
+    )
+    cmd.set_defaults(command=printStats)
+
+    cmd = sub.add_parser(
+        "checkpoints",
+        parents=[database],
+        help="list the checkpoints of delta exports",
+    )
+    cmd.add_argument(
+        "--remove", metavar="CHECKPOINT", help="remove CHECKPOINT instead"
+    )
+    cmd.set_defaults(command=listCheckpoints)
+
+    snapshots = argparse.ArgumentParser(add_help=False)
+    snapshots.add_argument(
+        "--dir", help="snapshot directory, DATABASE.snapshots by default"
+    )
+
+    cmd = sub.add_parser(
+        "snapshot",
+        parents=[database, snapshots],
+        help="save a snapshot of the database",
+    )
+    cmd.add_argument(
+        "--keep",
+        type=int,
+        default=SNAPSHOT_RETENTION,
+        help=f"snapshots kept, 0 for all (default {SNAPSHOT_RETENTION})",
+    )
+    cmd.add_argument(
+        "--list", action="store_true", help="list the snapshots instead"
+    )
+    cmd.set_defaults(command=takeSnapshot)
+
+    cmd = sub.add_parser(
+        "restore",
+        parents=[database, snapshots],
+        help="replace the database with a snapshot",
+    )
+    cmd.add_argument(
+        "snapshot", nargs="?", help="snapshot to restore, newest by default"
+    )
+    cmd.set_defaults(command=restoreSnapshot)
+
+    return main_
+
+
+def main():
+    """Run the command-line interface."""
+    args = parser().parse_args()
+
+    # required by QtSql, without GUI
+    _app = QCoreApplication([])
+
+    # CSV rows carry their own line terminators
+    sys.stdout.reconfigure(newline="")
+
+    models = ModelWrapper(None)
+    models.tracer.setEnabled(args.trace is not None)
+    # `create` fails on existing DBs, `import --create` opens them
+    create = args.command is reportCreated or (
+        getattr(args, "create", False) and not os.path.isfile(args.database)
+    )
+
+    try:
+        if create:
+            models.createDB(args.database)
+        else:
+            models.openDB(args.database)
+    except DatabaseError as err:
+        print(f"sem-qt-cli: error: {err}", file=sys.stderr)
+        sys.exit(1)
+
+    try:
+        args.command(models, args)
+        sys.stdout.flush()
+    except BrokenPipeError:
+        # reader closed early (e.g. `| head`), silencing the final flush
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        sys.exit(1)
+    except (DatabaseError, OSError) as err:
+        print(f"sem-qt-cli: error: {err}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        models.closeDB()
+        if args.trace is not None:
+            models.tracer.dump(args.trace)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Fixtures of the tests.
+
+Fixtures
+-----------------------
+app
+    QCoreApplication required by QtSql, one per session.
+wrappers
+    Factory of ModelWrapper objects on their own connections,
+    closed at teardown.
+"""
+
+# Copyright (c) 2022 Adriano Angelone
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the
+# Software.
+#
+# This file is part of sem-qt.
+#
+# This file may be used under the terms of the GNU General
+# Public License version 3.0 as published by the Free Software
+# Foundation and appearing in the file LICENSE included in the
+# packaging of this file.  Please review the following
+# information to ensure the GNU General Public License version
+# 3.0 requirements will be met:
+# http://www.gnu.org/copyleft/gpl.html.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY
+# KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE
+# WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR
+# PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+# OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+# SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+import pytest
+from PyQt6.QtCore import QCoreApplication
+
+from modules.ModelWrapper import DatabaseError, ModelWrapper
+from tests.helpers import connectionName
+
+
+@pytest.fixture(scope="session", autouse=True)
+def app() -> QCoreApplication:
+    """Return the application required by QtSql."""
+    return QCoreApplication.instance() or QCoreApplication([])
+
+
+@pytest.fixture
+def wrappers():
+    """Return a factory of wrappers on their own connections.
+
+    The factory takes the filename of the DB, and whether to
+    create it, returning the connected wrapper, closed at
+    teardown. Connection names are never reused, closed
+    connections are left to the end of the process.
+    """
+    created = []
+
+    def factory(filename: str, create: bool = False) -> ModelWrapper:
+        models = ModelWrapper(None, connectionName())
+        created.append(models)
+        if create:
+            models.createDB(filename)
+        else:
+            models.openDB(filename)
+        return models
+
+    yield factory
+
+    for models in created:
+        try:
+            models.closeDB()
+        except DatabaseError:
+            pass
@@ -0,0 +1,80 @@
+"""Helpers of the tests.
+
+Functions
+-----------------------
+connectionName() -> str
+    Return a connection name not used before.
+execute(str, str)
+    Execute a statement on a DB, through a separate connection.
+"""
+
+# Copyright (c) 2022 Adriano Angelone
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the
+# Software.
+#
+# This file is part of sem-qt.
+#
+# This file may be used under the terms of the GNU General
+# Public License version 3.0 as published by the Free Software
+# Foundation and appearing in the file LICENSE included in the
+# packaging of this file.  Please review the following
+# information to ensure the GNU General Public License version
+# 3.0 requirements will be met:
+# http://www.gnu.org/copyleft/gpl.html.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY
+# KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE
+# WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR
+# PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+# OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+# SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+import itertools
+
+from PyQt6.QtSql import QSqlDatabase, QSqlQuery
+
+# distinct connection names across the session
+COUNTER = itertools.count()
+
+
+def connectionName() -> str:
+    """Return a connection name not used before.
+
+    Returns
+    -----------------------
+    str
+        Name of the connection
+    """
+    return f"test-{next(COUNTER)}"
+
+
+def execute(filename: str, command: str):
+    """Execute a statement on a DB, through a separate connection.
+
+    Parameters
+    -----------------------
+    filename : str
+        Path of the DB
+    command : str
+        Statement to execute
+    """
+    name = connectionName()
+    conn = QSqlDatabase.addDatabase("QSQLITE", name)
+    conn.setDatabaseName(filename)
+    assert conn.open(), conn.lastError().text()
+
+    query = QSqlQuery(conn)
+    chk = query.exec(command)
+    err = query.lastError().text()
+    query.finish()
+    conn.close()
+
+    # connection can only be removed once unreferenced
+    del query, conn
+    QSqlDatabase.removeDatabase(name)
+
+    assert chk, err
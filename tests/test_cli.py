@@ -0,0 +1,74 @@
+"""Tests of the creation of databases by `modules.cli`."""
+
+# Copyright (c) 2022 Adriano Angelone
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the
+# Software.
+#
+# This file is part of sem-qt.
+#
+# This file may be used under the terms of the GNU General
+# Public License version 3.0 as published by the Free Software
+# Foundation and appearing in the file LICENSE included in the
+# packaging of this file.  Please review the following
+# information to ensure the GNU General Public License version
+# 3.0 requirements will be met:
+# http://www.gnu.org/copyleft/gpl.html.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY
+# KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE
+# WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR
+# PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+# OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+# SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+import subprocess
+import sys
+
+import pytest
+
+
+def cli(*args: str) -> subprocess.CompletedProcess:
+    """Run the command-line interface, capturing its output."""
+    return subprocess.run(
+        [sys.executable, "-m", "modules.cli", *args],
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+
+
+@pytest.fixture
+def csvname(tmp_path) -> str:
+    """Return the path of a CSV file of two records."""
+    filename = tmp_path / "day.csv"
+    filename.write_text(",2023-01-01,A,1.5,x\n,2023-01-02,B,2.5,y\n")
+    return str(filename)
+
+
+def test_create(tmp_path):
+    """Check that `create` makes an empty DB, once."""
+    filename = str(tmp_path / "new.db")
+
+    assert cli("create", filename).returncode == 0
+    assert "records: 0" in cli("stats", filename).stdout
+
+    result = cli("create", filename)
+    assert result.returncode == 1
+    assert "already exists" in result.stderr
+
+
+def test_import_create(tmp_path, csvname):
+    """Check that `import --create` starts from a missing DB."""
+    filename = str(tmp_path / "new.db")
+
+    result = cli("import", filename, csvname)
+    assert result.returncode == 1
+    assert "does not exist" in result.stderr
+
+    for _ in range(2):
+        assert cli("import", "--create", filename, csvname).returncode == 0
+    assert "records: 4" in cli("stats", filename).stdout
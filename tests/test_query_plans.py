@@ -0,0 +1,90 @@
+"""Tests of `ModelWrapper.checkQueryPlans()`.
+
+Plans are checked on analyzed databases, as the planner reads
+their statistics: on a table of `PLANNED_ROWS` records indexes
+are expected to win, below `PLAN_CHECK_MIN_ROWS` scans are
+allowed.
+"""
+
+# Copyright (c) 2022 Adriano Angelone
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the
+# Software.
+#
+# This file is part of sem-qt.
+#
+# This file may be used under the terms of the GNU General
+# Public License version 3.0 as published by the Free Software
+# Foundation and appearing in the file LICENSE included in the
+# packaging of this file.  Please review the following
+# information to ensure the GNU General Public License version
+# 3.0 requirements will be met:
+# http://www.gnu.org/copyleft/gpl.html.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY
+# KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE
+# WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR
+# PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+# OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+# SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+import shutil
+
+import pytest
+
+from modules.ModelWrapper import PLAN_CHECK_MIN_ROWS
+from benchmarks.generate import createDB
+from tests.helpers import execute
+
+# records of the sized database, well above `PLAN_CHECK_MIN_ROWS`
+PLANNED_ROWS = 20 * PLAN_CHECK_MIN_ROWS
+
+
+@pytest.fixture(scope="module")
+def sizedDB(tmp_path_factory, app) -> str:
+    """Return the path of an analyzed DB of `PLANNED_ROWS` records."""
+    filename = str(tmp_path_factory.mktemp("plans") / "sized.db")
+    createDB(filename, PLANNED_ROWS)
+    execute(filename, "ANALYZE ;")
+    return filename
+
+
+@pytest.fixture
+def sizedCopy(sizedDB, tmp_path) -> str:
+    """Return the path of a copy of the sized DB."""
+    filename = str(tmp_path / "copy.db")
+    shutil.copy(sizedDB, filename)
+    return filename
+
+
+def test_no_scans_on_sized_db(sizedDB, wrappers):
+    """Check that no query scans an analyzed, sized DB."""
+    models = wrappers(sizedDB)
+
+    assert models.checkQueryPlans() == []
+
+
+def test_scans_reported_without_index(sizedCopy, wrappers):
+    """Check that a missing index is reported as scans."""
+    models = wrappers(sizedCopy)
+    execute(sizedCopy, "DROP INDEX amount_index ;")
+    execute(sizedCopy, "DROP INDEX type_index ;")
+
+    scans = models.checkQueryPlans()
+
+    assert scans
+    assert all(scan.endswith("SCAN expenses") for scan in scans)
+
+
+def test_small_db_allowed(tmp_path, wrappers):
+    """Check that scans of an analyzed, small DB are allowed."""
+    filename = str(tmp_path / "small.db")
+    createDB(filename, PLAN_CHECK_MIN_ROWS // 50)
+    execute(filename, "ANALYZE ;")
+
+    models = wrappers(filename)
+
+    assert models.checkQueryPlans() == []
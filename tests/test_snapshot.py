@@ -0,0 +1,82 @@
+"""Tests of `ModelWrapper.snapshot()` and `restoreSnapshot()`."""
+
+# Copyright (c) 2022 Adriano Angelone
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the
+# Software.
+#
+# This file is part of sem-qt.
+#
+# This file may be used under the terms of the GNU General
+# Public License version 3.0 as published by the Free Software
+# Foundation and appearing in the file LICENSE included in the
+# packaging of this file.  Please review the following
+# information to ensure the GNU General Public License version
+# 3.0 requirements will be met:
+# http://www.gnu.org/copyleft/gpl.html.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY
+# KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE
+# WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR
+# PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+# OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+# SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+import os
+
+import pytest
+from PyQt6.QtCore import qInstallMessageHandler
+
+from modules.ModelWrapper import DatabaseError
+
+
+@pytest.fixture
+def qtMessages() -> list[str]:
+    """Return the messages logged by Qt during the test."""
+    messages = []
+
+    def handler(_mode, _context, message):
+        messages.append(message)
+
+    previous = qInstallMessageHandler(handler)
+    yield messages
+    qInstallMessageHandler(previous)
+
+
+def test_restore(tmp_path, wrappers, qtMessages):
+    """Check that a restore brings back the records, silently."""
+    models = wrappers(str(tmp_path / "test.db"), create=True)
+    models.initModels()
+    for _ in range(3):
+        models.addDefaultRecord()
+
+    snapshot = models.snapshot(None, None)
+    models.removeRecords([0, 1])
+    models.restoreSnapshot(snapshot)
+
+    assert models.countRecords() == 3
+    assert models.listModel is None
+    assert not qtMessages
+
+
+def test_restore_in_use(tmp_path, wrappers):
+    """Check that a DB in use is left in place, with no copy."""
+    filename = str(tmp_path / "test.db")
+    models = wrappers(filename, create=True)
+    models.initModels()
+    models.addDefaultRecord()
+    snapshot = models.snapshot(None, None)
+
+    # a second connection keeps the WAL alive
+    other = wrappers(filename)
+    other.initModels()
+    other.addDefaultRecord()
+
+    with pytest.raises(DatabaseError, match="in use"):
+        models.restoreSnapshot(snapshot)
+
+    assert not os.path.exists(f"{filename}.restore")
+    assert models.countRecords() == 2
@@ -0,0 +1,139 @@
+"""Tests of the incremental summary, see `ModelWrapper.checkSummary()`.
+
+The sums by type kept from 'daily_totals' are checked against
+aggregation on 'expenses' after each kind of change.
+"""
+
+# Copyright (c) 2022 Adriano Angelone
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the
+# Software.
+#
+# This file is part of sem-qt.
+#
+# This file may be used under the terms of the GNU General
+# Public License version 3.0 as published by the Free Software
+# Foundation and appearing in the file LICENSE included in the
+# packaging of this file.  Please review the following
+# information to ensure the GNU General Public License version
+# 3.0 requirements will be met:
+# http://www.gnu.org/copyleft/gpl.html.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY
+# KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE
+# WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR
+# PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+# COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+# OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+# SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+import pytest
+
+from modules.ModelWrapper import EXPENSE_COLUMNS, ModelWrapper
+from benchmarks.generate import writeCSV
+from tests.helpers import execute
+
+# records imported before each test
+ROWS = 2000
+# date ranges checked, `None` for all records
+RANGES = [None, ["2020-01-01", "2020-12-31"], ["2024-06-01", "2024-06-30"]]
+
+
+def checkAll(models: ModelWrapper) -> bool:
+    """Check the summary of all `RANGES`."""
+    return all(models.checkSummary(dates) for dates in RANGES)
+
+
+def edit(models: ModelWrapper, row: int, column: str, value: object):
+    """Edit a cell of the list model."""
+    index = models.listModel.index(row, EXPENSE_COLUMNS.index(column))
+    assert models.listModel.setData(index, value)
+
+
+@pytest.fixture
+def models(tmp_path, wrappers) -> ModelWrapper:
+    """Return a wrapper on a new DB of `ROWS` imported records."""
+    csvname = str(tmp_path / "init.csv")
+    writeCSV(csvname, ROWS)
+
+    models = wrappers(str(tmp_path / "test.db"), create=True)
+    models.initModels()
+    models.importCSV(csvname)
+
+    return models
+
+
+def test_import(models):
+    """Check the summary after the initial import."""
+    assert models.countRecords() == ROWS
+    assert checkAll(models)
+
+
+def test_insert(models):
+    """Check the summary after adding default records."""
+    for _ in range(5):
+        models.addDefaultRecord()
+
+    assert checkAll(models)
+
+
+def test_edit(models):
+    """Check the summary after editing dates, types and amounts."""
+    edit(models, 0, "amount", 123.45)
+    edit(models, 1, "type", "Z")
+    edit(models, 2, "date", "2020-03-01")
+    edit(models, 3, "justification", "edited")
+
+    assert checkAll(models)
+
+
+def test_batched_edit(models):
+    """Check the summary after submitting batched edits."""
+    models.listModel.setBatched(True)
+    for row in range(10):
+        edit(models, row, "amount", float(row))
+        edit(models, row + 10, "date", "2024-06-15")
+    models.submitEdits()
+
+    assert checkAll(models)
+
+
+def test_remove(models):
+    """Check the summary after removing records."""
+    models.removeRecords(list(range(0, 200, 3)))
+
+    assert models.countRecords() == ROWS - 67
+    assert checkAll(models)
+
+
+def test_reimport(models, tmp_path):
+    """Check the summary after importing more files."""
+    csvnames = [str(tmp_path / f"more{i}.csv") for i in range(2)]
+    for seed, csvname in enumerate(csvnames, 1):
+        writeCSV(csvname, ROWS // 2, seed)
+
+    models.importCSV(csvnames[0], duplicates="skip")
+    models.importCSVs(csvnames, workers=1)
+
+    assert checkAll(models)
+
+
+def test_other_connection(models):
+    """Check the summary after changes through another connection."""
+    filename = models.databaseName()
+    execute(filename, "UPDATE expenses SET amount = amount * 2 WHERE id < 50 ;")
+    execute(filename, "DELETE FROM expenses WHERE id BETWEEN 50 AND 80 ;")
+    models.refreshModels()
+
+    assert checkAll(models)
+
+
+def test_drift_detected(models):
+    """Check that totals drifting from the records are detected."""
+    execute(models.databaseName(), "DROP TRIGGER daily_totals_update ;")
+    execute(models.databaseName(), "UPDATE expenses SET amount = amount + 1 ;")
+    models.refreshModels()
+
+    assert not models.checkSummary(None)